@@ -0,0 +1,5 @@
+"""
+Benchmarks Module
+
+This module contains performance benchmarks for the MCP server and client.
+"""
@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""
+Multi-Tool Turn Benchmark for the StateGraph Agent
+
+Measures how long one agent turn takes when the model asks for several tools
+at once. The same turn runs through MCPLangGraphAgent's StateGraph twice:
+
+- sequential: MCP_TOOL_CONCURRENCY=1, so the calls run one after another
+- parallel: MCP_TOOL_CONCURRENCY=--concurrency, so up to that many overlap
+
+With 8 calls and a cap of 4, the parallel turn should take about two call
+latencies. --sync-tools uses blocking tools, which run on ToolNode's thread
+pool instead of the event loop.
+
+The benchmark uses a scripted model and stub tools that sleep for a fixed
+latency, so it needs neither an OpenAI key nor network access and the numbers
+only reflect tool scheduling.
+
+Usage:
+    uv run benchmarks/agent_parallel_tools.py                         # 3 calls of 300 ms
+    uv run benchmarks/agent_parallel_tools.py --calls 8 --concurrency 4 --sync-tools
+    uv run benchmarks/agent_parallel_tools.py --json out.json         # also write the report as JSON
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import sys
+import time
+from typing import Dict
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+from langchain_core.messages import AIMessage, HumanMessage, ToolMessage
+from langchain_core.runnables import RunnableLambda
+from langchain_core.tools import StructuredTool
+
+from client.langgraph_agent import MCPLangGraphAgent
+
+
+def stub_file_tool(latency: float, sync: bool = False) -> StructuredTool:
+    """Stand-in for github_get_file_content with a fixed upstream latency."""
+    async def github_get_file_content(owner: str, repo: str, file_path: str) -> str:
+        await asyncio.sleep(latency)
+        return f"📄 File Content: {owner}/{repo}/{file_path}"
+
+    def blocking_get_file_content(owner: str, repo: str, file_path: str) -> str:
+        time.sleep(latency)
+        return f"📄 File Content: {owner}/{repo}/{file_path}"
+
+    return StructuredTool.from_function(
+        func=blocking_get_file_content if sync else None,
+        coroutine=None if sync else github_get_file_content,
+        name="github_get_file_content",
+        description="Get the content of a specific file from a GitHub repository",
+    )
+
+
+def scripted_model(calls: int) -> RunnableLambda:
+    """A model that requests `calls` files in its first turn, then answers."""
+    def respond(messages) -> AIMessage:
+        if isinstance(messages[-1], HumanMessage):
+            return AIMessage(content="", tool_calls=[
+                {"name": "github_get_file_content", "id": f"call_{i}",
+                 "args": {"owner": "octocat", "repo": "Hello-World", "file_path": f"file_{i}.py"}}
+                for i in range(calls)
+            ])
+        return AIMessage(content="Done")
+
+    return RunnableLambda(respond)
+
+
+def build_agent(calls: int, latency: float, concurrency: int, sync: bool) -> MCPLangGraphAgent:
+    agent = MCPLangGraphAgent(openai_api_key="sk-benchmark")
+    agent.tools = [stub_file_tool(latency, sync)]
+    agent.llm_with_tools = scripted_model(calls)
+    agent.tool_concurrency = concurrency
+    agent._create_state_graph()
+    return agent
+
+
+async def run_turn(graph, calls: int, sync: bool) -> float:
+    """Run one multi-tool turn and return its wall time in seconds."""
+    request = {"messages": [HumanMessage("Read the files")]}
+    started = time.perf_counter()
+    # Sync tools only run on the thread pool when the graph is invoked synchronously
+    result = await asyncio.to_thread(graph.invoke, request) if sync else await graph.ainvoke(request)
+    elapsed = time.perf_counter() - started
+
+    tool_messages = [m for m in result["messages"] if isinstance(m, ToolMessage)]
+    expected = [f"call_{i}" for i in range(calls)]
+    if [m.tool_call_id for m in tool_messages] != expected:
+        raise RuntimeError("Tool results were not returned in call order")
+    return elapsed
+
+
+async def measure(graph, calls: int, runs: int, sync: bool) -> Dict:
+    times = [await run_turn(graph, calls, sync) for _ in range(runs)]
+    return {
+        "turn_ms_median": statistics.median(times) * 1000,
+        "turn_ms_min": min(times) * 1000,
+        "turn_ms_max": max(times) * 1000,
+    }
+
+
+async def benchmark(calls: int, latency: float, concurrency: int, runs: int, sync: bool) -> Dict:
+    sequential = await measure(build_agent(calls, latency, 1, sync).state_graph, calls, runs, sync)
+    parallel = await measure(build_agent(calls, latency, concurrency, sync).state_graph, calls, runs, sync)
+    return {
+        "calls": calls,
+        "latency_ms": latency * 1000,
+        "runs": runs,
+        "tools": "sync" if sync else "async",
+        "sequential": sequential,
+        "parallel": {"concurrency": concurrency, **parallel},
+        "speedup": sequential["turn_ms_median"] / parallel["turn_ms_median"],
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark parallel tool calls in one agent turn")
+    parser.add_argument("--calls", type=int, default=3, help="Tool calls the model makes in one turn")
+    parser.add_argument("--latency-ms", type=float, default=300, help="Latency of each stub tool call")
+    parser.add_argument("--concurrency", type=int, default=4, help="Tool calls in flight in the parallel run")
+    parser.add_argument("--runs", type=int, default=5, help="Turns measured per graph")
+    parser.add_argument("--sync-tools", action="store_true", help="Use blocking tools (run on ToolNode's thread pool)")
+    parser.add_argument("--json", help="Write the report to this file")
+    args = parser.parse_args()
+
+    report = asyncio.run(benchmark(args.calls, args.latency_ms / 1000, args.concurrency, args.runs, args.sync_tools))
+
+    print("🧰 Multi-Tool Turn Benchmark")
+    print("=" * 40)
+    print(f"{report['calls']} {report['tools']} tool calls x {report['latency_ms']:.0f} ms, "
+          f"median of {report['runs']} turns")
+    for mode, label in (("sequential", "sequential"), ("parallel", f"parallel (cap {args.concurrency})")):
+        result = report[mode]
+        print(f"   {label:<18}: {result['turn_ms_median']:8.1f} ms "
+              f"(min {result['turn_ms_min']:.1f}, max {result['turn_ms_max']:.1f})")
+    print(f"   {'speedup':<18}: {report['speedup']:8.2f}x")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"\n📝 Report written to {args.json}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
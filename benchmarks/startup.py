@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+"""
+Server Cold-Start Benchmark
+
+Measures how long it takes to import server/main.py in a fresh interpreter,
+which every stdio client spawn pays before the MCP handshake can start.
+
+Each run uses `python -X importtime` and reports:
+- wall-clock import time (median over runs)
+- cumulative import time per top-level package
+- the modules with the highest self time
+- heavy backend modules that should only load on first tool use
+
+Usage:
+    uv run benchmarks/startup.py                 # print a report
+    uv run benchmarks/startup.py --json out.json # also write the report as JSON
+    uv run benchmarks/startup.py --max-ms 600    # exit non-zero if cold start regresses
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from typing import Dict, List
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Modules that must stay out of the import path until their tool is called
+LAZY_MODULES = ("tavily", "requests", "server.github_tool", "server.social_content_creator")
+
+PROBE = (
+    "import sys, time\n"
+    "start = time.perf_counter()\n"
+    "import server.main\n"
+    "elapsed = time.perf_counter() - start\n"
+    "print(elapsed)\n"
+    f"print(','.join(m for m in {LAZY_MODULES!r} if m in sys.modules))\n"
+)
+
+
+def parse_importtime(stderr: str) -> List[Dict]:
+    """Parse `-X importtime` output into {module, self_us, cumulative_us, depth} records."""
+    records = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+        records.append({
+            "module": name.strip(),
+            "self_us": int(self_us),
+            "cumulative_us": int(cumulative_us),
+            "depth": (len(name) - len(name.lstrip()) - 1) // 2,
+        })
+    return records
+
+
+def server_imports(records: List[Dict]) -> List[Dict]:
+    """Return the direct imports of server.main (importtime lists children before parents)."""
+    children = []
+    for record in records:
+        if record["depth"] == 0:
+            if record["module"] == "server.main":
+                return children
+            children = []
+        elif record["depth"] == 1:
+            children.append(record)
+    return []
+
+
+def run_once() -> Dict:
+    """Import the server in a fresh interpreter and collect timings."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", PROBE],
+        cwd=project_root, capture_output=True, text=True, check=True,
+    )
+    stdout_lines = result.stdout.splitlines()
+    return {
+        "wall_ms": float(stdout_lines[-2]) * 1000,
+        "loaded_lazy_modules": [m for m in stdout_lines[-1].split(",") if m],
+        "records": parse_importtime(result.stderr),
+    }
+
+
+def summarize(runs: List[Dict], top: int) -> Dict:
+    """Combine several runs into a report."""
+    records = runs[-1]["records"]
+
+    packages: Dict[str, int] = {}
+    for record in server_imports(records):
+        package = record["module"].split(".")[0]
+        packages[package] = packages.get(package, 0) + record["cumulative_us"]
+
+    server_main = next((r for r in records if r["module"] == "server.main"), None)
+    if server_main is not None:
+        packages["server.main (self)"] = server_main["self_us"]
+
+    slowest = sorted(records, key=lambda r: r["self_us"], reverse=True)[:top]
+    wall = [run["wall_ms"] for run in runs]
+    return {
+        "runs": len(runs),
+        "wall_ms_median": statistics.median(wall),
+        "wall_ms_min": min(wall),
+        "wall_ms_max": max(wall),
+        "packages_ms": {
+            name: round(us / 1000, 2)
+            for name, us in sorted(packages.items(), key=lambda item: item[1], reverse=True)
+        },
+        "top_self_ms": [
+            {"module": r["module"], "self_ms": round(r["self_us"] / 1000, 2)} for r in slowest
+        ],
+        "loaded_lazy_modules": runs[-1]["loaded_lazy_modules"],
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark MCP server cold-start import time")
+    parser.add_argument("--runs", type=int, default=5, help="Number of fresh interpreter runs")
+    parser.add_argument("--top", type=int, default=15, help="Number of slowest modules to list")
+    parser.add_argument("--json", help="Write the report to this file")
+    parser.add_argument("--max-ms", type=float, help="Fail if the median import time exceeds this")
+    args = parser.parse_args()
+
+    report = summarize([run_once() for _ in range(args.runs)], args.top)
+
+    print("🚀 MCP Server Cold-Start Benchmark")
+    print("=" * 40)
+    print(f"Import time (median of {report['runs']}): {report['wall_ms_median']:.1f} ms "
+          f"(min {report['wall_ms_min']:.1f}, max {report['wall_ms_max']:.1f})")
+    print("\n📦 Cumulative time by top-level package:")
+    for name, ms in report["packages_ms"].items():
+        print(f"   {ms:8.2f} ms  {name}")
+    print("\n🐢 Highest self time:")
+    for entry in report["top_self_ms"]:
+        print(f"   {entry['self_ms']:8.2f} ms  {entry['module']}")
+
+    failed = False
+    if report["loaded_lazy_modules"]:
+        print(f"\n❌ Backend modules loaded at import: {', '.join(report['loaded_lazy_modules'])}")
+        failed = True
+    else:
+        print("\n✅ Tool backends are loaded lazily")
+
+    if args.max_ms is not None and report["wall_ms_median"] > args.max_ms:
+        print(f"❌ Median import time {report['wall_ms_median']:.1f} ms exceeds {args.max_ms} ms")
+        failed = True
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"\n📝 Report written to {args.json}")
+
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,615 @@
+#!/usr/bin/env python3
+"""
+End-to-End Transport Benchmark for the MCP Server
+
+Drives the real server with the MCP client SDK, the way agents do, and
+measures what a session costs on top of the tool bodies:
+
+- cold start over stdio: process spawn (interpreter, and `uv run` when uv is
+  installed), importing server.main, the initialize handshake and list_tools
+- warm per-call latency for each tool, called in-process ("direct"), over
+  stdio and over streamable HTTP. The difference between direct and stdio is
+  the JSON-RPC framing and transport overhead
+- sustained throughput of a tool mix with several calls in flight
+
+Upstreams are stubbed inside the server process: Tavily clients are replaced
+and the GitHub and social sessions get a requests adapter that serves canned
+responses after --upstream-ms, so no API keys or network are needed and every
+server layer (admission, pools, shaping, metrics, breakers) still runs.
+With --cassette the server replays real upstream traffic recorded with
+--record instead (see server/replay.py).
+
+Usage:
+    uv run benchmarks/transport.py                          # stdio and HTTP, print a report
+    uv run benchmarks/transport.py --transports stdio --calls 50 --upstream-ms 20
+    uv run benchmarks/transport.py --json transport.json    # also write the report as JSON
+    uv run benchmarks/transport.py --baseline transport.json  # compare with an earlier report
+    uv run benchmarks/transport.py --cassette bench.json.gz --record   # record live upstreams (needs API keys)
+    uv run benchmarks/transport.py --cassette bench.json.gz            # replay them offline
+"""
+
+import argparse
+import asyncio
+import base64
+import contextlib
+import functools
+import json
+import os
+import platform
+import shutil
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+from typing import Callable, Dict, List, Optional
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+SCRIPT = os.path.abspath(__file__)
+IMPORT_MARKER = "transport-benchmark import_ms="
+
+# Arguments for call i of each tool; they vary per call so server-side caches do not hide upstream work
+TOOL_CALLS: Dict[str, Callable[[int], Dict]] = {
+    "roll_dice": lambda i: {"notation": "3d6", "num_rolls": 1},
+    "web_search": lambda i: {"query": f"model context protocol {i}"},
+    "web_search_many": lambda i: {"queries": [f"mcp transports {i}", f"mcp servers {i}"]},
+    "github_search_repositories": lambda i: {"query": f"mcp server {i}", "limit": 5},
+    "github_get_repository_info": lambda i: {"owner": "octocat", "repo": f"repo-{i}"},
+    "github_get_repositories_info": lambda i: {"repositories": [f"octocat/repo-{i}", f"octocat/tools-{i}"]},
+    "github_get_file_content": lambda i: {"owner": "octocat", "repo": "repo", "file_path": f"src/module_{i}.py"},
+    "github_list_files": lambda i: {"owner": "octocat", "repo": f"repo-{i}"},
+    "github_auth_status": lambda i: {},
+    "create_social_post": lambda i: {"topic": f"python {i}"},
+    "get_slide_image": lambda i: {"topic": f"architecture {i}"},
+    "create_quote_card": lambda i: {"theme": "motivation"},
+    "server_metrics": lambda i: {},
+}
+THROUGHPUT_MIX = ("roll_dice", "web_search", "github_get_repository_info", "github_get_file_content")
+
+
+# --- Stubbed server (runs in the server process) -------------------------------------------
+
+def upstream_latency() -> float:
+    return float(os.getenv("MCP_BENCH_UPSTREAM_MS", "0")) / 1000
+
+
+def github_repository(full_name: str) -> Dict:
+    return {
+        "full_name": full_name, "description": "Benchmark repository", "language": "Python",
+        "stargazers_count": 1234, "forks_count": 56, "watchers_count": 1234, "size": 789,
+        "private": False, "default_branch": "main", "html_url": f"https://github.com/{full_name}",
+        "created_at": "2024-01-01T00:00:00Z", "updated_at": "2025-01-01T00:00:00Z", "topics": ["mcp"],
+    }
+
+
+def stub_payload(url: str):
+    """Canned upstream response body for a request URL."""
+    from urllib.parse import urlsplit
+
+    parts = urlsplit(url)
+    path = parts.path.strip("/")
+    if parts.netloc == "api.quotable.io":
+        return {"content": "Simplicity is prerequisite for reliability.", "author": "Edsger Dijkstra"}
+    if parts.netloc == "api.unsplash.com":
+        return {"results": [{
+            "urls": {"regular": "https://images.example/1080.jpg", "small": "https://images.example/400.jpg"},
+            "alt_description": "benchmark image", "user": {"name": "Benchmark"},
+            "links": {"html": "https://images.example"},
+        }]}
+    if path == "rate_limit":
+        return {"rate": {"limit": 5000, "remaining": 4999, "reset": 0}}
+    if path == "search/repositories":
+        return {"total_count": 5, "items": [github_repository(f"octocat/result-{n}") for n in range(5)]}
+    segments = path.split("/")
+    if segments[0] == "repos" and len(segments) == 3:
+        return github_repository("/".join(segments[1:3]))
+    if segments[0] == "repos" and len(segments) >= 4 and segments[3] == "contents":
+        file_path = "/".join(segments[4:])
+        if not file_path:
+            return [{"name": "src", "type": "dir"}, {"name": "README.md", "type": "file", "size": 2048},
+                    {"name": "pyproject.toml", "type": "file", "size": 512}]
+        content = ("def handler(request):\n    return {'status': 'ok'}\n\n" * 40).encode()
+        return {"type": "file", "size": len(content), "content": base64.b64encode(content).decode()}
+    return None
+
+
+def stub_adapter():
+    """A requests transport adapter answering every request with stub_payload."""
+    import requests
+    from requests.adapters import BaseAdapter
+
+    class StubAdapter(BaseAdapter):
+        def send(self, request, **kwargs):
+            time.sleep(upstream_latency())
+            payload = stub_payload(request.url)
+            response = requests.Response()
+            response.status_code = 404 if payload is None else 200
+            response._content = json.dumps(payload or {"message": "Not Found"}).encode()
+            response.headers["Content-Type"] = "application/json"
+            response.headers["X-RateLimit-Remaining"] = "4999"
+            response.url = request.url
+            response.request = request
+            response.encoding = "utf-8"
+            return response
+
+        def close(self):
+            pass
+
+    return StubAdapter()
+
+
+def search_context(query: str) -> str:
+    return json.dumps([
+        {"url": f"https://example.com/{n}?q={query}", "content": f"Result {n} about {query}. " * 20}
+        for n in range(5)
+    ])
+
+
+class StubTavily:
+    def get_search_context(self, query: str, **kwargs) -> str:
+        time.sleep(upstream_latency())
+        return search_context(query)
+
+
+class StubAsyncTavily:
+    async def get_search_context(self, query: str, **kwargs) -> str:
+        await asyncio.sleep(upstream_latency())
+        return search_context(query)
+
+
+def install_stubs(main) -> None:
+    """Stub every upstream of an imported server.main, keeping backends lazy."""
+    main.get_tavily_client = functools.cache(StubTavily)
+    main.get_async_tavily_client = functools.cache(StubAsyncTavily)
+
+    def stubbed(factory):
+        @functools.cache
+        def get_backend():
+            backend = factory()
+            backend.session.mount("https://", stub_adapter())
+            return backend
+        return get_backend
+
+    main.get_github_tool = stubbed(main.get_github_tool)
+    main.get_content_creator = stubbed(main.get_content_creator)
+
+
+def import_server():
+    """Import server.main, report the import time on stderr and stub its upstreams."""
+    started = time.perf_counter()
+    from server import main
+    print(f"{IMPORT_MARKER}{(time.perf_counter() - started) * 1000:.2f}", file=sys.stderr, flush=True)
+    if not os.getenv("MCP_HTTP_CASSETTE"):
+        install_stubs(main)
+    return main
+
+
+def create_stubbed_http_app():
+    """uvicorn factory for HTTP workers (each worker process imports and stubs its own server)."""
+    return import_server().create_http_app()
+
+
+def serve(transport: str, port: int, workers: int) -> None:
+    if transport == "http":
+        import uvicorn
+
+        uvicorn.run("benchmarks.transport:create_stubbed_http_app", factory=True, host="127.0.0.1",
+                    port=port, workers=workers, app_dir=project_root, log_level="warning")
+        return
+    import_server().run_stdio()
+
+
+# --- Harness (runs in the benchmark process) ------------------------------------------------
+
+def percentile(values: List[float], fraction: float) -> float:
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def latency_summary(seconds: List[float], errors: int) -> Dict:
+    ms = [s * 1000 for s in seconds]
+    return {
+        "calls": len(ms),
+        "errors": errors,
+        "p50_ms": round(percentile(ms, 0.5), 3),
+        "p95_ms": round(percentile(ms, 0.95), 3),
+        "mean_ms": round(statistics.fmean(ms), 3) if ms else 0.0,
+    }
+
+
+def result_failed(result) -> bool:
+    text = "".join(getattr(block, "text", "") for block in result.content)
+    return bool(result.isError) or text.startswith("❌")
+
+
+def server_env(cache_dir: str, args) -> Dict[str, str]:
+    env = dict(os.environ)
+    env.update({
+        "MCP_CACHE_DIR": cache_dir,
+        "MCP_SNAPSHOTS": "0",
+        "MCP_TRACE_SAMPLE_RATE": "0",
+        "PYTHONPATH": project_root,
+    })
+    if args.cassette:
+        # Real keys stay as they are, so replays take the same code paths as the recording
+        env.update({
+            "MCP_HTTP_CASSETTE": os.path.abspath(args.cassette),
+            "MCP_HTTP_CASSETTE_MODE": "record" if args.record else "replay",
+            "MCP_REPLAY_TIMING": str(args.replay_timing),
+        })
+    else:
+        env.update({
+            # Set (not removed) so load_dotenv does not fill it in from .env; unauthenticated uses REST
+            "GITHUB_TOKEN": "",
+            "MCP_BENCH_UPSTREAM_MS": str(args.upstream_ms),
+            "TAVILY_API_KEY": "tvly-benchmark",
+            "UNSPLASH_ACCESS_KEY": "benchmark",
+        })
+    return env
+
+
+def stdio_command(launcher: str) -> List[str]:
+    if launcher == "uv":
+        return ["uv", "run", "--directory", project_root, "python", SCRIPT, "--serve", "stdio"]
+    return [sys.executable, SCRIPT, "--serve", "stdio"]
+
+
+def interpreter_ms(launcher: str, runs: int) -> float:
+    """Median time to start and exit an empty interpreter with the given launcher."""
+    command = stdio_command(launcher)[:-3] + ["-c", "pass"]
+    times = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        subprocess.run(command, cwd=project_root, check=True, capture_output=True)
+        times.append((time.perf_counter() - started) * 1000)
+    return statistics.median(times)
+
+
+@contextlib.asynccontextmanager
+async def stdio_session(launcher: str, env: Dict[str, str], errlog):
+    from mcp import ClientSession, StdioServerParameters
+    from mcp.client.stdio import stdio_client
+
+    command = stdio_command(launcher)
+    parameters = StdioServerParameters(command=command[0], args=command[1:], env=env, cwd=project_root)
+    async with stdio_client(parameters, errlog=errlog) as (read, write):
+        async with ClientSession(read, write) as session:
+            yield session
+
+
+@contextlib.asynccontextmanager
+async def http_session(url: str):
+    from mcp import ClientSession
+    from mcp.client.streamable_http import streamablehttp_client
+
+    async with streamablehttp_client(url) as (read, write, _):
+        async with ClientSession(read, write) as session:
+            yield session
+
+
+async def cold_start_once(launcher: str, env: Dict[str, str]) -> Dict:
+    with tempfile.TemporaryFile("w+") as errlog:
+        started = time.perf_counter()
+        async with stdio_session(launcher, env, errlog) as session:
+            await session.initialize()
+            initialized = time.perf_counter()
+            await session.list_tools()
+            listed = time.perf_counter()
+            await session.call_tool("roll_dice", TOOL_CALLS["roll_dice"](0))
+            first_call = time.perf_counter()
+        errlog.seek(0)
+        import_ms = next((float(line.split("=", 1)[1]) for line in errlog if line.startswith(IMPORT_MARKER)), 0.0)
+    return {
+        "initialize_ms": (initialized - started) * 1000,
+        "import_ms": import_ms,
+        "list_tools_ms": (listed - initialized) * 1000,
+        "first_call_ms": (first_call - listed) * 1000,
+        "total_ms": (first_call - started) * 1000,
+    }
+
+
+async def cold_start(launcher: str, env: Dict[str, str], runs: int) -> Dict:
+    samples = [await cold_start_once(launcher, env) for _ in range(runs)]
+    report = {key: round(statistics.median(s[key] for s in samples), 2) for key in samples[0]}
+    report["interpreter_ms"] = round(interpreter_ms(launcher, runs), 2)
+    # What is left of the time to a ready session once the interpreter started and the server imported
+    report["handshake_ms"] = round(max(0.0, report["initialize_ms"] - report["interpreter_ms"] - report["import_ms"]), 2)
+    report["runs"] = runs
+    return report
+
+
+async def measure_tools(call: Callable, tools: List[str], calls: int) -> Dict[str, Dict]:
+    """Warm per-call latency: one warm-up call, then `calls` sequential calls per tool."""
+    report = {}
+    for tool in tools:
+        await call(tool, TOOL_CALLS[tool](-1))
+        seconds, errors = [], 0
+        for i in range(calls):
+            started = time.perf_counter()
+            failed = await call(tool, TOOL_CALLS[tool](i))
+            seconds.append(time.perf_counter() - started)
+            errors += int(failed)
+        report[tool] = latency_summary(seconds, errors)
+    return report
+
+
+async def measure_throughput(call: Callable, seconds: float, concurrency: int, variants: int = 0) -> Dict:
+    """
+    Calls per second for THROUGHPUT_MIX with `concurrency` calls in flight.
+
+    With variants, arguments cycle through the first `variants` calls of each
+    tool, so a replayed cassette has a recording for every call.
+    """
+    deadline = time.perf_counter() + seconds
+    latencies, errors, counter = [], 0, iter(range(10**9))
+
+    async def worker():
+        nonlocal errors
+        while time.perf_counter() < deadline:
+            i = next(counter)
+            tool = THROUGHPUT_MIX[i % len(THROUGHPUT_MIX)]
+            started = time.perf_counter()
+            errors += int(await call(tool, TOOL_CALLS[tool](i % variants if variants else i)))
+            latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    return {
+        "concurrency": concurrency,
+        "seconds": round(elapsed, 2),
+        "calls_per_second": round(len(latencies) / elapsed, 1),
+        **latency_summary(latencies, errors),
+    }
+
+
+def session_caller(session) -> Callable:
+    async def call(tool: str, arguments: Dict) -> bool:
+        return result_failed(await session.call_tool(tool, arguments))
+    return call
+
+
+async def bench_direct(env: Dict[str, str], tools: List[str], calls: int) -> Dict:
+    """The same tools through FastMCP in this process, without any transport."""
+    os.environ.update(env)
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stderr(devnull):
+        main = import_server()
+
+    async def call(tool: str, arguments: Dict) -> bool:
+        content = await main.mcp.call_tool(tool, arguments)
+        if isinstance(content, tuple):
+            content = content[0]
+        text = "".join(getattr(block, "text", "") for block in content)
+        return text.startswith("❌")
+
+    return {"tools": await measure_tools(call, tools, calls)}
+
+
+async def bench_stdio(env: Dict[str, str], tools: List[str], args) -> Dict:
+    report = {"cold_start": {"python": await cold_start("python", env, args.runs)}}
+    if shutil.which("uv"):
+        report["cold_start"]["uv"] = await cold_start("uv", env, args.runs)
+        report["cold_start"]["uv_overhead_ms"] = round(
+            report["cold_start"]["uv"]["initialize_ms"] - report["cold_start"]["python"]["initialize_ms"], 2)
+
+    with open(os.devnull, "w") as errlog:
+        async with stdio_session("python", env, errlog) as session:
+            await session.initialize()
+            call = session_caller(session)
+            report["tools"] = await measure_tools(call, tools, args.calls)
+            variants = args.calls if args.cassette else 0
+            report["throughput"] = await measure_throughput(call, args.duration, args.concurrency, variants)
+    return report
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def wait_until_ready(base_url: str, process: subprocess.Popen, timeout: float = 60) -> None:
+    deadline = time.perf_counter() + timeout
+    while time.perf_counter() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"HTTP server exited with code {process.returncode}")
+        with contextlib.suppress(OSError):
+            with urllib.request.urlopen(f"{base_url}/healthz", timeout=1) as response:
+                if response.status == 200:
+                    return
+        time.sleep(0.05)
+    raise RuntimeError(f"HTTP server not ready after {timeout:.0f}s")
+
+
+async def bench_http(env: Dict[str, str], tools: List[str], args) -> Dict:
+    port = free_port()
+    base_url = f"http://127.0.0.1:{port}"
+    started = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, SCRIPT, "--serve", "http", "--port", str(port), "--workers", str(args.workers)],
+        cwd=project_root, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    try:
+        wait_until_ready(base_url, process)
+        report = {"workers": args.workers, "server_ready_ms": round((time.perf_counter() - started) * 1000, 2)}
+
+        # A new session against a warm server: what each agent pays instead of a process spawn
+        connects = []
+        for _ in range(args.runs):
+            connect_started = time.perf_counter()
+            async with http_session(f"{base_url}/mcp") as session:
+                await session.initialize()
+                await session.list_tools()
+            connects.append((time.perf_counter() - connect_started) * 1000)
+        report["session_connect_ms"] = round(statistics.median(connects), 2)
+
+        async with http_session(f"{base_url}/mcp") as session:
+            await session.initialize()
+            call = session_caller(session)
+            report["tools"] = await measure_tools(call, tools, args.calls)
+            variants = args.calls if args.cassette else 0
+            report["throughput"] = await measure_throughput(call, args.duration, args.concurrency, variants)
+        return report
+    finally:
+        process.terminate()
+        with contextlib.suppress(subprocess.TimeoutExpired):
+            process.wait(timeout=30)
+
+
+async def benchmark(args) -> Dict:
+    tools = args.tools or list(TOOL_CALLS)
+    unknown = [tool for tool in tools if tool not in TOOL_CALLS]
+    if unknown:
+        raise SystemExit(f"Unknown tools: {', '.join(unknown)}")
+
+    with tempfile.TemporaryDirectory(prefix="mcp-transport-bench-") as cache_dir:
+        env = server_env(cache_dir, args)
+        report = {
+            "config": {
+                "python": platform.python_version(),
+                "platform": platform.platform(),
+                "upstreams": ("recorded" if args.record else "replayed") if args.cassette else "stubbed",
+                "upstream_ms": args.upstream_ms,
+                "calls": args.calls,
+                "runs": args.runs,
+            },
+            "transports": {},
+        }
+        if "stdio" in args.transports:
+            report["transports"]["stdio"] = await bench_stdio(env, tools, args)
+        if "http" in args.transports:
+            report["transports"]["http"] = await bench_http(env, tools, args)
+        if "direct" in args.transports:
+            report["transports"]["direct"] = await bench_direct(env, tools, args.calls)
+
+    direct = report["transports"].get("direct", {}).get("tools", {})
+    for transport in ("stdio", "http"):
+        measured = report["transports"].get(transport, {}).get("tools", {})
+        if direct and measured:
+            # Per-call cost of the transport: JSON-RPC framing, pipes or HTTP, session dispatch
+            report["transports"][transport]["overhead_p50_ms"] = {
+                tool: round(measured[tool]["p50_ms"] - direct[tool]["p50_ms"], 3) for tool in measured
+            }
+    return report
+
+
+# Metrics compared against a baseline report, as (path, lower is better)
+COMPARED = (
+    (("transports", "stdio", "cold_start", "python", "total_ms"), True),
+    (("transports", "stdio", "cold_start", "python", "import_ms"), True),
+    (("transports", "stdio", "throughput", "calls_per_second"), False),
+    (("transports", "http", "session_connect_ms"), True),
+    (("transports", "http", "throughput", "calls_per_second"), False),
+)
+
+
+def lookup(report: Dict, path) -> Optional[float]:
+    for key in path:
+        if not isinstance(report, dict) or key not in report:
+            return None
+        report = report[key]
+    return report
+
+
+def print_report(report: Dict, baseline: Optional[Dict]) -> None:
+    print("📡 MCP Transport Benchmark")
+    print("=" * 40)
+    config = report["config"]
+    upstreams = f"stub latency {config['upstream_ms']:.0f} ms" if config["upstreams"] == "stubbed" else config["upstreams"]
+    print(f"Upstreams {upstreams}, {config['calls']} warm calls per tool")
+
+    stdio = report["transports"].get("stdio")
+    if stdio:
+        print("\n🧊 Cold start over stdio (median):")
+        for launcher in ("python", "uv"):
+            cold = stdio["cold_start"].get(launcher)
+            if cold:
+                print(f"   {launcher:<6} ready {cold['initialize_ms']:7.1f} ms = interpreter {cold['interpreter_ms']:.1f} "
+                      f"+ import {cold['import_ms']:.1f} + handshake {cold['handshake_ms']:.1f}; "
+                      f"list_tools {cold['list_tools_ms']:.1f} ms, first call {cold['first_call_ms']:.1f} ms")
+    http = report["transports"].get("http")
+    if http:
+        print(f"\n🌐 HTTP: server ready in {http['server_ready_ms']:.0f} ms ({http['workers']} workers), "
+              f"new session {http['session_connect_ms']:.1f} ms")
+
+    transports = [t for t in ("direct", "stdio", "http") if report["transports"].get(t, {}).get("tools")]
+    print("\n⏱️  Warm call p50 / p95 (ms):")
+    print("   " + f"{'tool':<30}" + "".join(f"{t:>20}" for t in transports))
+    for tool in report["transports"][transports[0]]["tools"] if transports else ():
+        row = ""
+        for transport in transports:
+            stats = report["transports"][transport]["tools"][tool]
+            cell = f"{stats['p50_ms']:.2f} / {stats['p95_ms']:.2f}" + (" ❌" if stats["errors"] else "")
+            row += f"{cell:>20}"
+        print(f"   {tool:<30}{row}")
+
+    for transport in ("stdio", "http"):
+        throughput = report["transports"].get(transport, {}).get("throughput")
+        if throughput:
+            print(f"\n🚀 {transport} throughput: {throughput['calls_per_second']:.1f} calls/s with "
+                  f"{throughput['concurrency']} in flight (p95 {throughput['p95_ms']:.1f} ms, "
+                  f"{throughput['errors']} errors)")
+
+    if baseline:
+        print("\n📊 Against baseline:")
+        for path, lower_is_better in COMPARED:
+            old, new = lookup(baseline, path), lookup(report, path)
+            if not old or new is None:
+                continue
+            change = (new - old) / old * 100
+            better = change < 0 if lower_is_better else change > 0
+            print(f"   {'.'.join(path[1:]):<40} {old:10.1f} -> {new:10.1f} ({change:+.1f}% {'✅' if better else '⚠️'})")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the MCP server end to end over stdio and HTTP")
+    parser.add_argument("--transports", nargs="+", choices=["direct", "stdio", "http"],
+                        default=["direct", "stdio", "http"])
+    parser.add_argument("--tools", nargs="+", help="Tools to time (default: all with stub arguments)")
+    parser.add_argument("--calls", type=int, default=20, help="Warm calls per tool")
+    parser.add_argument("--runs", type=int, default=3, help="Cold starts / new sessions measured")
+    parser.add_argument("--upstream-ms", type=float, default=0, help="Latency of each stubbed upstream request")
+    parser.add_argument("--duration", type=float, default=5, help="Seconds of sustained load")
+    parser.add_argument("--concurrency", type=int, default=8, help="Calls in flight during sustained load")
+    parser.add_argument("--workers", type=int, default=1, help="HTTP worker processes")
+    parser.add_argument("--json", help="Write the report to this file")
+    parser.add_argument("--baseline", help="Earlier --json report to compare with")
+    parser.add_argument("--cassette", help="Replay upstream traffic from this cassette instead of stubs")
+    parser.add_argument("--record", action="store_true", help="Record live upstream traffic to --cassette (stdio only)")
+    parser.add_argument("--replay-timing", type=float, default=1.0,
+                        help="Factor applied to recorded upstream latency (0 replays instantly)")
+    parser.add_argument("--serve", choices=["stdio", "http"], help=argparse.SUPPRESS)
+    parser.add_argument("--port", type=int, default=8000, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.serve:
+        serve(args.serve, args.port, args.workers)
+        return 0
+    if args.record:
+        if not args.cassette:
+            parser.error("--record needs --cassette")
+        # One server process records; several would overwrite each other's cassette
+        args.transports = ["stdio"]
+
+    report = asyncio.run(benchmark(args))
+    baseline = None
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+    print_report(report, baseline)
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"\n📝 Report written to {args.json}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,210 @@
+#!/usr/bin/env python3
+"""
+Concurrent Batch Runner for Agent Conversations
+
+Runs every prompt in a JSONL file as its own agent conversation, many at a
+time, over one shared MCP session pool:
+
+- a global limit on conversations in flight
+- an optional OpenAI request rate limit shared by all conversations
+- each result is appended to the output JSONL file as soon as it finishes
+- a report with throughput and p50/p90/p99 conversation latency
+
+Each input line is either a JSON string or an object with the prompt in
+"prompt", "message", "input" or "body" (so requests.jsonl works as-is) and
+an optional "id"/"request_id".
+
+Usage:
+    uv run client/batch_runner.py prompts.jsonl --out results.jsonl
+    uv run client/batch_runner.py prompts.jsonl --concurrency 16 --requests-per-second 5
+    uv run client/batch_runner.py prompts.jsonl --state-graph --timeout 120
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import os
+import sys
+import time
+from typing import Any, Dict, List, Optional
+
+from langchain_core.messages import ToolMessage
+from langchain_core.rate_limiters import InMemoryRateLimiter
+
+try:
+    # Try relative imports first (when run as module)
+    from .langgraph_agent import MCPLangGraphAgent
+except ImportError:
+    # Fall back to absolute imports (when run directly)
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from client.langgraph_agent import MCPLangGraphAgent
+
+PROMPT_FIELDS = ("prompt", "message", "input", "body")
+ID_FIELDS = ("id", "request_id")
+
+
+def load_prompts(path: str) -> List[Dict[str, str]]:
+    """Read {"id", "prompt"} pairs from a JSONL file, skipping blank lines."""
+    prompts = []
+    with open(path, encoding="utf-8") as prompt_file:
+        for line_number, line in enumerate(prompt_file, 1):
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            if isinstance(record, str):
+                record = {"prompt": record}
+            prompt = next((record[field] for field in PROMPT_FIELDS if record.get(field)), None)
+            if prompt is None:
+                raise ValueError(f"Line {line_number} of {path} has no prompt field ({', '.join(PROMPT_FIELDS)})")
+            prompt_id = next((record[field] for field in ID_FIELDS if record.get(field)), line_number)
+            prompts.append({"id": str(prompt_id), "prompt": prompt})
+    return prompts
+
+
+def percentile(values: List[float], q: float) -> Optional[float]:
+    """Nearest-rank percentile (q in 0-100) of a list of values."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(q / 100 * len(ordered)) - 1)]
+
+
+class BatchRunner:
+    """Runs many agent conversations at once with a global concurrency limit."""
+
+    def __init__(self, agent: MCPLangGraphAgent, concurrency: int = 8, use_state_graph: bool = False,
+                 timeout: Optional[float] = None):
+        """
+        Args:
+            agent: Agent whose graph runs every conversation (graphs hold no per-run state)
+            concurrency: Most conversations in flight at the same time
+            use_state_graph: Run the StateGraph agent instead of the ReAct agent
+            timeout: Seconds before a single conversation is abandoned
+        """
+        self.agent = agent
+        self.concurrency = max(1, concurrency)
+        self.use_state_graph = use_state_graph
+        self.timeout = timeout
+
+    async def run_one(self, item: Dict[str, str]) -> Dict[str, Any]:
+        graph = self.agent.state_graph if self.use_state_graph else self.agent.agent
+        started = time.perf_counter()
+        record = {"id": item["id"], "prompt": item["prompt"]}
+        try:
+            result = await asyncio.wait_for(
+                graph.ainvoke({"messages": [("user", item["prompt"])]}), self.timeout
+            )
+            messages = result["messages"]
+            record.update(
+                ok=True,
+                answer=messages[-1].content,
+                tool_calls=sum(isinstance(message, ToolMessage) for message in messages),
+            )
+        except asyncio.TimeoutError:
+            record.update(ok=False, error=f"Timed out after {self.timeout:.0f}s")
+        except Exception as e:
+            record.update(ok=False, error=f"{type(e).__name__}: {e}")
+        record["latency_ms"] = (time.perf_counter() - started) * 1000
+        return record
+
+    async def run(self, prompts: List[Dict[str, str]], output_path: str) -> Dict[str, Any]:
+        """
+        Run every prompt and stream results to output_path as they complete.
+
+        Returns:
+            Report with counts, throughput and latency percentiles
+        """
+        if not self.agent.agent:
+            await self.agent.initialize()
+
+        limit = asyncio.Semaphore(self.concurrency)
+        latencies, failed = [], 0
+
+        async def run_limited(item):
+            async with limit:
+                return await self.run_one(item)
+
+        started = time.perf_counter()
+        with open(output_path, "w", encoding="utf-8") as output:
+            for finished in asyncio.as_completed([run_limited(item) for item in prompts]):
+                record = await finished
+                output.write(json.dumps(record, default=str) + "\n")
+                output.flush()
+                latencies.append(record["latency_ms"])
+                failed += not record["ok"]
+        elapsed = time.perf_counter() - started
+
+        return {
+            "conversations": len(prompts),
+            "failed": failed,
+            "concurrency": self.concurrency,
+            "wall_seconds": elapsed,
+            "throughput_per_minute": len(prompts) / elapsed * 60 if elapsed else 0.0,
+            "latency_ms": {
+                "p50": percentile(latencies, 50),
+                "p90": percentile(latencies, 90),
+                "p99": percentile(latencies, 99),
+                "max": max(latencies, default=None),
+            },
+        }
+
+
+def print_report(report: Dict[str, Any]) -> None:
+    print("\n📦 Batch Run Report")
+    print("=" * 40)
+    print(f"Conversations: {report['conversations']} ({report['failed']} failed), "
+          f"concurrency {report['concurrency']}")
+    print(f"Wall time: {report['wall_seconds']:.1f} s, "
+          f"throughput {report['throughput_per_minute']:.1f} conversations/min")
+    latency = report["latency_ms"]
+    if latency["p50"] is not None:
+        print(f"Latency: p50 {latency['p50']:.0f} ms, p90 {latency['p90']:.0f} ms, "
+              f"p99 {latency['p99']:.0f} ms, max {latency['max']:.0f} ms")
+
+
+async def run_batch(args) -> Dict[str, Any]:
+    rate_limiter = None
+    if args.requests_per_second:
+        # Shared by every conversation, so the whole batch stays under the OpenAI limit
+        rate_limiter = InMemoryRateLimiter(
+            requests_per_second=args.requests_per_second,
+            check_every_n_seconds=0.05,
+            max_bucket_size=max(1, args.requests_per_second),
+        )
+    agent = MCPLangGraphAgent(server_url=args.server_url, rate_limiter=rate_limiter)
+    # One warm session per conversation in flight, up to the configured cap
+    agent.session_pool_size = min(args.concurrency, args.max_sessions)
+    runner = BatchRunner(agent, concurrency=args.concurrency, use_state_graph=args.state_graph,
+                         timeout=args.timeout)
+    try:
+        return await runner.run(load_prompts(args.prompts), args.out)
+    finally:
+        await agent.close(close_sessions=True)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Run a JSONL file of prompts as concurrent agent conversations")
+    parser.add_argument("prompts", help="JSONL file of prompts")
+    parser.add_argument("--out", default="batch_results.jsonl", help="JSONL file results are streamed to")
+    parser.add_argument("--concurrency", type=int, default=8, help="Conversations in flight at once")
+    parser.add_argument("--requests-per-second", type=float, default=None,
+                        help="OpenAI requests per second across all conversations")
+    parser.add_argument("--max-sessions", type=int, default=8, help="Most pooled MCP sessions")
+    parser.add_argument("--timeout", type=float, default=None, help="Seconds before a conversation is abandoned")
+    parser.add_argument("--state-graph", action="store_true", help="Use the StateGraph agent")
+    parser.add_argument("--server-url", default=None, help="Shared streamable HTTP server (or MCP_SERVER_URL)")
+    parser.add_argument("--json", help="Also write the report to this file")
+    args = parser.parse_args()
+
+    report = asyncio.run(run_batch(args))
+    print_report(report)
+    print(f"\n📝 Results written to {args.out}")
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+    return 1 if report["failed"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
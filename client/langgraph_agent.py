@@ -12,29 +12,70 @@ with your custom MCP server, using all the tools we've built:
 
 import asyncio
 import os
-from typing import List, Dict, Any
+import time
+from typing import List, Dict, Any, AsyncIterator, Optional
 
 from dotenv import load_dotenv
 from langchain_openai import ChatOpenAI
-from langchain_mcp_adapters.client import MultiServerMCPClient
 from langgraph.prebuilt import create_react_agent
 from langgraph.graph import StateGraph, MessagesState, START
 from langgraph.prebuilt import ToolNode, tools_condition
+from langchain_core.rate_limiters import BaseRateLimiter
+from langchain_core.runnables import RunnableConfig
+from langchain_core.tools import BaseTool, StructuredTool
+
+try:
+    # Try relative imports first (when run as module)
+    from .session_pool import close_shared_pools, get_shared_pool
+    from .tool_schema_cache import ToolSchemaCache, load_tools
+    from .tool_cache import ToolResultCache
+except ImportError:
+    # Fall back to absolute imports (when run directly)
+    from session_pool import close_shared_pools, get_shared_pool
+    from tool_schema_cache import ToolSchemaCache, load_tools
+    from tool_cache import ToolResultCache
 
 # Load environment variables
 load_dotenv()
 
 
+def bound_tool_calls(tools: List[BaseTool], limit: int) -> List[BaseTool]:
+    """
+    Copies of the async tools that share one semaphore with `limit` slots.
+
+    ToolNode gathers every call of a turn at once and max_concurrency only caps
+    the thread pool for sync tools, so async MCP calls are capped here.
+    """
+    semaphore = asyncio.Semaphore(limit)
+
+    def bound(tool: BaseTool) -> BaseTool:
+        if not isinstance(tool, StructuredTool) or tool.coroutine is None:
+            return tool
+        call_server = tool.coroutine
+
+        async def call_tool(**arguments):
+            async with semaphore:
+                return await call_server(**arguments)
+
+        return tool.model_copy(update={"coroutine": call_tool})
+
+    return [bound(tool) for tool in tools]
+
+
 class MCPLangGraphAgent:
     """A LangGraph agent that connects to your MCP server."""
     
-    def __init__(self, openai_api_key: str = None, server_path: str = None):
+    def __init__(self, openai_api_key: str = None, server_path: str = None, server_url: str = None,
+                 rate_limiter: Optional[BaseRateLimiter] = None):
         """
         Initialize the MCP LangGraph Agent.
         
         Args:
             openai_api_key: OpenAI API key (or set OPENAI_API_KEY env var)
             server_path: Absolute path to your server.py file
+            server_url: URL of a running streamable HTTP server, e.g. http://127.0.0.1:8000/mcp
+                (or set MCP_SERVER_URL env var). When set, no server process is spawned.
+            rate_limiter: Limits OpenAI requests, e.g. when many conversations share one key
         """
         self.openai_api_key = openai_api_key or os.getenv("OPENAI_API_KEY")
         if not self.openai_api_key:
@@ -48,20 +89,37 @@ class MCPLangGraphAgent:
         self.llm = ChatOpenAI(
             model="gpt-4o-mini",  # Using gpt-4o-mini for cost efficiency
             api_key=self.openai_api_key,
-            temperature=0.7
+            temperature=0.7,
+            rate_limiter=rate_limiter,
         )
         
         # MCP client configuration
-        self.mcp_config = {
-            "my-mcp-server": {
-                "command": "uv",
-                "args": ["--directory", current_dir, "run", "run_server.py"],
-                "transport": "stdio",
+        self.server_url = server_url or os.getenv("MCP_SERVER_URL")
+        if self.server_url:
+            # Share a warm HTTP server instead of spawning one per agent
+            self.mcp_config = {
+                "my-mcp-server": {
+                    "url": self.server_url,
+                    "transport": "streamable_http",
+                }
+            }
+        else:
+            self.mcp_config = {
+                "my-mcp-server": {
+                    "command": "uv",
+                    "args": ["--directory", current_dir, "run", "run_server.py"],
+                    "transport": "stdio",
+                }
             }
-        }
         
+        self.session_pool_size = int(os.getenv("MCP_SESSION_POOL_SIZE", "2"))
+        self.tool_concurrency = int(os.getenv("MCP_TOOL_CONCURRENCY", "4"))
+        cache_dir = os.getenv("MCP_CACHE_DIR", os.path.join(current_dir, ".cache"))
+        self.schema_cache = ToolSchemaCache(os.path.join(cache_dir, "tool_schemas.json"))
+        self.tool_cache = ToolResultCache.from_env()
         self.client = None
         self.tools = []
+        self.llm_with_tools = None
         self.agent = None
         self.state_graph = None
     
@@ -69,15 +127,25 @@ class MCPLangGraphAgent:
         """Initialize the MCP client and load tools."""
         print("🔌 Connecting to MCP server...")
         
-        self.client = MultiServerMCPClient(self.mcp_config)
-        self.tools = await self.client.get_tools()
+        # Warm sessions are shared by every agent using the same server config,
+        # so a tool call is a single round trip instead of a new session. There is
+        # one session per tool call that may run in parallel.
+        self.client = await get_shared_pool(
+            self.mcp_config["my-mcp-server"],
+            size=max(self.session_pool_size, self.tool_concurrency),
+        )
+        # Tool schemas come from the on-disk cache while the server's schema hash is unchanged
+        self.tools = await load_tools(self.client, self.schema_cache)
+        # Repeated calls with equivalent arguments are answered without a round trip
+        self.tools = self.tool_cache.wrap_tools(self.tools)
+        self.llm_with_tools = self.llm.bind_tools(self.tools)
         
         print(f"✅ Connected! Loaded {len(self.tools)} tools:")
         for tool in self.tools:
             print(f"   - {tool.name}: {tool.description}")
         
-        # Create the ReAct agent
-        self.agent = create_react_agent(self.llm, self.tools)
+        # Create the ReAct agent (with the model that already has the tools bound)
+        self.agent = create_react_agent(self.llm_with_tools, bound_tool_calls(self.tools, self.tool_concurrency))
         
         # Also create a StateGraph version for more advanced use cases
         self._create_state_graph()
@@ -86,20 +154,24 @@ class MCPLangGraphAgent:
     
     def _create_state_graph(self):
         """Create a StateGraph version of the agent for advanced workflows."""
-        def call_model(state: MessagesState):
-            response = self.llm.bind_tools(self.tools).invoke(state["messages"])
+        def call_model(state: MessagesState, config: RunnableConfig):
+            # Passing the config through lets astream_events see the model's tokens
+            response = self.llm_with_tools.invoke(state["messages"], config)
             return {"messages": response}
         
         builder = StateGraph(MessagesState)
         builder.add_node("call_model", call_model)
-        builder.add_node("tools", ToolNode(self.tools))
+        # ToolNode runs a turn's tool calls concurrently, results in call order
+        builder.add_node("tools", ToolNode(bound_tool_calls(self.tools, self.tool_concurrency)))
         builder.add_edge(START, "call_model")
         builder.add_conditional_edges(
             "call_model",
             tools_condition,
         )
         builder.add_edge("tools", "call_model")
-        self.state_graph = builder.compile()
+        # max_concurrency caps the thread pool that runs sync tools; async MCP
+        # calls are capped by bound_tool_calls
+        self.state_graph = builder.compile().with_config(max_concurrency=self.tool_concurrency)
     
     async def chat(self, message: str) -> str:
         """
@@ -145,6 +217,96 @@ class MCPLangGraphAgent:
         print(f"🤖 StateGraph Agent: {agent_message}")
         return agent_message
     
+    async def astream_chat(self, message: str, use_state_graph: bool = False) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Stream the agent's work on a message as it happens.
+
+        Args:
+            message: The user's message/question
+            use_state_graph: Run the StateGraph agent instead of the ReAct agent
+
+        Yields:
+            Event dicts with a "type" key:
+            - token: {"content"} - a chunk of model output text
+            - tool_start: {"name", "input"} - a tool call began
+            - tool_end: {"name", "output", "duration_ms"} - a tool call finished
+            - step: {"node", "duration_ms"} - a graph step (model call or tool node) finished
+            - done: {"content", "ttft_ms", "total_ms", "steps"} - the final answer and timings
+        """
+        if not self.agent:
+            await self.initialize()
+        graph = self.state_graph if use_state_graph else self.agent
+
+        started = time.perf_counter()
+        first_token_at = None
+        tool_starts, step_starts, steps = {}, {}, []
+        final_message = None
+
+        def elapsed_ms(since: float) -> float:
+            return (time.perf_counter() - since) * 1000
+
+        async for event in graph.astream_events({"messages": [("user", message)]}, version="v2"):
+            kind, run_id = event["event"], event["run_id"]
+            node = event.get("metadata", {}).get("langgraph_node")
+
+            if kind == "on_chat_model_stream":
+                content = event["data"]["chunk"].content
+                if content and isinstance(content, str):
+                    if first_token_at is None:
+                        first_token_at = time.perf_counter()
+                    yield {"type": "token", "content": content}
+            elif kind == "on_chat_model_end":
+                final_message = event["data"]["output"]
+            elif kind == "on_tool_start":
+                tool_starts[run_id] = time.perf_counter()
+                yield {"type": "tool_start", "name": event["name"], "input": event["data"].get("input")}
+            elif kind == "on_tool_end":
+                output = event["data"].get("output")
+                yield {
+                    "type": "tool_end",
+                    "name": event["name"],
+                    "output": getattr(output, "content", output),
+                    "duration_ms": elapsed_ms(tool_starts.pop(run_id, started)),
+                }
+            elif kind == "on_chain_start" and node and node != "__start__" and event["name"] == node:
+                step_starts[run_id] = time.perf_counter()
+            elif kind == "on_chain_end" and run_id in step_starts:
+                step = {"node": node, "duration_ms": elapsed_ms(step_starts.pop(run_id))}
+                steps.append(step)
+                yield {"type": "step", **step}
+
+        yield {
+            "type": "done",
+            "content": getattr(final_message, "content", ""),
+            "ttft_ms": (first_token_at - started) * 1000 if first_token_at else None,
+            "total_ms": elapsed_ms(started),
+            "steps": steps,
+        }
+
+    async def chat_streaming(self, message: str, use_state_graph: bool = False) -> str:
+        """
+        Like chat(), but prints tokens and tool activity as they arrive.
+
+        Returns:
+            The agent's response as a string
+        """
+        print(f"\n💬 User: {message}")
+        print("🤖 Agent: ", end="", flush=True)
+
+        answer = ""
+        async for event in self.astream_chat(message, use_state_graph):
+            if event["type"] == "token":
+                print(event["content"], end="", flush=True)
+            elif event["type"] == "tool_start":
+                print(f"\n   🔧 {event['name']}({event['input']})", flush=True)
+            elif event["type"] == "tool_end":
+                print(f"   ✅ {event['name']} finished in {event['duration_ms']:.0f} ms", flush=True)
+            elif event["type"] == "done":
+                answer = event["content"]
+                ttft = f"{event['ttft_ms']:.0f} ms" if event["ttft_ms"] is not None else "n/a"
+                print(f"\n⏱️ First token after {ttft}, total {event['total_ms']:.0f} ms")
+        return answer
+    
     async def run_examples(self):
         """Run example interactions to demonstrate capabilities."""
         examples = [
@@ -167,11 +329,17 @@ class MCPLangGraphAgent:
                 print(f"❌ Error with example '{example}': {e}")
                 print("-" * 50)
     
-    async def close(self):
-        """Clean up resources."""
-        if self.client:
-            # The MultiServerMCPClient will handle cleanup automatically
-            pass
+    async def close(self, close_sessions: bool = False):
+        """
+        Clean up resources.
+
+        Args:
+            close_sessions: Also close the shared MCP session pools. Leave this off
+                while other agents on the same event loop still need them.
+        """
+        self.client = None
+        if close_sessions:
+            await close_shared_pools()
         print("🔌 MCP connection closed.")
 
 
@@ -203,14 +371,14 @@ async def main():
             if user_input.lower() in ['quit', 'exit', 'bye']:
                 break
             if user_input:
-                await agent.chat(user_input)
+                await agent.chat_streaming(user_input)
         
     except KeyboardInterrupt:
         print("\n👋 Goodbye!")
     except Exception as e:
         print(f"❌ Error: {e}")
     finally:
-        await agent.close()
+        await agent.close(close_sessions=True)
 
 
 if __name__ == "__main__":
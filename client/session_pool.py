@@ -0,0 +1,284 @@
+"""
+Persistent MCP Session Pool
+
+MultiServerMCPClient.get_tools() returns tools that open a brand-new session
+for every call - with the STDIO transport that means spawning and initialising
+a server process per tool call. This module keeps a small pool of warm,
+initialised sessions instead:
+
+- each session lives in its own background task, which owns the transport
+  context for the session's whole lifetime
+- sessions idle for longer than the health-check interval are pinged before
+  use, and dead sessions are reconnected transparently
+- pools are shared per event loop and connection config, so several agent
+  instances and chat calls reuse the same warm sessions
+
+A pool exposes list_tools() and call_tool() like a ClientSession, so it can be
+passed straight to langchain_mcp_adapters' load_mcp_tools().
+"""
+
+import asyncio
+import contextlib
+import json
+import time
+import weakref
+from typing import Any, Dict, Optional
+
+import anyio
+from langchain_mcp_adapters.sessions import create_session
+from mcp.shared.exceptions import McpError
+from mcp.types import CONNECTION_CLOSED
+
+# Errors that mean the session itself is gone, not that the tool failed
+DISCONNECT_ERRORS = (
+    anyio.ClosedResourceError,
+    anyio.BrokenResourceError,
+    anyio.EndOfStream,
+    ConnectionError,
+    EOFError,
+)
+
+
+def is_disconnect(error: BaseException) -> bool:
+    if isinstance(error, McpError):
+        return error.error.code == CONNECTION_CLOSED
+    return isinstance(error, DISCONNECT_ERRORS)
+
+
+class PooledSession:
+    """One MCP session kept open by a dedicated background task."""
+
+    def __init__(self, connection: Dict[str, Any]):
+        self.connection = connection
+        self.session = None
+        self.server_info = None
+        self.instructions: Optional[str] = None
+        self.error: Optional[BaseException] = None
+        self.last_used = 0.0
+        self.broken = False
+        self._ready = asyncio.Event()
+        self._stop = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def connected(self) -> bool:
+        return self.session is not None and not self.broken
+
+    async def connect(self, timeout: float = 60.0) -> None:
+        """Start the session task and wait until the session is initialised."""
+        self._task = asyncio.create_task(self._run(), name="mcp-pooled-session")
+        try:
+            await asyncio.wait_for(self._ready.wait(), timeout)
+        except asyncio.TimeoutError:
+            await self.close()
+            raise ConnectionError(f"Timed out after {timeout:.0f}s connecting to the MCP server")
+        if self.session is None:
+            raise ConnectionError(f"Could not connect to the MCP server: {self.error}") from self.error
+        self.last_used = time.monotonic()
+
+    async def _run(self) -> None:
+        # The transport's context must be entered and exited in the same task
+        try:
+            async with create_session(self.connection) as session:
+                initialized = await session.initialize()
+                self.server_info = initialized.serverInfo
+                self.instructions = initialized.instructions
+                self.session = session
+                self._ready.set()
+                await self._stop.wait()
+        except Exception as e:
+            self.error = e
+        finally:
+            self.session = None
+            self._ready.set()
+
+    async def close(self) -> None:
+        self._stop.set()
+        if self._task is not None:
+            with contextlib.suppress(Exception, asyncio.CancelledError):
+                await asyncio.wait_for(self._task, 10)
+            self._task = None
+
+
+class MCPSessionPool:
+    """A fixed-size pool of warm MCP sessions for one server connection."""
+
+    def __init__(self, connection: Dict[str, Any], size: int = 2, health_check_interval: float = 30.0,
+                 ping_timeout: float = 5.0, connect_timeout: float = 60.0):
+        """
+        Args:
+            connection: langchain-mcp-adapters connection config (stdio or streamable_http)
+            size: Number of sessions, i.e. tool calls that can run at the same time
+            health_check_interval: Sessions idle for longer than this are pinged before use
+            ping_timeout: Seconds to wait for a ping reply before reconnecting
+            connect_timeout: Seconds to wait for a new session to initialise
+        """
+        self.connection = connection
+        self.size = size
+        self.health_check_interval = health_check_interval
+        self.ping_timeout = ping_timeout
+        self.connect_timeout = connect_timeout
+
+        self._idle: "asyncio.Queue[PooledSession]" = asyncio.Queue()
+        self._slots = []
+        self._start_lock = asyncio.Lock()
+        self.started = False
+        self.closed = False
+
+        self.calls = 0
+        self.tool_listings = 0
+        self.connects = 0
+        self.reconnects = 0
+
+    async def start(self) -> "MCPSessionPool":
+        """Open every session in the pool (safe to call more than once)."""
+        async with self._start_lock:
+            if self.started:
+                return self
+            self._slots = [PooledSession(self.connection) for _ in range(self.size)]
+            results = await asyncio.gather(*(self._connect(slot) for slot in self._slots),
+                                           return_exceptions=True)
+            if all(isinstance(result, BaseException) for result in results):
+                await self.close()
+                raise results[0]
+            for slot in self._slots:
+                # Failed slots are reconnected on first use
+                self._idle.put_nowait(slot)
+            self.started = True
+        return self
+
+    async def _connect(self, slot: PooledSession) -> None:
+        await slot.connect(self.connect_timeout)
+        self.connects += 1
+
+    async def _replace(self, slot: PooledSession) -> PooledSession:
+        """Close a dead session and put an unconnected one in its place."""
+        await slot.close()
+        replacement = PooledSession(self.connection)
+        self._slots[self._slots.index(slot)] = replacement
+        self.reconnects += 1
+        return replacement
+
+    async def _is_alive(self, slot: PooledSession) -> bool:
+        """Ping sessions that have been idle for a while; a dead server never answers."""
+        if not slot.connected:
+            return False
+        if time.monotonic() - slot.last_used <= self.health_check_interval:
+            return True
+        try:
+            await asyncio.wait_for(slot.session.send_ping(), self.ping_timeout)
+            return True
+        except Exception:
+            return False
+
+    @contextlib.asynccontextmanager
+    async def acquire(self):
+        """Borrow a healthy session for the duration of the block."""
+        if self.closed:
+            raise RuntimeError("The MCP session pool is closed")
+        if not self.started:
+            await self.start()
+
+        slot = await self._idle.get()
+        try:
+            if not await self._is_alive(slot):
+                slot = await self._replace(slot)
+                await self._connect(slot)
+            yield slot.session
+        except BaseException as e:
+            if is_disconnect(e):
+                slot.broken = True
+            raise
+        finally:
+            slot.last_used = time.monotonic()
+            self._idle.put_nowait(slot)
+
+    async def _with_session(self, method: str, *args, **kwargs):
+        """Run a session method, retrying once on a fresh session if the connection dropped."""
+        for attempt in range(2):
+            try:
+                async with self.acquire() as session:
+                    return await getattr(session, method)(*args, **kwargs)
+            except Exception as e:
+                if attempt or not is_disconnect(e):
+                    raise
+
+    @property
+    def server_version(self) -> Optional[str]:
+        """serverInfo.version reported by the server at initialize."""
+        for slot in self._slots:
+            if slot.server_info is not None:
+                return slot.server_info.version
+        return None
+
+    @property
+    def server_instructions(self) -> Optional[str]:
+        """Instructions sent by the server at initialize."""
+        for slot in self._slots:
+            if slot.server_info is not None:
+                return slot.instructions
+        return None
+
+    async def list_tools(self, cursor: Optional[str] = None):
+        self.tool_listings += 1
+        return await self._with_session("list_tools", cursor=cursor)
+
+    async def call_tool(self, name: str, arguments: Optional[Dict[str, Any]] = None, **kwargs):
+        """
+        Call a tool on a pooled session (one STDIO/HTTP round trip).
+
+        Extra keyword arguments (progress_callback, read_timeout_seconds, ...)
+        are passed through to ClientSession.call_tool.
+        """
+        self.calls += 1
+        return await self._with_session("call_tool", name, arguments, **kwargs)
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "size": self.size,
+            "idle": self._idle.qsize(),
+            "connected": sum(slot.connected for slot in self._slots),
+            "calls": self.calls,
+            "tool_listings": self.tool_listings,
+            "connects": self.connects,
+            "reconnects": self.reconnects,
+        }
+
+    async def close(self) -> None:
+        self.closed = True
+        await asyncio.gather(*(slot.close() for slot in self._slots))
+
+
+# Event loop -> connection config -> pool. Loops are held weakly, and pools of
+# closed loops are dropped on the next lookup, so neither leaks
+_shared_pools: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[str, MCPSessionPool]]" = \
+    weakref.WeakKeyDictionary()
+
+
+def _drop_closed_loops() -> None:
+    for loop in [loop for loop in list(_shared_pools) if loop.is_closed()]:
+        # Their sessions died with the loop and cannot be closed from another one
+        for pool in _shared_pools.pop(loop).values():
+            pool.closed = True
+
+
+async def get_shared_pool(connection: Dict[str, Any], size: int = 2, **options) -> MCPSessionPool:
+    """
+    Return the started pool for this connection config, creating it on first use.
+
+    Pools are keyed by event loop as well, since sessions cannot be shared
+    across loops.
+    """
+    _drop_closed_loops()
+    pools = _shared_pools.setdefault(asyncio.get_running_loop(), {})
+    key = json.dumps(connection, sort_keys=True, default=str)
+    pool = pools.get(key)
+    if pool is None or pool.closed:
+        pool = pools[key] = MCPSessionPool(connection, size=size, **options)
+    return await pool.start()
+
+
+async def close_shared_pools() -> None:
+    """Close every shared pool created on the running event loop."""
+    for pool in _shared_pools.pop(asyncio.get_running_loop(), {}).values():
+        await pool.close()
@@ -0,0 +1,182 @@
+"""
+Client-Side Tool Result Cache
+
+Agents often re-ask equivalent questions that end in the same tool call,
+e.g. github_get_repository_info for a popular repository. ToolResultCache
+memoises tool results by tool name and canonicalised arguments, with a TTL
+per tool, so a repeated call is answered in the client without an MCP round
+trip. Tools whose output is random or reflects live server state (dice
+rolls, generated posts and images, metrics) are never cached, and neither
+are failures (the server reports them as "❌ ..." text) or trimmed results
+carrying a single-use continuation handle.
+"""
+
+import json
+import os
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from langchain_core.tools import BaseTool, StructuredTool
+
+# Seconds a result stays fresh; 0 means the tool is never cached
+DEFAULT_TTLS = {
+    "web_search": 300,
+    "web_search_many": 300,
+    "github_search_repositories": 300,
+    "github_get_repository_info": 600,
+    "github_get_repositories_info": 600,
+    "github_get_file_content": 600,
+    "github_list_files": 600,
+    "github_auth_status": 60,
+    # Different output on every call, or live server state
+    "roll_dice": 0,
+    "create_social_post": 0,
+    "create_quote_card": 0,
+    "get_slide_image": 0,
+    "fetch_continuation": 0,
+    "server_metrics": 0,
+    "server_profile": 0,
+}
+
+# Arguments whose case does not change the result (GitHub names, search queries)
+CASE_INSENSITIVE_ARGUMENTS = {"owner", "repo", "repositories", "query", "queries"}
+
+
+def parse_ttls(spec: str) -> Dict[str, float]:
+    """Parse "tool=seconds,tool=seconds" into a mapping, ignoring malformed entries."""
+    ttls = {}
+    for entry in spec.split(","):
+        name, _, value = entry.partition("=")
+        try:
+            ttls[name.strip()] = float(value)
+        except ValueError:
+            continue
+    ttls.pop("", None)
+    return ttls
+
+
+# Trimmed responses point at a continuation that can only be fetched once
+CONTINUATION_MARKERS = ("fetch_continuation(", '"continuation":')
+
+
+def result_text(result: Any) -> str:
+    """Text of a tool result, whether plain text or (content blocks, artifact) from an MCP tool."""
+    content = result[0] if isinstance(result, tuple) else result
+    if isinstance(content, str):
+        return content
+    if isinstance(content, list):
+        return "".join(
+            block if isinstance(block, str)
+            else block.get("text", "") if isinstance(block, dict)
+            else getattr(block, "text", "")
+            for block in content
+        )
+    return ""
+
+
+def is_cacheable(result: Any) -> bool:
+    """Whether a result may be replayed: not a failure and not holding a continuation handle."""
+    text = result_text(result)
+    return not text.lstrip().startswith("❌") and not any(marker in text for marker in CONTINUATION_MARKERS)
+
+
+def canonical_value(value: Any, fold_case: bool = False) -> Any:
+    if isinstance(value, str):
+        value = " ".join(value.split())
+        return value.lower() if fold_case else value
+    if isinstance(value, (list, tuple)):
+        return [canonical_value(item, fold_case) for item in value]
+    if isinstance(value, dict):
+        return canonical_arguments(value)
+    return value
+
+
+def canonical_arguments(arguments: Dict[str, Any]) -> Dict[str, Any]:
+    """Normalise arguments so equivalent calls share a cache entry."""
+    return {
+        name: canonical_value(value, name in CASE_INSENSITIVE_ARGUMENTS)
+        for name, value in sorted(arguments.items())
+        if value is not None
+    }
+
+
+class ToolResultCache:
+    """In-memory LRU of tool results with per-tool TTLs."""
+
+    def __init__(self, ttls: Optional[Dict[str, float]] = None, default_ttl: float = 0,
+                 max_entries: int = 512, clock: Callable[[], float] = time.monotonic):
+        """
+        Args:
+            ttls: Seconds each tool's results stay fresh (merged over DEFAULT_TTLS)
+            default_ttl: TTL for tools not listed, 0 leaves them uncached
+            max_entries: Most results kept; the least recently used go first (0 disables the cache)
+            clock: Time source, replaceable in tests
+        """
+        self.ttls = {**DEFAULT_TTLS, **(ttls or {})}
+        self.default_ttl = default_ttl
+        self.max_entries = max_entries
+        self.clock = clock
+        self._entries: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    @classmethod
+    def from_env(cls) -> "ToolResultCache":
+        return cls(
+            ttls=parse_ttls(os.getenv("MCP_TOOL_CACHE_TTLS", "")),
+            default_ttl=float(os.getenv("MCP_TOOL_CACHE_DEFAULT_TTL", "0")),
+            max_entries=int(os.getenv("MCP_TOOL_CACHE_SIZE", "512")),
+        )
+
+    def ttl(self, tool_name: str) -> float:
+        if self.max_entries <= 0:
+            return 0
+        return self.ttls.get(tool_name, self.default_ttl)
+
+    @staticmethod
+    def key(tool_name: str, arguments: Dict[str, Any]) -> str:
+        return json.dumps([tool_name, canonical_arguments(arguments)], sort_keys=True, default=str)
+
+    def get(self, key: str) -> Optional[Any]:
+        entry = self._entries.get(key)
+        if entry is None or entry[0] <= self.clock():
+            self._entries.pop(key, None)
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry[1]
+
+    def put(self, tool_name: str, key: str, result: Any) -> None:
+        self._entries[key] = (self.clock() + self.ttl(tool_name), result)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def wrap_tool(self, tool: BaseTool) -> BaseTool:
+        """Return a copy of an MCP tool that answers repeated calls from the cache."""
+        if self.ttl(tool.name) <= 0 or not isinstance(tool, StructuredTool) or tool.coroutine is None:
+            return tool
+        call_server = tool.coroutine
+
+        async def call_tool(**arguments):
+            key = self.key(tool.name, arguments)
+            result = self.get(key)
+            if result is None:
+                # Failed calls ("❌ ..." replies or a ToolException) are never cached
+                result = await call_server(**arguments)
+                if is_cacheable(result):
+                    self.put(tool.name, key, result)
+            return result
+
+        return tool.model_copy(update={"coroutine": call_tool})
+
+    def wrap_tools(self, tools: List[BaseTool]) -> List[BaseTool]:
+        return [self.wrap_tool(tool) for tool in tools]
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def stats(self) -> Dict[str, int]:
+        return {"entries": len(self._entries), "hits": self.hits, "misses": self.misses}
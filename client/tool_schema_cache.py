@@ -0,0 +1,113 @@
+"""
+On-Disk Tool Schema Cache
+
+The server advertises a hash of its tool schemas ("tools-<hash>") on a
+"Tool schema version:" line of its initialize instructions. Tool schemas fetched with
+list_tools are stored on disk under that hash, so later startups against an
+unchanged server build their LangChain tools from the cache without a
+list_tools round trip or re-parsing the schemas from the wire.
+"""
+
+import json
+import os
+import threading
+from typing import Dict, List, Optional
+
+from langchain_core.tools import BaseTool
+from langchain_mcp_adapters.tools import convert_mcp_tool_to_langchain_tool
+from mcp.types import Tool
+
+# Line of the server's instructions carrying the hash (see server/main.py)
+SCHEMA_LINE = "Tool schema version: "
+VERSION_PREFIX = "tools-"
+
+
+def schema_version(instructions: Optional[str]) -> Optional[str]:
+    """The tool schema hash advertised in a server's instructions, if any."""
+    for line in (instructions or "").splitlines():
+        if line.startswith(SCHEMA_LINE):
+            return line[len(SCHEMA_LINE):].strip()
+    return None
+
+
+def server_key(connection: Dict) -> str:
+    """Identify a server by its connection config."""
+    return json.dumps(connection, sort_keys=True, default=str)
+
+
+class ToolSchemaCache:
+    """JSON file mapping each server to its last seen schema version and tools."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def _read(self) -> Dict:
+        try:
+            with open(self.path, encoding="utf-8") as cache_file:
+                return json.load(cache_file)
+        except (OSError, ValueError):
+            return {}
+
+    def get(self, connection: Dict, version: Optional[str]) -> Optional[List[Tool]]:
+        """Cached tools for this server, if it still advertises the same version."""
+        if not version or not version.startswith(VERSION_PREFIX):
+            return None
+        with self._lock:
+            entry = self._read().get(server_key(connection))
+        if not entry or entry.get("version") != version:
+            return None
+        try:
+            return [Tool.model_validate(tool) for tool in entry["tools"]]
+        except (KeyError, ValueError):
+            return None
+
+    def put(self, connection: Dict, version: Optional[str], tools: List[Tool]) -> None:
+        if not version or not version.startswith(VERSION_PREFIX):
+            return
+        with self._lock:
+            entries = self._read()
+            entries[server_key(connection)] = {
+                "version": version,
+                "tools": [tool.model_dump(mode="json", exclude_none=True) for tool in tools],
+            }
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            # Write then rename, so a concurrent reader never sees half a file
+            temporary_path = f"{self.path}.{os.getpid()}.tmp"
+            with open(temporary_path, "w", encoding="utf-8") as cache_file:
+                json.dump(entries, cache_file)
+            os.replace(temporary_path, self.path)
+
+
+async def list_all_tools(session) -> List[Tool]:
+    """Fetch every tool from a session (or session pool), following pagination."""
+    tools, cursor = [], None
+    while True:
+        page = await session.list_tools(cursor=cursor)
+        tools.extend(page.tools)
+        cursor = page.nextCursor
+        if not cursor:
+            return tools
+
+
+async def load_tools(pool, cache: Optional[ToolSchemaCache] = None) -> List[BaseTool]:
+    """
+    Build LangChain tools bound to a session pool.
+
+    Args:
+        pool: Started MCPSessionPool (its sessions are initialised, so the
+            server's schema hash is already known)
+        cache: Schema cache to read from and update (None always lists tools)
+
+    Returns:
+        LangChain tools whose calls go through the pool
+    """
+    version = schema_version(pool.server_instructions)
+    tools = cache.get(pool.connection, version) if cache else None
+    if tools is None:
+        tools = await list_all_tools(pool)
+        if cache:
+            cache.put(pool.connection, version, tools)
+    return [convert_mcp_tool_to_langchain_tool(pool, tool) for tool in tools]
@@ -3,8 +3,13 @@
 Main entry point for running the MCP server.
 
 This script provides a convenient way to start the MCP server from the project root.
+
+Usage:
+    uv run run_server.py                                  # stdio (spawned per client)
+    uv run run_server.py --transport http --workers 4     # shared streamable HTTP server
 """
 
+import argparse
 import sys
 import os
 
@@ -12,9 +17,28 @@ import os
 project_root = os.path.dirname(os.path.abspath(__file__))
 sys.path.insert(0, project_root)
 
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Run the MCP server")
+    parser.add_argument("--transport", choices=["stdio", "http"],
+                        default=os.getenv("MCP_TRANSPORT", "stdio"),
+                        help="stdio for a per-client process, http for a shared streamable HTTP server")
+    parser.add_argument("--host", default=os.getenv("MCP_HTTP_HOST", "127.0.0.1"))
+    parser.add_argument("--port", type=int, default=int(os.getenv("MCP_HTTP_PORT", "8000")))
+    parser.add_argument("--workers", type=int, default=int(os.getenv("MCP_HTTP_WORKERS", "2")),
+                        help="Number of HTTP worker processes sharing the port")
+    parser.add_argument("--graceful-timeout", type=int, default=30,
+                        help="Seconds to let in-flight HTTP requests finish on shutdown")
+    return parser.parse_args()
+
+
 if __name__ == "__main__":
+    args = parse_args()
+
     # Import and run the server module
     from server import main
-    # The server/main.py has if __name__ == "__main__" that runs mcp.run()
-    # But since we're importing it as a module, we need to run it manually
-    main.mcp.run(transport="stdio")
+
+    if args.transport == "http":
+        main.run_http(args.host, args.port, args.workers, args.graceful_timeout)
+    else:
+        main.run_stdio()
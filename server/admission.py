@@ -0,0 +1,230 @@
+"""
+Admission Control and Load Shedding for Tool Calls
+
+Without admission control every tool call is accepted, so one client
+spamming web_search makes latency grow for everyone. AdmissionController
+sits in front of the tools and decides, per call, whether it runs now, waits
+or is rejected:
+
+- Per-tool and per-client concurrency limits, so a saturated upstream or a
+  noisy client only slows itself down
+- Bounded wait queues per tool and per client
+- Deadline-aware shedding: a call is rejected on arrival when its estimated
+  queue wait (from the tool's recent run times) would exceed the deadline of
+  its priority class, and dropped if the deadline passes while it waits
+- Priority classes: waiting calls are granted slots in priority order, and
+  "interactive" tools (dice, continuations, metrics) are exempt from the
+  per-client limit so they stay fast while upstream-bound tools saturate
+
+All bookkeeping happens on the event loop, so no locks are needed.
+"""
+
+import asyncio
+import functools
+import inspect
+import itertools
+import time
+from collections import Counter
+from typing import Callable, Dict, List, Optional
+
+try:
+    # Try relative imports first (when run as module)
+    from .tracing import set_attribute
+except ImportError:
+    # Fall back to absolute imports (when run directly)
+    from tracing import set_attribute
+
+# Lower value is served first
+PRIORITIES = {"interactive": 0, "standard": 1, "bulk": 2}
+DEFAULT_DEADLINES = {"interactive": 5, "standard": 30, "bulk": 60}
+
+
+class AdmissionRejected(RuntimeError):
+    """Raised when a call is shed instead of admitted."""
+
+    def __init__(self, reason: str, message: str):
+        super().__init__(message)
+        self.reason = reason
+
+
+class _Waiter:
+    __slots__ = ("rank", "tool", "client", "limited", "future", "granted")
+
+    def __init__(self, rank, tool: str, client: str, limited: bool, future: asyncio.Future):
+        self.rank = rank
+        self.tool = tool
+        self.client = client
+        self.limited = limited
+        self.future = future
+        self.granted = False
+
+
+class AdmissionController:
+    """Per-tool and per-client concurrency limits with priority queues and deadline shedding."""
+
+    def __init__(self, tool_limits: Optional[Dict[str, int]] = None, tool_queues: Optional[Dict[str, int]] = None,
+                 default_tool_limit: int = 16, default_tool_queue: int = 64, client_limit: int = 8,
+                 client_queue: int = 32, deadlines: Optional[Dict[str, float]] = None,
+                 client_id: Callable[[], str] = lambda: "local", clock: Callable[[], float] = time.monotonic):
+        """
+        Args:
+            tool_limits: Calls of each tool allowed to run at once
+            tool_queues: Calls of each tool allowed to wait
+            default_tool_limit: Limit for tools not listed in tool_limits
+            default_tool_queue: Queue bound for tools not listed in tool_queues
+            client_limit: Non-interactive calls one client may run at once
+            client_queue: Non-interactive calls one client may have waiting
+            deadlines: Seconds a call of each priority class may wait (merged over DEFAULT_DEADLINES)
+            client_id: Returns the identity of the current caller
+            clock: Time source, replaceable in tests
+        """
+        self.tool_limits = tool_limits or {}
+        self.tool_queues = tool_queues or {}
+        self.default_tool_limit = default_tool_limit
+        self.default_tool_queue = default_tool_queue
+        self.client_limit = client_limit
+        self.client_queue = client_queue
+        self.deadlines = {**DEFAULT_DEADLINES, **(deadlines or {})}
+        self.client_id = client_id
+        self.clock = clock
+
+        self._waiters: List[_Waiter] = []
+        self._sequence = itertools.count()
+        self._running_tools = Counter()
+        self._running_clients = Counter()
+        self._queued_tools = Counter()
+        self._queued_clients = Counter()
+        # Exponentially weighted run time per tool, for wait estimates
+        self._service_seconds: Dict[str, float] = {}
+        self._admitted = Counter()
+        self._shed = Counter()
+
+    def tool_limit(self, tool: str) -> int:
+        return max(1, self.tool_limits.get(tool, self.default_tool_limit))
+
+    def _has_capacity(self, tool: str, client: str, limited: bool) -> bool:
+        if self._running_tools[tool] >= self.tool_limit(tool):
+            return False
+        return not limited or self._running_clients[client] < self.client_limit
+
+    def _start(self, tool: str, client: str, limited: bool) -> None:
+        self._running_tools[tool] += 1
+        if limited:
+            self._running_clients[client] += 1
+        self._admitted[tool] += 1
+
+    def _estimated_wait(self, tool: str, rank) -> float:
+        """Seconds until a call of this rank would get a slot, from the tool's recent run times."""
+        ahead = sum(1 for waiter in self._waiters if waiter.tool == tool and waiter.rank < rank)
+        return (ahead // self.tool_limit(tool) + 1) * self._service_seconds.get(tool, 0.0)
+
+    def _reject(self, tool: str, reason: str, message: str) -> AdmissionRejected:
+        self._shed[(tool, reason)] += 1
+        return AdmissionRejected(reason, message)
+
+    async def acquire(self, tool: str, priority: str = "standard") -> str:
+        """
+        Wait for a slot to run tool.
+
+        Returns:
+            The client the slot is held for (pass it to release)
+
+        Raises:
+            AdmissionRejected: If the call is shed
+        """
+        client = self.client_id()
+        limited = priority != "interactive"
+        if self._has_capacity(tool, client, limited):
+            self._start(tool, client, limited)
+            return client
+
+        if self._queued_tools[tool] >= self.tool_queues.get(tool, self.default_tool_queue):
+            raise self._reject(tool, "queue_full", f"too many pending '{tool}' calls")
+        if limited and self._queued_clients[client] >= self.client_queue:
+            raise self._reject(tool, "client_queue_full", "too many pending calls from this client")
+
+        deadline = self.deadlines.get(priority, self.deadlines["standard"])
+        rank = (PRIORITIES.get(priority, PRIORITIES["standard"]), next(self._sequence))
+        if self._estimated_wait(tool, rank) > deadline:
+            raise self._reject(tool, "deadline", f"'{tool}' is saturated and would not start within {deadline:g}s")
+
+        waiter = _Waiter(rank, tool, client, limited, asyncio.get_running_loop().create_future())
+        self._waiters.append(waiter)
+        self._waiters.sort(key=lambda queued: queued.rank)
+        self._queued_tools[tool] += 1
+        if limited:
+            self._queued_clients[client] += 1
+        queued_at = self.clock()
+        try:
+            await asyncio.wait_for(asyncio.shield(waiter.future), deadline)
+        except asyncio.TimeoutError:
+            if not waiter.granted:
+                self._dequeue(waiter)
+                raise self._reject(tool, "expired", f"'{tool}' did not start within {deadline:g}s")
+        except asyncio.CancelledError:
+            if waiter.granted:
+                self.release(tool, client, priority)
+            else:
+                self._dequeue(waiter)
+            raise
+        set_attribute("admission.wait_ms", round((self.clock() - queued_at) * 1000, 1))
+        return client
+
+    def _dequeue(self, waiter: _Waiter) -> None:
+        self._waiters.remove(waiter)
+        self._queued_tools[waiter.tool] -= 1
+        if waiter.limited:
+            self._queued_clients[waiter.client] -= 1
+
+    def release(self, tool: str, client: str, priority: str, seconds: Optional[float] = None) -> None:
+        """Free a slot (recording how long the call ran) and hand it to the best waiting call that fits."""
+        self._running_tools[tool] -= 1
+        if priority != "interactive":
+            self._running_clients[client] -= 1
+        if seconds is not None:
+            previous = self._service_seconds.get(tool)
+            self._service_seconds[tool] = seconds if previous is None else 0.8 * previous + 0.2 * seconds
+        self._dispatch()
+
+    def _dispatch(self) -> None:
+        # Waiters are in priority order; ones blocked by their client's limit are skipped, not waited on
+        for waiter in list(self._waiters):
+            if waiter.future.done() or not self._has_capacity(waiter.tool, waiter.client, waiter.limited):
+                continue
+            self._dequeue(waiter)
+            self._start(waiter.tool, waiter.client, waiter.limited)
+            waiter.granted = True
+            waiter.future.set_result(None)
+
+    def admit(self, func: Callable, tool: str, priority: str = "standard") -> Callable:
+        """Wrap a tool so each call passes admission control first."""
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            try:
+                client = await self.acquire(tool, priority)
+            except AdmissionRejected as e:
+                set_attribute("admission.shed", e.reason)
+                return f"❌ Server busy: {e}, please try again shortly"
+            started = self.clock()
+            try:
+                result = func(*args, **kwargs)
+                if inspect.isawaitable(result):
+                    result = await result
+                return result
+            finally:
+                self.release(tool, client, priority, self.clock() - started)
+        return wrapper
+
+    def stats(self) -> Dict[str, Dict]:
+        """Running, queued, admitted and shed calls per tool."""
+        tools = set(self._admitted) | {tool for tool, _ in self._shed}
+        return {
+            tool: {
+                "running": self._running_tools[tool],
+                "queued": self._queued_tools[tool],
+                "admitted": self._admitted[tool],
+                "shed": {reason: count for (name, reason), count in self._shed.items() if name == tool},
+                "run_ms_avg": self._service_seconds.get(tool, 0.0) * 1000,
+            }
+            for tool in sorted(tools)
+        }
@@ -0,0 +1,23 @@
+"""
+Environment Configuration Helpers
+
+Small parsers for the optional MCP_* settings read from the environment/.env.
+"""
+
+import os
+from typing import Dict
+
+
+def parse_int_mapping(spec: str) -> Dict[str, int]:
+    """Parse "name=value,name=value" into a mapping, ignoring malformed entries."""
+    mapping = {}
+    for entry in spec.split(","):
+        name, _, value = entry.partition("=")
+        if name.strip() and value.strip().isdigit():
+            mapping[name.strip()] = int(value)
+    return mapping
+
+
+def env_int_mapping(name: str) -> Dict[str, int]:
+    """Read a "name=value,..." mapping from an environment variable."""
+    return parse_int_mapping(os.getenv(name, ""))
@@ -1,31 +1,172 @@
+import functools
+import math
 import random
 import re
 
+try:
+    # Try relative imports first (when run as module)
+    from .tracing import span
+    from .memory_guard import check_memory, reserve_response
+except ImportError:
+    # Fall back to absolute imports (when run directly)
+    from tracing import span
+    from memory_guard import check_memory, reserve_response
+
+# Pools with more dice than this (and more dice than faces) are sampled as face counts
+COUNT_SAMPLING_THRESHOLD = 1000
+
+# Notations whose exact total distribution takes more DP steps than this are simulated
+DISTRIBUTION_MAX_WORK = 2_000_000
+
+
+@functools.lru_cache(maxsize=256)
+def total_distribution(num_dice, dice_sides, keep, keep_lowest):
+    """
+    Exact distribution of the kept total for a notation, as an inverse CDF.
+
+    Faces are visited from the kept end of the range. The state is how many
+    dice have been placed and the kept sum so far; the number of kept dice
+    follows from the first. Ways are counted exactly with integers.
+
+    Returns:
+        (totals, cum_weights) ready for random.choices, or None when the
+        notation is too large to tabulate
+    """
+    work = dice_sides * (num_dice + 1) ** 2 // 2 * (keep * dice_sides + 1)
+    if work > DISTRIBUTION_MAX_WORK:
+        return None
+
+    ways = {0: {0: 1}}
+    faces = range(1, dice_sides + 1) if keep_lowest else range(dice_sides, 0, -1)
+    for face in faces:
+        next_ways = {}
+        for placed, sums in ways.items():
+            left = num_dice - placed
+            for count in range(left + 1):
+                kept = min(count, max(0, keep - placed))
+                choose = math.comb(left, count)
+                row = next_ways.setdefault(placed + count, {})
+                for total, n in sums.items():
+                    key = total + face * kept
+                    row[key] = row.get(key, 0) + n * choose
+        ways = next_ways
+
+    outcomes = ways[num_dice]
+    totals = sorted(outcomes)
+    all_ways, running, cum_weights = dice_sides ** num_dice, 0, []
+    for total in totals:
+        running += outcomes[total]
+        cum_weights.append(running / all_ways)
+    return totals, cum_weights
+
+
 class DiceRoller:
-    def __init__(self, notation, num_rolls=1):
+    def __init__(self, notation, num_rolls=1, show_rolls=True):
         self.notation = notation
         self.num_rolls = num_rolls
-        self.dice_pattern = re.compile(r"(\d+)d(\d+)(k(\d+))?")
+        self.show_rolls = show_rolls
+        # NdS, NdSkK / NdSkhK (keep highest K) or NdSklK (keep lowest K)
+        self.dice_pattern = re.compile(r"(\d+)d(\d+)(k([hl]?)(\d+))?")
 
-    def roll_dice(self):
+    def parse(self):
         match = self.dice_pattern.match(self.notation)
         if not match:
             raise ValueError("Invalid dice notation")
 
         num_dice = int(match.group(1))
         dice_sides = int(match.group(2))
-        keep = int(match.group(4)) if match.group(4) else num_dice
+        if dice_sides < 1:
+            raise ValueError("Dice need at least one side")
+        keep = min(int(match.group(5)), num_dice) if match.group(3) else num_dice
+        keep_lowest = match.group(4) == "l"
+        return num_dice, dice_sides, keep, keep_lowest
+
+    @property
+    def use_counts(self):
+        num_dice, dice_sides, _, _ = self.parse()
+        return num_dice > COUNT_SAMPLING_THRESHOLD and num_dice > dice_sides
+
+    def roll_dice(self):
+        num_dice, dice_sides, keep, keep_lowest = self.parse()
 
         rolls = [random.randint(1, dice_sides) for _ in range(num_dice)]
         rolls.sort(reverse=True)
-        kept_rolls = rolls[:keep]
+        kept_rolls = rolls[num_dice - keep:] if keep_lowest else rolls[:keep]
 
         return rolls, kept_rolls
 
+    def roll_counts(self):
+        """
+        Roll the pool as face counts instead of individual dice.
+
+        The counts follow a multinomial over the faces, drawn as one binomial
+        per face, so time and memory are O(sides) however many dice there are.
+
+        Returns:
+            (counts, kept_counts): {face: count} for every rolled face, highest
+            face first, and the same for the kept dice
+        """
+        num_dice, dice_sides, keep, keep_lowest = self.parse()
+
+        counts, remaining = {}, num_dice
+        for face in range(dice_sides, 0, -1):
+            # Each remaining die shows this face with probability 1/face
+            count = remaining if face == 1 else random.binomialvariate(remaining, 1 / face)
+            if count:
+                counts[face] = count
+                remaining -= count
+
+        kept_counts, to_keep = {}, keep
+        for face in (reversed(counts) if keep_lowest else counts):
+            if not to_keep:
+                break
+            kept_counts[face] = min(counts[face], to_keep)
+            to_keep -= kept_counts[face]
+
+        return counts, kept_counts
+
+    def sample_totals(self):
+        """
+        Draw num_rolls totals straight from the notation's cached distribution.
+
+        Returns:
+            List of totals, or None when the notation is too large to tabulate
+        """
+        table = total_distribution(*self.parse())
+        if table is None:
+            return None
+        totals, cum_weights = table
+        return random.choices(totals, cum_weights=cum_weights, k=self.num_rolls)
+
+    def estimated_output_bytes(self):
+        """Upper estimate of the formatted result size, so huge rolls are refused before rolling."""
+        num_dice, dice_sides, keep, keep_lowest = self.parse()
+        per_roll = 40 + len(str(num_dice * dice_sides))
+        # Without show_rolls the dice are still listed when the notation is too large to tabulate
+        if self.show_rolls or total_distribution(num_dice, dice_sides, keep, keep_lowest) is None:
+            if self.use_counts:
+                per_roll += dice_sides * (len(str(dice_sides)) + len(str(num_dice)) + 4)
+            else:
+                per_roll += num_dice * (len(str(dice_sides)) + 2)
+        return per_roll * self.num_rolls
+
     def roll_multiple(self):
         """Roll the dice multiple times according to num_rolls"""
+        totals = None if self.show_rolls else self.sample_totals()
+        if totals is not None:
+            return [{"total": total} for total in totals]
+
         results = []
         for _ in range(self.num_rolls):
+            check_memory()
+            if self.use_counts:
+                counts, kept_counts = self.roll_counts()
+                results.append({
+                    "counts": counts,
+                    "kept_counts": kept_counts,
+                    "total": sum(face * count for face, count in kept_counts.items())
+                })
+                continue
             rolls, kept_rolls = self.roll_dice()
             results.append({
                 "rolls": rolls,
@@ -35,18 +176,34 @@ class DiceRoller:
         return results
 
     def __str__(self):
-        if self.num_rolls == 1:
-            rolls, kept_rolls = self.roll_dice()
-            return f"ROLLS: {', '.join(map(str, rolls))} -> RETURNS: {sum(kept_rolls)}"
+        with span("dice.roll", notation=self.notation, num_rolls=self.num_rolls):
+            return self._format()
+
+    @staticmethod
+    def _format_result(result):
+        if "counts" in result:
+            # Large pools list how many dice showed each face, not every die
+            faces = ", ".join(f"{face}×{count}" for face, count in result["counts"].items())
+            rolls = f"{sum(result['counts'].values())} dice as face×count: {faces}"
+        elif "rolls" in result:
+            rolls = ", ".join(map(str, result["rolls"]))
         else:
-            results = self.roll_multiple()
-            result_strs = []
-            for i, result in enumerate(results, 1):
-                result_strs.append(f"Roll {i}: ROLLS: {', '.join(map(str, result['rolls']))} -> RETURNS: {result['total']}")
-            return "\n".join(result_strs)
+            # Totals sampled from the distribution have no individual dice
+            return f"RETURNS: {result['total']}"
+        return f"ROLLS: {rolls} -> RETURNS: {result['total']}"
+
+    def _format(self):
+        reserve_response(self.estimated_output_bytes(), f"{self.num_rolls} roll(s) of {self.notation}")
+        results = self.roll_multiple()
+        if self.num_rolls == 1:
+            return self._format_result(results[0])
+        result_strs = []
+        for i, result in enumerate(results, 1):
+            result_strs.append(f"Roll {i}: {self._format_result(result)}")
+        return "\n".join(result_strs)
 
 if __name__ == "__main__":
     notation = input("Enter dice notation (e.g., 2d20k1): ")
     num_rolls = int(input("Number of rolls: ") or "1")
     dice_roller = DiceRoller(notation, num_rolls)
-    print(dice_roller) 
\ No newline at end of file
+    print(dice_roller)
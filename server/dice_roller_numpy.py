@@ -1,32 +1,78 @@
 import numpy as np
 import re
 
+# Pools with more dice than this (and more dice than faces) are sampled as face counts
+COUNT_SAMPLING_THRESHOLD = 1000
+
 class DiceRoller:
     def __init__(self, notation, num_rolls=1):
         self.notation = notation
         self.num_rolls = num_rolls
-        self.dice_pattern = re.compile(r"(\d+)d(\d+)(k(\d+))?")
+        # NdS, NdSkK / NdSkhK (keep highest K) or NdSklK (keep lowest K)
+        self.dice_pattern = re.compile(r"(\d+)d(\d+)(k([hl]?)(\d+))?")
 
-    def roll_dice(self):
+    def parse(self):
         match = self.dice_pattern.match(self.notation)
         if not match:
             raise ValueError("Invalid dice notation")
 
         num_dice = int(match.group(1))
         dice_sides = int(match.group(2))
-        keep = int(match.group(4)) if match.group(4) else num_dice
+        if dice_sides < 1:
+            raise ValueError("Dice need at least one side")
+        keep = min(int(match.group(5)), num_dice) if match.group(3) else num_dice
+        keep_lowest = match.group(4) == "l"
+        return num_dice, dice_sides, keep, keep_lowest
+
+    @property
+    def use_counts(self):
+        num_dice, dice_sides, _, _ = self.parse()
+        return num_dice > COUNT_SAMPLING_THRESHOLD and num_dice > dice_sides
+
+    def roll_dice(self):
+        num_dice, dice_sides, keep, keep_lowest = self.parse()
 
         # Use numpy to generate random integers
         rolls = np.random.randint(1, dice_sides + 1, size=num_dice).tolist()
         rolls.sort(reverse=True)
-        kept_rolls = rolls[:keep]
+        kept_rolls = rolls[num_dice - keep:] if keep_lowest else rolls[:keep]
 
         return rolls, kept_rolls
 
+    def roll_counts(self):
+        """
+        Roll the pool as face counts with a single multinomial draw.
+
+        Returns:
+            (counts, kept_counts): {face: count} for every rolled face, highest
+            face first, and the same for the kept dice
+        """
+        num_dice, dice_sides, keep, keep_lowest = self.parse()
+
+        drawn = np.random.multinomial(num_dice, [1 / dice_sides] * dice_sides)
+        counts = {face: int(drawn[face - 1]) for face in range(dice_sides, 0, -1) if drawn[face - 1]}
+
+        kept_counts, to_keep = {}, keep
+        for face in (reversed(counts) if keep_lowest else counts):
+            if not to_keep:
+                break
+            kept_counts[face] = min(counts[face], to_keep)
+            to_keep -= kept_counts[face]
+
+        return counts, kept_counts
+
     def roll_multiple(self):
         """Roll the dice multiple times according to num_rolls"""
         results = []
         for _ in range(self.num_rolls):
+            if self.use_counts:
+                counts, kept_counts = self.roll_counts()
+                results.append({
+                    "counts": counts,
+                    "kept_counts": kept_counts,
+                    "total": sum(face * count for face, count in kept_counts.items())
+                })
+                continue
             rolls, kept_rolls = self.roll_dice()
             results.append({
                 "rolls": rolls,
@@ -35,19 +81,25 @@ class DiceRoller:
             })
         return results
 
+    @staticmethod
+    def _format_rolls(result):
+        if "counts" in result:
+            # Large pools list how many dice showed each face, not every die
+            faces = ", ".join(f"{face}×{count}" for face, count in result["counts"].items())
+            return f"{sum(result['counts'].values())} dice as face×count: {faces}"
+        return ", ".join(map(str, result["rolls"]))
+
     def __str__(self):
+        results = self.roll_multiple()
         if self.num_rolls == 1:
-            rolls, kept_rolls = self.roll_dice()
-            return f"ROLLS: {', '.join(map(str, rolls))} -> RETURNS: {sum(kept_rolls)}"
-        else:
-            results = self.roll_multiple()
-            result_strs = []
-            for i, result in enumerate(results, 1):
-                result_strs.append(f"Roll {i}: ROLLS: {', '.join(map(str, result['rolls']))} -> RETURNS: {result['total']}")
-            return "\n".join(result_strs)
+            return f"ROLLS: {self._format_rolls(results[0])} -> RETURNS: {results[0]['total']}"
+        result_strs = []
+        for i, result in enumerate(results, 1):
+            result_strs.append(f"Roll {i}: ROLLS: {self._format_rolls(result)} -> RETURNS: {result['total']}")
+        return "\n".join(result_strs)
 
 if __name__ == "__main__":
     notation = input("Enter dice notation (e.g., 2d20k1): ")
     num_rolls = int(input("Number of rolls: ") or "1")
     dice_roller = DiceRoller(notation, num_rolls)
-    print(dice_roller) 
\ No newline at end of file
+    print(dice_roller)
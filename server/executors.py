@@ -0,0 +1,179 @@
+"""
+Bounded Thread Pools for Blocking Tool Bodies
+
+Tool backends (Tavily, GitHub, Unsplash/Quotable) make blocking HTTP calls.
+Running them on the event loop would serialise every request on the server,
+so each upstream gets its own small thread pool: a slow GitHub call can only
+tie up GitHub workers, never the pool used for search or dice.
+
+Each pool bounds how many calls may wait for a worker and records queue depth,
+wait time and run time so the pools can be sized from real traffic.
+"""
+
+import asyncio
+import contextvars
+import functools
+import inspect
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Optional
+
+
+class PoolFullError(RuntimeError):
+    """Raised when a pool's queue is already at its limit."""
+
+
+def _percentile(values, fraction: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+class BoundedExecutor:
+    """A thread pool with a bounded wait queue and timing statistics."""
+
+    def __init__(self, name: str, max_workers: int = 4, max_queue: int = 32, window: int = 1000):
+        """
+        Args:
+            name: Pool name, used for thread names and reporting
+            max_workers: Number of worker threads
+            max_queue: Number of calls allowed to wait for a worker
+            window: Number of recent calls kept for percentile statistics
+        """
+        self.name = name
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=f"mcp-{name}")
+        self._lock = threading.Lock()
+
+        self.pending = 0        # submitted, not yet started
+        self.running = 0
+        self.max_depth = 0
+        self.completed = 0
+        self.rejected = 0
+        self._wait_times = deque(maxlen=window)
+        self._run_times = deque(maxlen=window)
+
+    def submit(self, func: Callable, *args, **kwargs):
+        """
+        Schedule func on the pool.
+
+        Returns:
+            A concurrent.futures.Future for the result
+
+        Raises:
+            PoolFullError: If max_queue calls are already waiting
+        """
+        with self._lock:
+            if self.pending >= self.max_queue + max(0, self.max_workers - self.running):
+                self.rejected += 1
+                raise PoolFullError(f"The '{self.name}' pool queue is full")
+            self.pending += 1
+            self.max_depth = max(self.max_depth, self.pending)
+
+        submitted = time.perf_counter()
+        context = contextvars.copy_context()
+
+        def timed():
+            started = time.perf_counter()
+            with self._lock:
+                self.pending -= 1
+                self.running += 1
+                self._wait_times.append(started - submitted)
+            try:
+                return context.run(func, *args, **kwargs)
+            finally:
+                with self._lock:
+                    self.running -= 1
+                    self.completed += 1
+                    self._run_times.append(time.perf_counter() - started)
+
+        try:
+            return self._executor.submit(timed)
+        except RuntimeError:
+            with self._lock:
+                self.pending -= 1
+            raise
+
+    async def run(self, func: Callable, *args, **kwargs):
+        """Run func on the pool and await its result."""
+        return await asyncio.wrap_future(self.submit(func, *args, **kwargs))
+
+    def stats(self) -> Dict:
+        """Queue depth, wait time and run time statistics for this pool."""
+        with self._lock:
+            waits, runs = list(self._wait_times), list(self._run_times)
+            return {
+                "workers": self.max_workers,
+                "max_queue": self.max_queue,
+                "queue_depth": self.pending,
+                "max_queue_depth": self.max_depth,
+                "running": self.running,
+                "completed": self.completed,
+                "rejected": self.rejected,
+                "wait_ms_p50": _percentile(waits, 0.5) * 1000,
+                "wait_ms_p95": _percentile(waits, 0.95) * 1000,
+                "wait_ms_max": max(waits, default=0.0) * 1000,
+                "run_ms_p50": _percentile(runs, 0.5) * 1000,
+                "run_ms_p95": _percentile(runs, 0.95) * 1000,
+            }
+
+    def shutdown(self, wait: bool = True) -> None:
+        self._executor.shutdown(wait=wait, cancel_futures=not wait)
+
+
+class ExecutorRegistry:
+    """Creates one BoundedExecutor per upstream on first use."""
+
+    def __init__(self, workers: Optional[Dict[str, int]] = None, queues: Optional[Dict[str, int]] = None,
+                 default_workers: int = 4, default_queue: int = 32):
+        """
+        Args:
+            workers: Worker count per pool name
+            queues: Queue limit per pool name
+            default_workers: Worker count for pools not listed in workers
+            default_queue: Queue limit for pools not listed in queues
+        """
+        self.workers = workers or {}
+        self.queues = queues or {}
+        self.default_workers = default_workers
+        self.default_queue = default_queue
+        self._pools: Dict[str, BoundedExecutor] = {}
+        self._lock = threading.Lock()
+
+    def get(self, name: str) -> BoundedExecutor:
+        with self._lock:
+            if name not in self._pools:
+                self._pools[name] = BoundedExecutor(
+                    name,
+                    max_workers=self.workers.get(name, self.default_workers),
+                    max_queue=self.queues.get(name, self.default_queue),
+                )
+            return self._pools[name]
+
+    def offload(self, func: Callable, pool: str) -> Callable:
+        """Wrap a blocking function so calls run on the named pool."""
+        if inspect.iscoroutinefunction(func):
+            return func
+
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            try:
+                return await self.get(pool).run(func, *args, **kwargs)
+            except PoolFullError:
+                return f"❌ Server busy: too many pending '{pool}' requests, please try again shortly"
+        return wrapper
+
+    def stats(self) -> Dict[str, Dict]:
+        with self._lock:
+            pools = dict(self._pools)
+        return {name: pool.stats() for name, pool in pools.items()}
+
+    def shutdown(self, wait: bool = True) -> None:
+        with self._lock:
+            pools, self._pools = list(self._pools.values()), {}
+        for pool in pools:
+            pool.shutdown(wait=wait)
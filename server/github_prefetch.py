@@ -0,0 +1,259 @@
+"""
+Speculative Prefetch of GitHub Resources
+
+After github_search_repositories or github_get_repository_info, the agent
+almost always asks next for the README or the root listing of the same
+repositories. GitHubPrefetcher fetches those in the background for the top
+results (plus the repository itself, which gives the default branch) and
+keeps the status and body for a short TTL, so the follow-up tool calls are
+served without waiting on GitHub. Each lookup builds its own Response, so
+callers never share one.
+
+Keys ignore the case of owner/repo, as GitHub does. Prefetches use the
+repository's default branch, while the tools ask for "main" unless told
+otherwise, so a "main" request falls back to the default-branch entry.
+
+Prefetching spends the same rate limit as real calls, so it is bounded: at
+most max_requests prefetch requests per window, and once GitHub reports
+fewer than min_remaining requests left, queued prefetches are cancelled.
+"""
+
+import contextvars
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+try:
+    # Try relative imports first (when run as module)
+    from .tracing import span
+except ImportError:
+    # Fall back to absolute imports (when run directly)
+    from tracing import span
+
+# Responses worth keeping: found, or definitely not there
+CACHEABLE_STATUS_CODES = (200, 404)
+# Branch the GitHub tools request when the agent does not name one
+DEFAULT_REF = "main"
+
+
+def _response(url: str, status_code: int, body: str):
+    """A fresh requests.Response carrying a cached status and body."""
+    import requests
+
+    response = requests.Response()
+    response.status_code = status_code
+    response.reason = "OK" if status_code == 200 else "Not Found"
+    response.url = url
+    response.encoding = "utf-8"
+    response._content = body.encode("utf-8")
+    return response
+
+
+class GitHubPrefetcher:
+    """Background warmer for the GitHub resources an agent is likely to read next."""
+
+    def __init__(self, session, base_url: str = "https://api.github.com", top_n: int = 3,
+                 ttl: float = 300, max_entries: int = 256, max_requests: int = 30,
+                 window: float = 60, min_remaining: int = 100, workers: int = 2,
+                 clock: Callable[[], float] = time.monotonic):
+        """
+        Args:
+            session: requests.Session shared with GitHubTool
+            base_url: GitHub REST API root
+            top_n: Repositories prefetched per search result
+            ttl: Seconds a prefetched response is served from memory
+            max_entries: Most responses kept; the oldest go first
+            max_requests: Prefetch requests allowed per window
+            window: Length of the budget window in seconds
+            min_remaining: Stop prefetching below this many remaining API requests
+            workers: Background threads issuing prefetch requests
+            clock: Time source, replaceable in tests
+        """
+        self.session = session
+        self.base_url = base_url
+        self.top_n = top_n
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.max_requests = max_requests
+        self.window = window
+        self.min_remaining = min_remaining
+        self.clock = clock
+        # Last X-RateLimit-Remaining seen on any GitHub response
+        self.rate_limit_remaining: Optional[int] = None
+
+        # (url, params) -> (expires_at, status_code, body)
+        self._entries: Dict[Tuple, Tuple[float, int, str]] = {}
+        # Default branch by lower-cased "owner/repo", for DEFAULT_REF lookups
+        self._default_branches: Dict[str, str] = {}
+        self._spent = deque()
+        self._pending = set()
+        self._queued = set()
+        # Re-entrant: cancelling a future runs its done callback, which takes the lock again
+        self._lock = threading.RLock()
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="github-prefetch")
+        self._stats = {"prefetched": 0, "hits": 0, "skipped_budget": 0, "cancelled": 0}
+
+        session.hooks.setdefault("response", []).append(self.observe)
+
+    def _repository(self, url: str) -> Tuple[str, str]:
+        """Split a repository URL into lower-cased "owner/repo" and the rest of the path."""
+        prefix = f"{self.base_url}/repos/"
+        if not url.startswith(prefix):
+            return "", url
+        owner, _, rest = url[len(prefix):].partition("/")
+        repo, slash, path = rest.partition("/")
+        return f"{owner}/{repo}".lower(), slash + path
+
+    def _key(self, url: str, params: Optional[Dict]) -> Tuple:
+        full_name, path = self._repository(url)
+        if full_name:
+            # File paths stay case sensitive
+            url = f"{self.base_url}/repos/{full_name}{path}"
+        return url, tuple(sorted((params or {}).items()))
+
+    def observe(self, response, *args, **kwargs):
+        """requests response hook that tracks the remaining API quota."""
+        remaining = response.headers.get("X-RateLimit-Remaining")
+        if remaining is not None and remaining.isdigit():
+            self.rate_limit_remaining = int(remaining)
+        return response
+
+    def _fresh(self, url: str, params: Optional[Dict] = None):
+        entry = self._entries.get(self._key(url, params))
+        if entry is None and params and params.get("ref") == DEFAULT_REF:
+            branch = self._default_branches.get(self._repository(url)[0])
+            if branch and branch != DEFAULT_REF:
+                entry = self._entries.get(self._key(url, {**params, "ref": branch}))
+        if entry is None or entry[0] < self.clock():
+            return None
+        return entry
+
+    def lookup(self, url: str, params: Optional[Dict] = None):
+        """A prefetched response for this GET, or None."""
+        with self._lock:
+            entry = self._fresh(url, params)
+            if entry is None:
+                return None
+            self._stats["hits"] += 1
+        return _response(url, entry[1], entry[2])
+
+    def prefetch(self, repositories: Iterable[Dict], include_info: bool = True) -> None:
+        """
+        Queue prefetches for the first top_n repositories.
+
+        Args:
+            repositories: GitHub repository objects (full_name and default_branch are used)
+            include_info: Also warm the repository info itself (skipped when it was just fetched)
+        """
+        for repo in list(repositories)[:self.top_n]:
+            full_name, branch = repo.get("full_name"), repo.get("default_branch") or "main"
+            if not full_name:
+                continue
+            with self._lock:
+                if self._quota_low():
+                    return
+                listing_url = f"{self.base_url}/repos/{full_name}/contents/"
+                if full_name in self._queued or self._fresh(listing_url, {"ref": branch}) is not None:
+                    continue
+                # Run in a copy of the caller's context so prefetch spans join its trace
+                self._default_branches[full_name.lower()] = branch
+                while len(self._default_branches) > self.max_entries:
+                    self._default_branches.pop(next(iter(self._default_branches)))
+                future = self._executor.submit(contextvars.copy_context().run, self._prefetch_repository,
+                                               full_name, branch, include_info)
+                self._pending.add(future)
+                self._queued.add(full_name)
+            future.add_done_callback(lambda future, full_name=full_name: self._discard(future, full_name))
+
+    def _discard(self, future, full_name: str) -> None:
+        with self._lock:
+            self._pending.discard(future)
+            self._queued.discard(full_name)
+
+    def _prefetch_repository(self, full_name: str, branch: str, include_info: bool) -> None:
+        with span("github.prefetch", repository=full_name, branch=branch):
+            repo_url = f"{self.base_url}/repos/{full_name}"
+            if include_info:
+                self._fetch(repo_url)
+            listing = self._fetch(f"{repo_url}/contents/", {"ref": branch})
+            if listing is None or listing.status_code != 200:
+                return
+            readme = next(
+                (item["name"] for item in listing.json()
+                 if item.get("type") == "file" and item["name"].lower().startswith("readme")),
+                None,
+            )
+            if readme:
+                self._fetch(f"{repo_url}/contents/{readme}", {"ref": branch})
+
+    def _quota_low(self) -> bool:
+        """Cancel queued work if GitHub reports little quota left (call with the lock held)."""
+        if self.rate_limit_remaining is None or self.rate_limit_remaining >= self.min_remaining:
+            return False
+        for future in list(self._pending):
+            if future.cancel():
+                self._stats["cancelled"] += 1
+        return True
+
+    def _fetch(self, url: str, params: Optional[Dict] = None):
+        now = self.clock()
+        with self._lock:
+            if self._quota_low():
+                return None
+            while self._spent and self._spent[0] <= now - self.window:
+                self._spent.popleft()
+            if len(self._spent) >= self.max_requests:
+                self._stats["skipped_budget"] += 1
+                return None
+            self._spent.append(now)
+
+        try:
+            response = self.session.get(url, params=params)
+        except Exception:
+            return None
+        if response.status_code not in CACHEABLE_STATUS_CODES:
+            return None
+
+        with self._lock:
+            self._entries[self._key(url, params)] = (self.clock() + self.ttl, response.status_code, response.text)
+            while len(self._entries) > self.max_entries:
+                self._entries.pop(next(iter(self._entries)))
+            self._stats["prefetched"] += 1
+        return response
+
+    def export_entries(self) -> List:
+        """Fresh prefetched responses as [url, params, expires_at (wall clock), status, body] rows."""
+        now = self.clock()
+        with self._lock:
+            entries = list(self._entries.items())
+        return [
+            [url, dict(params), time.time() + (expires_at - now), status_code, body]
+            for (url, params), (expires_at, status_code, body) in entries
+            if expires_at > now
+        ]
+
+    def import_entries(self, rows: List) -> None:
+        """Restore rows from export_entries, skipping expired ones."""
+        now = time.time()
+        with self._lock:
+            for url, params, expires_at, status_code, body in rows:
+                if expires_at <= now:
+                    continue
+                deadline = self.clock() + (expires_at - now)
+                self._entries.setdefault(self._key(url, params), (deadline, status_code, body))
+            while len(self._entries) > self.max_entries:
+                self._entries.pop(next(iter(self._entries)))
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                **self._stats,
+                "entries": len(self._entries),
+                "pending": len(self._pending),
+                "rate_limit_remaining": self.rate_limit_remaining,
+            }
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
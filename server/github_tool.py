@@ -6,17 +6,47 @@ Uses GitHub's public API - no authentication required for public repositories.
 """
 
 import requests
+import contextvars
 import json
-from typing import Dict, List, Optional
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
 import base64
 
+try:
+    # Try relative imports first (when run as module)
+    from .tracing import span, trace_session
+    from .snapshot import to_monotonic, to_wall_clock
+    from .memory_guard import ResourceLimitExceeded, reserve_response
+except ImportError:
+    # Fall back to absolute imports (when run directly)
+    from tracing import span, trace_session
+    from snapshot import to_monotonic, to_wall_clock
+    from memory_guard import ResourceLimitExceeded, reserve_response
+
+
+# Fields fetched per repository by get_repositories_info's GraphQL query
+REPOSITORY_FIELDS = "nameWithOwner description isPrivate stargazerCount forkCount updatedAt primaryLanguage { name }"
+
 
 class GitHubTool:
     """GitHub integration tool for repository operations."""
     
-    def __init__(self, github_token: Optional[str] = None):
+    def __init__(self, github_token: Optional[str] = None, repo_cache_ttl: float = 600,
+                 rest_concurrency: int = 4):
         self.base_url = "https://api.github.com"
         self.session = requests.Session()
+        self.repo_cache_ttl = repo_cache_ttl
+        # Shared by every batched lookup, so concurrent tool calls cannot multiply
+        # the requests in flight against the unauthenticated rate limit
+        self._rest_pool = ThreadPoolExecutor(max_workers=max(1, rest_concurrency),
+                                             thread_name_prefix="github-rest")
+        # Repository summaries by lower-cased "owner/repo": (expires_at, summary)
+        self._repo_cache: Dict[str, Tuple[float, Dict]] = {}
+        self._repo_cache_lock = threading.Lock()
+        # Optional background warmer for likely follow-up reads (see enable_prefetch)
+        self.prefetcher = None
         
         # Set a user agent for GitHub API requests
         headers = {
@@ -32,6 +62,59 @@ class GitHubTool:
             self.authenticated = False
             
         self.session.headers.update(headers)
+        trace_session(self.session)
+
+    def enable_prefetch(self, **options):
+        """
+        Warm the README, root listing and repository info of top search results in the background.
+
+        Args:
+            **options: GitHubPrefetcher settings (top_n, ttl, max_requests, window, min_remaining, ...)
+        """
+        try:
+            from .github_prefetch import GitHubPrefetcher
+        except ImportError:
+            from github_prefetch import GitHubPrefetcher
+        self.prefetcher = GitHubPrefetcher(self.session, self.base_url, **options)
+        return self.prefetcher
+
+    def shutdown(self) -> None:
+        """Stop the REST lookup pool and the prefetcher."""
+        self._rest_pool.shutdown(wait=False, cancel_futures=True)
+        if self.prefetcher is not None:
+            self.prefetcher.shutdown()
+
+    def export_cache(self) -> Dict:
+        """Cached repository summaries and prefetched responses, with wall-clock expiry, for snapshots."""
+        now = time.monotonic()
+        with self._repo_cache_lock:
+            repositories = [
+                [name, to_wall_clock(expires_at), summary]
+                for name, (expires_at, summary) in self._repo_cache.items()
+                if expires_at > now
+            ]
+        return {
+            "repositories": repositories,
+            "prefetched": self.prefetcher.export_entries() if self.prefetcher is not None else [],
+        }
+
+    def import_cache(self, data: Dict):
+        """Restore a snapshot from export_cache, skipping expired entries."""
+        now = time.time()
+        with self._repo_cache_lock:
+            for name, expires_at, summary in data.get("repositories", []):
+                if expires_at > now:
+                    self._repo_cache.setdefault(name, (to_monotonic(expires_at), summary))
+        if self.prefetcher is not None:
+            self.prefetcher.import_entries(data.get("prefetched", []))
+
+    def _get(self, url: str, params: Optional[Dict] = None):
+        """GET through the prefetch cache when prefetching is enabled."""
+        if self.prefetcher is not None:
+            prefetched = self.prefetcher.lookup(url, params)
+            if prefetched is not None:
+                return prefetched
+        return self.session.get(url, params=params)
     
     def get_authentication_status(self) -> str:
         """
@@ -107,6 +190,9 @@ class GitHubTool:
             
             if not repositories:
                 return f"No repositories found for query: '{query}'{auth_note}"
+
+            if self.prefetcher is not None:
+                self.prefetcher.prefetch(repositories)
             
             result = f"🔍 GitHub Repository Search Results for '{query}'{auth_note}:\n\n"
             
@@ -139,10 +225,13 @@ class GitHubTool:
         """
         try:
             url = f"{self.base_url}/repos/{owner}/{repo}"
-            response = self.session.get(url)
+            response = self._get(url)
             response.raise_for_status()
             
             data = response.json()
+
+            if self.prefetcher is not None:
+                self.prefetcher.prefetch([data], include_info=False)
             
             result = f"📊 Repository Information: {data['full_name']}\n\n"
             result += f"📝 Description: {data['description'] or 'No description'}\n"
@@ -171,6 +260,172 @@ class GitHubTool:
         except Exception as e:
             return f"❌ Unexpected error: {str(e)}"
     
+    def get_repositories_info(self, repositories: List[str]) -> str:
+        """
+        Get summary information about several repositories in one call.
+
+        Authenticated lookups resolve every repository in a single GraphQL
+        query (one aliased field per repository). Without a token, the REST
+        API is queried once per repository. Either way summaries are cached
+        for repo_cache_ttl seconds.
+
+        Args:
+            repositories: Repository names as "owner/repo"
+
+        Returns:
+            A compact table with one row per repository
+        """
+        with span("github.get_repositories_info", repositories=len(repositories)) as trace:
+            names = list(dict.fromkeys(name.strip() for name in repositories if name.strip()))
+            summaries: Dict[str, Dict] = {}
+            errors: Dict[str, str] = {}
+
+            missing = []
+            for name in names:
+                if name.count("/") != 1 or not all(name.split("/")):
+                    errors[name] = "expected owner/repo"
+                    continue
+                cached = self._cached_repository(name)
+                if cached is not None:
+                    summaries[name] = cached
+                else:
+                    missing.append(name)
+            trace.set_attribute("cache.hits", len(summaries))
+
+            if missing:
+                try:
+                    if self.authenticated:
+                        fetched, failed = self._fetch_repositories_graphql(missing)
+                    else:
+                        fetched, failed = self._fetch_repositories_rest(missing)
+                except requests.exceptions.RequestException as e:
+                    return f"❌ Error getting repository info: {str(e)}"
+                except Exception as e:
+                    return f"❌ Unexpected error: {str(e)}"
+                for name, summary in fetched.items():
+                    self._cache_repository(name, summary)
+                summaries.update(fetched)
+                errors.update(failed)
+
+            if not names:
+                return "❌ No repositories given (expected a list of owner/repo names)"
+            return self._format_repositories_table(names, summaries, errors)
+
+    def _cached_repository(self, name: str) -> Optional[Dict]:
+        with self._repo_cache_lock:
+            entry = self._repo_cache.get(name.lower())
+        if entry is None or entry[0] < time.monotonic():
+            return None
+        return entry[1]
+
+    def _cache_repository(self, name: str, summary: Dict):
+        if self.repo_cache_ttl <= 0:
+            return
+        with self._repo_cache_lock:
+            self._repo_cache[name.lower()] = (time.monotonic() + self.repo_cache_ttl, summary)
+
+    def _fetch_repositories_graphql(self, names: List[str]) -> Tuple[Dict[str, Dict], Dict[str, str]]:
+        """Resolve every repository with one aliased GraphQL query."""
+        params = ", ".join(f"$owner{i}: String!, $name{i}: String!" for i in range(len(names)))
+        fields = " ".join(
+            f"r{i}: repository(owner: $owner{i}, name: $name{i}) {{ {REPOSITORY_FIELDS} }}"
+            for i in range(len(names))
+        )
+        variables = {}
+        for i, name in enumerate(names):
+            variables[f"owner{i}"], variables[f"name{i}"] = name.split("/")
+
+        response = self.session.post(
+            f"{self.base_url}/graphql",
+            json={"query": f"query({params}) {{ {fields} }}", "variables": variables},
+        )
+        response.raise_for_status()
+        payload = response.json()
+        data = payload.get("data") or {}
+        if not data and payload.get("errors"):
+            raise requests.exceptions.RequestException(payload["errors"][0].get("message", "GraphQL error"))
+
+        summaries, errors = {}, {}
+        for i, name in enumerate(names):
+            repo = data.get(f"r{i}")
+            if repo is None:
+                errors[name] = "not found or no access"
+                continue
+            summaries[name] = {
+                "full_name": repo["nameWithOwner"],
+                "description": repo["description"],
+                "language": (repo.get("primaryLanguage") or {}).get("name"),
+                "stars": repo["stargazerCount"],
+                "forks": repo["forkCount"],
+                "updated": repo["updatedAt"][:10],
+                "private": repo["isPrivate"],
+            }
+        return summaries, errors
+
+    def _fetch_repositories_rest(self, names: List[str]) -> Tuple[Dict[str, Dict], Dict[str, str]]:
+        """
+        Fetch each repository from the REST API, up to rest_concurrency at a time.
+
+        The lookups run on the tool's own small pool rather than the "github"
+        pool the caller already holds a worker of, which could deadlock. Each
+        one runs in a copy of the caller's context, so its spans join the trace.
+        """
+        def fetch(name: str):
+            try:
+                response = self.session.get(f"{self.base_url}/repos/{name}")
+                if response.status_code == 404:
+                    return None, "not found or private"
+                response.raise_for_status()
+            except requests.exceptions.RequestException as e:
+                return None, str(e)
+            data = response.json()
+            return {
+                "full_name": data["full_name"],
+                "description": data["description"],
+                "language": data["language"],
+                "stars": data["stargazers_count"],
+                "forks": data["forks_count"],
+                "updated": data["updated_at"][:10],
+                "private": data["private"],
+            }, None
+
+        if len(names) == 1:
+            results = [fetch(names[0])]
+        else:
+            futures = [self._rest_pool.submit(contextvars.copy_context().run, fetch, name) for name in names]
+            results = [future.result() for future in futures]
+
+        summaries, errors = {}, {}
+        for name, (summary, error) in zip(names, results):
+            if summary is None:
+                errors[name] = error
+            else:
+                summaries[name] = summary
+        return summaries, errors
+
+    @staticmethod
+    def _format_repositories_table(names: List[str], summaries: Dict[str, Dict], errors: Dict[str, str]) -> str:
+        def cell(value) -> str:
+            return str(value).replace("|", "\\|").replace("\n", " ")
+
+        result = f"📊 Repository Information ({len(summaries)}/{len(names)} found)\n\n"
+        result += "| Repository | ⭐ Stars | 🍴 Forks | Language | Updated | Description |\n"
+        result += "|---|---:|---:|---|---|---|\n"
+        for name in names:
+            summary = summaries.get(name)
+            if summary is None:
+                result += f"| {cell(name)} | | | | | ❌ {cell(errors.get(name, 'not found'))} |\n"
+                continue
+            visibility = " 🔒" if summary["private"] else ""
+            description = summary["description"] or "No description"
+            if len(description) > 80:
+                description = description[:77] + "..."
+            result += (
+                f"| {cell(summary['full_name'])}{visibility} | {summary['stars']:,} | {summary['forks']:,} "
+                f"| {cell(summary['language'] or '-')} | {summary['updated']} | {cell(description)} |\n"
+            )
+        return result
+
     def get_file_content(self, owner: str, repo: str, file_path: str, branch: str = "main") -> str:
         """
         Get the content of a specific file from a repository.
@@ -184,43 +439,54 @@ class GitHubTool:
         Returns:
             File content or error message
         """
-        try:
-            url = f"{self.base_url}/repos/{owner}/{repo}/contents/{file_path}"
-            params = {"ref": branch}
-            
-            response = self.session.get(url, params=params)
-            response.raise_for_status()
-            
-            data = response.json()
-            
-            if data.get("type") != "file":
-                return f"❌ '{file_path}' is not a file (it's a {data.get('type', 'unknown')})"
-            
-            # Decode base64 content
-            content = base64.b64decode(data["content"]).decode("utf-8")
-            
-            result = f"📄 File Content: {owner}/{repo}/{file_path} (branch: {branch})\n"
-            result += f"📏 Size: {data['size']} bytes\n\n"
-            result += "```\n"
-            result += content
-            result += "\n```"
-            
-            return result
-            
-        except requests.exceptions.RequestException as e:
-            if "404" in str(e):
-                # Try with master branch if main fails
-                if branch == "main":
-                    try:
-                        return self.get_file_content(owner, repo, file_path, "master")
-                    except:
-                        pass
-                return f"❌ File '{file_path}' not found in '{owner}/{repo}' (tried branches: main, master)"
-            return f"❌ Error getting file content: {str(e)}"
-        except UnicodeDecodeError:
-            return f"❌ Cannot decode file '{file_path}' - it may be a binary file"
-        except Exception as e:
-            return f"❌ Unexpected error: {str(e)}"
+        with span("github.get_file_content", owner=owner, repo=repo, file_path=file_path, branch=branch) as trace:
+            try:
+                url = f"{self.base_url}/repos/{owner}/{repo}/contents/{file_path}"
+                params = {"ref": branch}
+
+                response = self._get(url, params=params)
+                response.raise_for_status()
+
+                data = response.json()
+
+                if data.get("type") != "file":
+                    return f"❌ '{file_path}' is not a file (it's a {data.get('type', 'unknown')})"
+
+                # Refuse oversized files before decoding them
+                reserve_response(data.get("size", 0), f"'{file_path}'")
+
+                # Decode base64 content
+                with span("github.decode_content", encoded_bytes=len(data["content"])):
+                    content = base64.b64decode(data["content"]).decode("utf-8")
+
+                with span("github.format_content"):
+                    result = f"📄 File Content: {owner}/{repo}/{file_path} (branch: {branch})\n"
+                    result += f"📏 Size: {data['size']} bytes\n\n"
+                    result += "```\n"
+                    result += content
+                    result += "\n```"
+
+                return result
+
+            except requests.exceptions.RequestException as e:
+                if "404" in str(e):
+                    # Try with master branch if main fails
+                    if branch == "main":
+                        trace.set_attribute("github.branch_fallback", "master")
+                        try:
+                            return self.get_file_content(owner, repo, file_path, "master")
+                        except ResourceLimitExceeded:
+                            raise
+                        except:
+                            pass
+                    return f"❌ File '{file_path}' not found in '{owner}/{repo}' (tried branches: main, master)"
+                return f"❌ Error getting file content: {str(e)}"
+            except UnicodeDecodeError:
+                return f"❌ Cannot decode file '{file_path}' - it may be a binary file"
+            except ResourceLimitExceeded:
+                raise
+            except Exception as e:
+                return f"❌ Unexpected error: {str(e)}"
     
     def list_repository_files(self, owner: str, repo: str, path: str = "", branch: str = "main") -> str:
         """
@@ -239,7 +505,7 @@ class GitHubTool:
             url = f"{self.base_url}/repos/{owner}/{repo}/contents/{path}"
             params = {"ref": branch}
             
-            response = self.session.get(url, params=params)
+            response = self._get(url, params=params)
             response.raise_for_status()
             
             data = response.json()
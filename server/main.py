@@ -1,76 +1,571 @@
 from dotenv import load_dotenv
 from mcp.server.fastmcp import FastMCP
-from tavily import TavilyClient
+from typing import List, Optional
+import asyncio
+import contextlib
+import functools
+import hashlib
+import json
 import os
+import threading
 try:
     # Try relative imports first (when run as module)
     from .dice_roller import DiceRoller
-    from .social_content_creator import SocialContentCreator
-    from .github_tool import GitHubTool
+    from .search_cache import SearchCache, normalize_query
+    from .search_merge import merge_contexts
+    from .response_shaping import ContinuationStore, ResponseShaper, SqliteContinuationStore
+    from .executors import ExecutorRegistry
+    from .config import env_int_mapping
+    from .metrics import MetricsRegistry
+    from .resilience import CircuitBreakerRegistry, CircuitOpenError
+    from .snapshot import CacheSnapshotter
+    from .admission import AdmissionController
+    from .profiling import ToolProfiler
+    from .memory_guard import MemoryGuard, reserve_response
+    from .replay import HttpCassette
+    from . import tracing
 except ImportError:
     # Fall back to absolute imports (when run directly)
     from dice_roller import DiceRoller
-    from social_content_creator import SocialContentCreator
-    from github_tool import GitHubTool
+    from search_cache import SearchCache, normalize_query
+    from search_merge import merge_contexts
+    from response_shaping import ContinuationStore, ResponseShaper, SqliteContinuationStore
+    from executors import ExecutorRegistry
+    from config import env_int_mapping
+    from metrics import MetricsRegistry
+    from resilience import CircuitBreakerRegistry, CircuitOpenError
+    from snapshot import CacheSnapshotter
+    from admission import AdmissionController
+    from profiling import ToolProfiler
+    from memory_guard import MemoryGuard, reserve_response
+    from replay import HttpCassette
+    import tracing
 
 load_dotenv()
 
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+cache_dir = os.getenv("MCP_CACHE_DIR", os.path.join(project_root, ".cache"))
+
 mcp = FastMCP("mcp-server")
-client = TavilyClient(os.getenv("TAVILY_API_KEY"))
-content_creator = SocialContentCreator()
-github_tool = GitHubTool(github_token=os.getenv("GITHUB_TOKEN"))
+web_search_concurrency = int(os.getenv("WEB_SEARCH_CONCURRENCY", "4"))
+search_cache = SearchCache(
+    os.getenv("SEARCH_CACHE_PATH", os.path.join(cache_dir, "search_cache.sqlite3")),
+    ttl_seconds=int(os.getenv("SEARCH_CACHE_TTL", "21600")),
+    max_entries=int(os.getenv("SEARCH_CACHE_MAX_ENTRIES", "1000")),
+    max_bytes=int(os.getenv("SEARCH_CACHE_MAX_MB", "50")) * 1024 * 1024,
+)
+response_shaper = ResponseShaper(
+    default_budget=int(os.getenv("MCP_DEFAULT_TOKEN_BUDGET", "2000")),
+    budgets=env_int_mapping("MCP_TOOL_TOKEN_BUDGETS"),
+)
+executors = ExecutorRegistry(
+    workers=env_int_mapping("MCP_POOL_WORKERS"),
+    queues=env_int_mapping("MCP_POOL_QUEUE_LIMITS"),
+    default_workers=int(os.getenv("MCP_POOL_DEFAULT_WORKERS", "4")),
+    default_queue=int(os.getenv("MCP_POOL_DEFAULT_QUEUE", "32")),
+)
+metrics = MetricsRegistry()
+memory_guard = MemoryGuard(
+    max_response_bytes=int(os.getenv("MCP_MAX_RESPONSE_BYTES", str(5 * 1024 * 1024))),
+    response_limits=env_int_mapping("MCP_TOOL_RESPONSE_LIMITS"),
+    max_call_memory=int(os.getenv("MCP_MAX_CALL_MEMORY_MB", "0")) * 1024 * 1024,
+    accounting=os.getenv("MCP_MEMORY_ACCOUNTING", "0").lower() in ("1", "true", "yes"),
+    observe=metrics.observe_memory,
+)
+
+def current_client_id() -> str:
+    """
+    Identify the caller for per-client admission limits.
+
+    Uses the client_id from the request metadata if the client sent one, then
+    (over HTTP) the X-Client-Id header or peer address, then the MCP session.
+    """
+    try:
+        request_context = mcp.get_context().request_context
+    except Exception:
+        return "local"
+    meta = request_context.meta
+    if meta is not None and getattr(meta, "client_id", None):
+        return str(meta.client_id)
+    request = getattr(request_context, "request", None)
+    if request is not None:
+        header = request.headers.get("x-client-id")
+        if header:
+            return header
+        if request.client:
+            return request.client.host
+    return f"session-{id(request_context.session):x}"
+
+admission = AdmissionController(
+    tool_limits=env_int_mapping("MCP_ADMISSION_TOOL_LIMITS"),
+    tool_queues=env_int_mapping("MCP_ADMISSION_TOOL_QUEUES"),
+    default_tool_limit=int(os.getenv("MCP_ADMISSION_DEFAULT_TOOL_LIMIT", "16")),
+    default_tool_queue=int(os.getenv("MCP_ADMISSION_DEFAULT_TOOL_QUEUE", "64")),
+    client_limit=int(os.getenv("MCP_ADMISSION_CLIENT_LIMIT", "8")),
+    client_queue=int(os.getenv("MCP_ADMISSION_CLIENT_QUEUE", "32")),
+    deadlines=env_int_mapping("MCP_ADMISSION_DEADLINES"),
+    client_id=current_client_id,
+)
+admission_enabled = os.getenv("MCP_ADMISSION", "1").lower() in ("1", "true", "yes")
+profiler = ToolProfiler(
+    os.path.join(cache_dir, "profiles"),
+    interval=int(os.getenv("MCP_PROFILE_INTERVAL_MS", "5")) / 1000,
+)
+snapshots = CacheSnapshotter(
+    os.path.join(cache_dir, "snapshots"),
+    interval=float(os.getenv("MCP_SNAPSHOT_INTERVAL", "300")),
+    enabled=os.getenv("MCP_SNAPSHOTS", "1").lower() in ("1", "true", "yes"),
+)
+# Record live upstream traffic to a cassette, or replay one for repeatable offline runs
+cassette = HttpCassette(
+    os.getenv("MCP_HTTP_CASSETTE"),
+    mode=os.getenv("MCP_HTTP_CASSETTE_MODE", "replay"),
+    timing=float(os.getenv("MCP_REPLAY_TIMING", "1")),
+) if os.getenv("MCP_HTTP_CASSETTE") else None
+breakers = CircuitBreakerRegistry(
+    failure_threshold=int(os.getenv("MCP_BREAKER_FAILURES", "5")),
+    slow_call_seconds=float(os.getenv("MCP_BREAKER_SLOW_SECONDS", "5")),
+    reset_timeout=float(os.getenv("MCP_BREAKER_RESET_SECONDS", "30")),
+    request_timeout=float(os.getenv("MCP_UPSTREAM_TIMEOUT", "10")),
+    hedge_hosts=[host.strip() for host in os.getenv("MCP_HEDGE_HOSTS", "").split(",") if host.strip()],
+)
+
+def runtime_gauges():
+    """Thread pool and search cache gauges sampled when metrics are rendered."""
+    for pool, stats in executors.stats().items():
+        yield "mcp_pool_queue_depth", "Calls waiting for a pool worker", {"pool": pool}, stats["queue_depth"]
+        yield "mcp_pool_running", "Calls running on a pool worker", {"pool": pool}, stats["running"]
+        yield "mcp_pool_rejected", "Calls rejected because the pool queue was full", {"pool": pool}, stats["rejected"]
+        yield "mcp_pool_wait_seconds_p95", "95th percentile pool queue wait", {"pool": pool}, stats["wait_ms_p95"] / 1000
+    cache = search_cache.stats()
+    for result in ("hits", "near_hits", "misses"):
+        yield "mcp_search_cache_lookups", "Search cache lookups by result", {"result": result}, cache[result]
+    yield "mcp_search_cache_entries", "Entries in the search cache", {}, cache["entries"]
+    yield "mcp_search_cache_bytes", "Bytes stored in the search cache", {}, cache["bytes"]
+    for tool, limits in memory_guard.stats().items():
+        for kind, count in limits.items():
+            yield "mcp_tool_limit_exceeded", "Tool calls stopped by a response-size or memory limit", {"tool": tool, "kind": kind}, count
+    for tool, stats in admission.stats().items():
+        yield "mcp_admission_queued", "Tool calls waiting for admission", {"tool": tool}, stats["queued"]
+        for reason, count in stats["shed"].items():
+            yield "mcp_admission_shed", "Tool calls rejected by admission control", {"tool": tool, "reason": reason}, count
+    for host, stats in breakers.stats().items():
+        state = {"closed": 0, "half_open": 1, "open": 2}[stats["state"]]
+        yield "mcp_circuit_state", "Circuit state (0 closed, 1 half open, 2 open)", {"host": host}, state
+        yield "mcp_circuit_rejected", "Calls skipped because the circuit was open", {"host": host}, stats["rejected"]
+
+metrics.add_gauges(runtime_gauges)
+
+def trace_exporter():
+    """Send spans to an OTLP/HTTP collector if one is configured, otherwise to a local file."""
+    endpoint = os.getenv("MCP_TRACE_OTLP_ENDPOINT")
+    if endpoint:
+        return tracing.OtlpHttpExporter(endpoint, service_name=os.getenv("MCP_TRACE_SERVICE_NAME", "mcp-server"))
+    return tracing.JsonLinesExporter(os.getenv("MCP_TRACE_FILE", os.path.join(cache_dir, "traces.jsonl")))
+
+tracing.configure(
+    sample_rate=float(os.getenv("MCP_TRACE_SAMPLE_RATE", "0")),
+    exporter=trace_exporter(),
+)
+
+# Tool backends (and their tavily/requests imports) are created on first use,
+# so spawning the server stays fast when only some tools are called
+
+def backend(factory):
+    """
+    functools.cache for a backend getter, built under a lock.
+
+    Tools run on several pool threads, and concurrent first calls through a
+    bare functools.cache would each build a backend with its own hooks,
+    breakers and snapshot registration.
+    """
+    cached = functools.cache(factory)
+    lock = threading.Lock()
+
+    @functools.wraps(factory)
+    def getter():
+        if cached.cache_info().currsize:
+            return cached()
+        with lock:
+            return cached()
+    getter.cache_info = cached.cache_info
+    getter.cache_clear = cached.cache_clear
+    return getter
 
-@mcp.tool()
+@backend
+def get_tavily_client():
+    if cassette is not None and cassette.replaying:
+        return cassette.client("api.tavily.com")
+    from tavily import TavilyClient
+    client = TavilyClient(os.getenv("TAVILY_API_KEY"))
+    return cassette.client("api.tavily.com", client) if cassette is not None else client
+
+@backend
+def get_async_tavily_client():
+    if cassette is not None and cassette.replaying:
+        return cassette.client("api.tavily.com", asynchronous=True)
+    from tavily import AsyncTavilyClient
+    client = AsyncTavilyClient(os.getenv("TAVILY_API_KEY"))
+    return cassette.client("api.tavily.com", client, asynchronous=True) if cassette is not None else client
+
+@backend
+def get_content_creator():
+    try:
+        from .social_content_creator import SocialContentCreator
+    except ImportError:
+        from social_content_creator import SocialContentCreator
+    content_creator = SocialContentCreator()
+    if cassette is not None:
+        cassette.install(content_creator.session)
+    metrics.instrument_session(content_creator.session)
+    breakers.protect_session(content_creator.session)
+    return content_creator
+
+@backend
+def get_github_tool():
+    try:
+        from .github_tool import GitHubTool
+    except ImportError:
+        from github_tool import GitHubTool
+    github_tool = GitHubTool(
+        github_token=os.getenv("GITHUB_TOKEN"),
+        rest_concurrency=int(os.getenv("GITHUB_REST_CONCURRENCY", "4")),
+    )
+    if os.getenv("GITHUB_PREFETCH", "0").lower() in ("1", "true", "yes"):
+        github_tool.enable_prefetch(
+            top_n=int(os.getenv("GITHUB_PREFETCH_TOP", "3")),
+            ttl=float(os.getenv("GITHUB_PREFETCH_TTL", "300")),
+            max_requests=int(os.getenv("GITHUB_PREFETCH_BUDGET", "30")),
+            min_remaining=int(os.getenv("GITHUB_PREFETCH_MIN_REMAINING", "100")),
+        )
+    if cassette is not None:
+        cassette.install(github_tool.session)
+    metrics.instrument_session(github_tool.session)
+    breakers.protect_session(github_tool.session)
+    snapshots.register("github", github_tool.export_cache, github_tool.import_cache)
+    return github_tool
+
+def tool(pool: str = None, shape: Optional[str] = "head", budget: int = None, priority: str = "standard",
+         profile: bool = True):
+    """
+    Register a function as an MCP tool with the server-wide layers applied.
+
+    Args:
+        pool: Thread pool that runs the (blocking) tool body, one per upstream
+        shape: Trim strategy used when the output exceeds its budget (None leaves the output whole)
+        budget: Default token budget for this tool (MCP_TOOL_TOKEN_BUDGETS overrides it)
+        priority: Admission class ("interactive", "standard" or "bulk")
+        profile: Whether server_profile can profile this tool
+    """
+    def decorator(func):
+        # Limits apply to the raw output, before shaping pages it
+        wrapped = memory_guard.guarded(func, func.__name__)
+        if shape:
+            wrapped = response_shaper.shaped(wrapped, shape, budget)
+        if profile:
+            # Inside the pool hand-off, so samples come from the thread running the body
+            wrapped = profiler.profiled(wrapped, func.__name__, pooled=bool(pool))
+        if pool:
+            wrapped = executors.offload(wrapped, pool)
+        if admission_enabled:
+            wrapped = admission.admit(wrapped, func.__name__, priority)
+        # The root span wraps the pool hand-off, so queue wait is part of the trace
+        wrapped = tracing.traced(wrapped, name=f"tools/call {func.__name__}")
+        return mcp.tool()(metrics.instrumented(wrapped))
+    return decorator
+
+def export_continuations():
+    """In-memory continuations for snapshots (HTTP workers already share them through SQLite)."""
+    store = response_shaper.store
+    return store.export_entries() if isinstance(store, ContinuationStore) else None
+
+def restore_continuations(data):
+    store = response_shaper.store
+    if isinstance(store, ContinuationStore):
+        store.import_entries(data)
+
+@tool(pool="tavily", shape="top_k", budget=3000, priority="bulk")
 def web_search(query: str) -> str:
     """Search the web for information about the given query"""
-    search_results = client.get_search_context(query=query)
+    with tracing.span("search_cache.get") as trace:
+        cached = search_cache.get(query)
+        trace.set_attribute("cache.hit", cached is not None)
+    if cached is not None:
+        return cached
+
+    def search() -> str:
+        with tracing.span("tavily.get_search_context"), metrics.time_upstream("api.tavily.com"):
+            return get_tavily_client().get_search_context(query=query)
+
+    try:
+        search_results = breakers.call("api.tavily.com", search)
+    except CircuitOpenError:
+        return "❌ Web search is temporarily unavailable after repeated upstream failures, please try again shortly"
+    # Refuse an oversized context before it is cached
+    reserve_response(len(search_results), "search context")
+    with tracing.span("search_cache.put", bytes=len(search_results)):
+        search_cache.put(query, search_results)
     return search_results
 
-@mcp.tool()
-def roll_dice(notation: str, num_rolls: int = 1) -> str:
-    """Roll the dice with the given notation"""
-    roller = DiceRoller(notation, num_rolls)
+@tool(shape="top_k", budget=4000, priority="bulk")
+async def web_search_many(queries: List[str], max_tokens: int = 4000) -> str:
+    """Search the web for several queries at once and return one merged, deduplicated context"""
+    # Drop queries that normalise to the same cache key
+    unique_queries = list({normalize_query(query): query for query in queries}.values())
+    semaphore = asyncio.Semaphore(web_search_concurrency)
+    errors = {}
+
+    async def search(query: str) -> str:
+        # SQLite calls would block the event loop, so they run on a worker thread
+        with tracing.span("search_cache.get", query=query) as trace:
+            cached = await asyncio.to_thread(search_cache.get, query)
+            trace.set_attribute("cache.hit", cached is not None)
+        if cached is not None:
+            return cached
+        async with semaphore:
+            async def tavily_search() -> str:
+                with tracing.span("tavily.get_search_context", query=query), \
+                        metrics.time_upstream("api.tavily.com"):
+                    return await get_async_tavily_client().get_search_context(query=query)
+
+            try:
+                context = await breakers.call_async("api.tavily.com", tavily_search)
+            except Exception as e:
+                errors[query] = str(e)
+                return "[]"
+        await asyncio.to_thread(search_cache.put, query, context)
+        return context
+
+    contexts = await asyncio.gather(*(search(query) for query in unique_queries))
+    merged = merge_contexts(dict(zip(unique_queries, contexts)), max_tokens)
+
+    if errors and not merged:
+        return "❌ Error searching the web: " + "; ".join(f"'{q}': {e}" for q, e in errors.items())
+    if errors:
+        # Lead with the note so trimming to the token budget never drops it
+        failed = ", ".join(f"'{q}' ({e[:100]})" for q, e in errors.items())
+        merged.insert(0, {"note": f"No results for {len(errors)} of {len(unique_queries)} queries: {failed}"})
+    return json.dumps(merged)
+
+@tool(pool="local", priority="interactive")
+def roll_dice(notation: str, num_rolls: int = 1, show_rolls: bool = True) -> str:
+    """Roll the dice with the given notation (set show_rolls=False to return only the totals)"""
+    roller = DiceRoller(notation, num_rolls, show_rolls)
     return str(roller)
 
-@mcp.tool()
+@tool(pool="social", budget=1000, priority="bulk")
 def create_social_post(topic: str, style: str = "professional") -> str:
     """Generate a social media post with image and text for any topic"""
-    return content_creator.create_social_media_post(topic, style)
+    return get_content_creator().create_social_media_post(topic, style)
 
-@mcp.tool()
+@tool(pool="social", budget=1000, priority="bulk")
 def get_slide_image(topic: str, size: str = "1920x1080") -> str:
     """Get presentation-ready images for slides and presentations"""
-    return content_creator.get_presentation_image(topic, size)
+    return get_content_creator().get_presentation_image(topic, size)
 
-@mcp.tool()
+@tool(pool="social", budget=1000, priority="bulk")
 def create_quote_card(theme: str = "motivation") -> str:
     """Generate a quote card with inspirational text and background image"""
-    return content_creator.create_quote_card(theme)
+    return get_content_creator().create_quote_card(theme)
 
-@mcp.tool()
+@tool(pool="github")
 def github_search_repositories(query: str, limit: int = 5) -> str:
     """Search for GitHub repositories by query (e.g., 'python machine learning', 'user:microsoft')"""
-    return github_tool.search_repositories(query, limit)
+    return get_github_tool().search_repositories(query, limit)
 
-@mcp.tool()
+@tool(pool="github")
 def github_get_repository_info(owner: str, repo: str) -> str:
     """Get detailed information about a specific GitHub repository"""
-    return github_tool.get_repository_info(owner, repo)
+    return get_github_tool().get_repository_info(owner, repo)
 
-@mcp.tool()
+@tool(pool="github")
+def github_get_repositories_info(repositories: List[str]) -> str:
+    """Get a compact info table for several GitHub repositories at once (names as 'owner/repo')"""
+    return get_github_tool().get_repositories_info(repositories)
+
+@tool(pool="github", shape="head_tail", budget=4000)
 def github_get_file_content(owner: str, repo: str, file_path: str, branch: str = "main") -> str:
     """Get the content of a specific file from a GitHub repository"""
-    return github_tool.get_file_content(owner, repo, file_path, branch)
+    return get_github_tool().get_file_content(owner, repo, file_path, branch)
 
-@mcp.tool()
+@tool(pool="github")
 def github_list_files(owner: str, repo: str, path: str = "", branch: str = "main") -> str:
     """List files and directories in a GitHub repository path"""
-    return github_tool.list_repository_files(owner, repo, path, branch)
+    return get_github_tool().list_repository_files(owner, repo, path, branch)
 
-@mcp.tool()
+@tool(pool="github")
 def github_auth_status() -> str:
     """Check GitHub authentication status and rate limits"""
-    return github_tool.get_authentication_status()
+    return get_github_tool().get_authentication_status()
+
+# Pages are already shaped, and shaping them again would cut JSON pages mid-item
+@tool(shape=None, priority="interactive")
+def fetch_continuation(handle: str, max_tokens: int = 0) -> str:
+    """Fetch the next part of a tool response that was truncated to fit its token budget"""
+    return response_shaper.continue_response(handle, max_tokens)
+
+# Prometheus scrapers need the exposition text whole
+@tool(shape=None, priority="interactive")
+def server_metrics(output_format: str = "summary") -> str:
+    """Show per-tool call counts, latency, errors and upstream timings ("summary" or "prometheus")"""
+    if output_format.lower() == "prometheus":
+        return metrics.render_prometheus()
+    sections = {
+        "🧵 **Thread Pools:**": {
+            pool: f"{stats['completed']} done, queue {stats['queue_depth']} (max {stats['max_queue_depth']}), "
+                  f"wait p95 {stats['wait_ms_p95']:.0f} ms, {stats['rejected']} rejected"
+            for pool, stats in executors.stats().items()
+        },
+        "🗄️ **Search Cache:**": search_cache.stats(),
+        "💾 **Cache Snapshots:**": snapshots.stats(),
+        "🧠 **Limits Exceeded:**": memory_guard.stats(),
+        "🚦 **Admission:**": {
+            tool: f"{stats['running']} running, {stats['queued']} queued, {stats['admitted']} admitted, "
+                  f"{sum(stats['shed'].values())} shed"
+            for tool, stats in admission.stats().items()
+        },
+        "🔌 **Circuit Breakers:**": {
+            host: f"{stats['state']}, {stats['trips']} trips, {stats['rejected']} calls skipped"
+            for host, stats in breakers.stats().items()
+        },
+    }
+    if get_github_tool.cache_info().currsize and get_github_tool().prefetcher is not None:
+        sections["🐙 **GitHub Prefetch:**"] = get_github_tool().prefetcher.stats()
+    if cassette is not None:
+        sections["📼 **Upstream Cassette:**"] = cassette.stats()
+    return metrics.summary(sections)
+
+@tool(priority="interactive", profile=False)
+def server_profile(action: str = "status", tool_name: str = "", calls: int = 10, mode: str = "sampling") -> str:
+    """Profile slow tools: "start" profiles the next `calls` calls of tool_name (any tool if empty) in "sampling" or "deterministic" mode, "stop" ends early, "status" reports"""
+    action = action.lower()
+    if action == "start":
+        return profiler.start(tool_name or None, calls, mode.lower())
+    if action == "stop":
+        return profiler.stop()
+    return profiler.status()
+
+@mcp.custom_route("/metrics", methods=["GET"])
+async def prometheus_metrics(request):
+    """Prometheus scrape endpoint (per worker process in HTTP mode)."""
+    from starlette.responses import PlainTextResponse
+    return PlainTextResponse(metrics.render_prometheus(), media_type="text/plain; version=0.0.4")
+
+@mcp.custom_route("/healthz", methods=["GET"])
+async def healthz(request):
+    """Liveness probe for HTTP deployments."""
+    from starlette.responses import JSONResponse
+    return JSONResponse({"status": "ok", "pid": os.getpid()})
+
+def startup():
+    """
+    Start the server's background work.
+
+    Called by the entry points rather than at import, so tests, benchmarks and
+    --help runs that import this module start no threads and read no snapshots.
+    """
+    memory_guard.start()
+    if os.getenv("MCP_PROFILE_TOOL") or os.getenv("MCP_PROFILE_CALLS"):
+        # Profile from startup, e.g. to catch the first calls after a deploy
+        profiler.start(
+            os.getenv("MCP_PROFILE_TOOL") or None,
+            calls=int(os.getenv("MCP_PROFILE_CALLS", "10")),
+            mode=os.getenv("MCP_PROFILE_MODE", "sampling"),
+        )
+    snapshots.register("continuations", export_continuations, restore_continuations)
+    snapshots.start()
+
+def shutdown():
+    """Drain in-flight tool calls and release shared resources."""
+    executors.shutdown(wait=True)
+    snapshots.shutdown()
+    if get_github_tool.cache_info().currsize:
+        get_github_tool().shutdown()
+    if cassette is not None:
+        cassette.save()
+    breakers.shutdown()
+    tracing.tracer.shutdown()
+    search_cache.close()
+    close_store = getattr(response_shaper.store, "close", None)
+    if close_store:
+        close_store()
+
+def create_http_app():
+    """
+    Build the streamable HTTP app for one server worker process.
+
+    Workers run in stateless mode, so any worker can answer any request
+    behind a shared port. Continuation handles are kept in a SQLite file next
+    to the search cache so every worker sees the same state.
+    """
+    mcp.settings.stateless_http = True
+    response_shaper.store = SqliteContinuationStore(os.path.join(cache_dir, "continuations.sqlite3"))
+
+    app = mcp.streamable_http_app()
+    session_lifespan = app.router.lifespan_context
+
+    @contextlib.asynccontextmanager
+    async def lifespan(app):
+        startup()
+        async with session_lifespan(app):
+            yield
+        # Runs after uvicorn has stopped accepting requests and in-flight ones finished
+        await asyncio.to_thread(shutdown)
+
+    app.router.lifespan_context = lifespan
+    return app
+
+def run_stdio():
+    """Serve one client over stdio, then drain and release resources."""
+    startup()
+    try:
+        mcp.run(transport="stdio")
+    finally:
+        shutdown()
+
+def run_http(host: str = "127.0.0.1", port: int = 8000, workers: int = 1, graceful_timeout: int = 30):
+    """Serve the streamable HTTP transport with one or more worker processes."""
+    import uvicorn
+
+    uvicorn.run(
+        "server.main:create_http_app",
+        factory=True,
+        host=host,
+        port=port,
+        workers=workers,
+        timeout_graceful_shutdown=graceful_timeout,
+        app_dir=project_root,
+    )
+
+# Clients find the schema hash on this line of the initialize instructions
+TOOL_SCHEMA_LINE = "Tool schema version: "
+
+@functools.cache
+def tool_schema_version() -> str:
+    """Hash of every tool's name, description and schemas."""
+    # The registered tool objects, so hashing needs no event loop (mcp.list_tools() is async)
+    listed = sorted(
+        (tool.name, tool.description, tool.parameters, tool.output_schema)
+        for tool in mcp._tool_manager.list_tools()
+    )
+    digest = hashlib.sha256(json.dumps(listed, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+    return f"tools-{digest[:16]}"
+
+def advertise_tool_schema(create_options):
+    """Put the schema hash in the initialize instructions, hashing on the first session."""
+    @functools.wraps(create_options)
+    def create(*args, **kwargs):
+        mcp._mcp_server.instructions = TOOL_SCHEMA_LINE + tool_schema_version()
+        return create_options(*args, **kwargs)
+    return create
+
+# Advertised in the initialize instructions (serverInfo.version stays the real
+# version), so clients can reuse cached tool schemas and skip list_tools while
+# it matches. FastMCP has no public hook for instructions once constructed;
+# stdio and HTTP sessions both build their options through this method.
+mcp._mcp_server.create_initialization_options = advertise_tool_schema(
+    mcp._mcp_server.create_initialization_options
+)
 
 if __name__ == "__main__":
-    mcp.run(transport="stdio")
\ No newline at end of file
+    run_stdio()
\ No newline at end of file
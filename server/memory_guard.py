@@ -0,0 +1,179 @@
+"""
+Per-Tool Memory Accounting and Response-Size Guards
+
+Tool outputs (GitHub files, dice rolls, search contexts) are built as whole
+Python strings before response shaping trims them, so one runaway call can
+balloon the server process. MemoryGuard wraps every tool body and:
+
+- enforces a hard response-size limit per tool. Backends call
+  reserve_response() as soon as they know how big their output will be, so
+  an oversized file or roll is refused before it is materialised, and
+  anything that still comes back over the limit is replaced by an error
+- optionally accounts memory per call with tracemalloc: the peak allocated
+  above the starting point and the bytes still retained afterwards, reported
+  through the metrics registry
+- optionally enforces a memory limit per call. Long loops call
+  check_memory() and the call fails once it has allocated past the limit
+
+tracemalloc counts the whole process, so with overlapping calls the figures
+are approximate. Treat them as a backstop and a signal, not exact accounting.
+"""
+
+import contextvars
+import functools
+import inspect
+import threading
+import tracemalloc
+from collections import Counter
+from typing import Callable, Dict, Optional
+
+
+class ResourceLimitExceeded(RuntimeError):
+    """Raised inside a tool call that went over its memory or response-size limit."""
+
+    def __init__(self, kind: str, message: str):
+        super().__init__(message)
+        self.kind = kind
+
+
+class _CallBudget:
+    __slots__ = ("tool", "response_limit", "memory_limit", "start_bytes")
+
+    def __init__(self, tool: str, response_limit: int, memory_limit: int, start_bytes: int):
+        self.tool = tool
+        self.response_limit = response_limit
+        self.memory_limit = memory_limit
+        self.start_bytes = start_bytes
+
+
+_current_budget: contextvars.ContextVar = contextvars.ContextVar("mcp_call_budget", default=None)
+
+
+def reserve_response(size: int, what: str = "response") -> None:
+    """Fail the current tool call early if it is about to produce more than its response limit."""
+    budget = _current_budget.get()
+    if budget is not None and budget.response_limit and size > budget.response_limit:
+        raise ResourceLimitExceeded(
+            "response", f"{what} would be {size:,} bytes, over the {budget.response_limit:,} byte limit for {budget.tool}"
+        )
+
+
+def check_memory() -> None:
+    """Checkpoint for long loops: fail the current tool call once it has allocated past its memory limit."""
+    budget = _current_budget.get()
+    if budget is None or not budget.memory_limit or not tracemalloc.is_tracing():
+        return
+    used = tracemalloc.get_traced_memory()[0] - budget.start_bytes
+    if used > budget.memory_limit:
+        raise ResourceLimitExceeded(
+            "memory", f"{budget.tool} allocated {used:,} bytes, over its {budget.memory_limit:,} byte limit"
+        )
+
+
+def _response_size(result, limit: int) -> int:
+    """UTF-8 size of a string result, without encoding it when the answer is clear from its length."""
+    if not isinstance(result, str):
+        return 0
+    if len(result) > limit or len(result) * 4 <= limit:
+        # At least one byte and at most four per character
+        return len(result)
+    return len(result.encode("utf-8"))
+
+
+class MemoryGuard:
+    """Response-size and memory limits per tool call, with optional tracemalloc accounting."""
+
+    def __init__(self, max_response_bytes: int = 0, response_limits: Optional[Dict[str, int]] = None,
+                 max_call_memory: int = 0, accounting: bool = False,
+                 observe: Optional[Callable[[str, int, int], None]] = None):
+        """
+        Args:
+            max_response_bytes: Response-size limit for tools not in response_limits (0 for none)
+            response_limits: Response-size limit per tool
+            max_call_memory: Bytes one call may allocate (0 for none, needs tracemalloc)
+            accounting: Measure peak and retained memory per call with tracemalloc
+            observe: Called with (tool, peak_bytes, retained_bytes) after each accounted call
+        """
+        self.max_response_bytes = max_response_bytes
+        self.response_limits = response_limits or {}
+        self.max_call_memory = max_call_memory
+        # A memory limit cannot be checked without tracing allocations
+        self.accounting = accounting or max_call_memory > 0
+        self.observe = observe
+
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._exceeded = Counter()
+
+    def start(self) -> None:
+        """Start tracemalloc if accounting is on (it slows every allocation, so it is opt-in)."""
+        if self.accounting and not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+    def response_limit(self, tool: str) -> int:
+        return self.response_limits.get(tool, self.max_response_bytes)
+
+    def _begin(self, tool: str):
+        start_bytes = 0
+        if self.accounting and tracemalloc.is_tracing():
+            with self._lock:
+                if not self._in_flight:
+                    # Peaks are process-wide; only reset when no other call is being measured
+                    tracemalloc.reset_peak()
+                self._in_flight += 1
+            start_bytes = tracemalloc.get_traced_memory()[0]
+        budget = _CallBudget(tool, self.response_limit(tool), self.max_call_memory, start_bytes)
+        return budget, _current_budget.set(budget)
+
+    def _end(self, budget: _CallBudget, token) -> None:
+        _current_budget.reset(token)
+        if not (self.accounting and tracemalloc.is_tracing()):
+            return
+        current, peak = tracemalloc.get_traced_memory()
+        with self._lock:
+            self._in_flight = max(0, self._in_flight - 1)
+        if self.observe:
+            self.observe(budget.tool, max(0, peak - budget.start_bytes), max(0, current - budget.start_bytes))
+
+    def _check_result(self, budget: _CallBudget, result):
+        if budget.response_limit and _response_size(result, budget.response_limit) > budget.response_limit:
+            self._exceeded[(budget.tool, "response")] += 1
+            return (f"❌ Response too large: {budget.tool} produced more than {budget.response_limit:,} bytes, "
+                    "please narrow the request")
+        return result
+
+    def _rejected(self, budget: _CallBudget, error: ResourceLimitExceeded) -> str:
+        self._exceeded[(budget.tool, error.kind)] += 1
+        return f"❌ {'Response too large' if error.kind == 'response' else 'Out of memory budget'}: {error}"
+
+    def guarded(self, func: Callable, tool: str) -> Callable:
+        """Wrap a tool body so its calls are accounted and held to their limits."""
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                budget, token = self._begin(tool)
+                try:
+                    return self._check_result(budget, await func(*args, **kwargs))
+                except ResourceLimitExceeded as e:
+                    return self._rejected(budget, e)
+                finally:
+                    self._end(budget, token)
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            budget, token = self._begin(tool)
+            try:
+                return self._check_result(budget, func(*args, **kwargs))
+            except ResourceLimitExceeded as e:
+                return self._rejected(budget, e)
+            finally:
+                self._end(budget, token)
+        return wrapper
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        """Calls stopped per tool, by the limit they hit."""
+        tools: Dict[str, Dict[str, int]] = {}
+        for (tool, kind), count in sorted(self._exceeded.items()):
+            tools.setdefault(tool, {})[kind] = count
+        return tools
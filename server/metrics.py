@@ -0,0 +1,285 @@
+"""
+Per-Tool and Upstream Metrics
+
+Records call counts, latency histograms, error counts and response sizes for
+every MCP tool, plus timings for upstream HTTP calls (Tavily, GitHub, Unsplash,
+Quotable). With memory accounting on, the peak and retained memory of each
+call are recorded too. Metrics are rendered in the Prometheus text exposition format for
+the /metrics endpoint and as a short summary for the server_metrics tool.
+"""
+
+import bisect
+import functools
+import inspect
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576)
+MEMORY_BUCKETS = (65536, 262144, 1048576, 4194304, 16777216, 67108864, 268435456)
+
+
+class Histogram:
+    """Cumulative-bucket histogram in the Prometheus style."""
+
+    def __init__(self, buckets: Iterable[float]):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)   # last slot is +Inf
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def quantile(self, fraction: float) -> float:
+        """Estimate a quantile by interpolating inside its bucket."""
+        if not self.count:
+            return 0.0
+        rank = fraction * self.count
+        seen = 0
+        for i, bucket_count in enumerate(self.counts):
+            if seen + bucket_count >= rank and bucket_count:
+                lower = self.buckets[i - 1] if i > 0 else 0.0
+                upper = self.buckets[i] if i < len(self.buckets) else self.buckets[-1]
+                return lower + (upper - lower) * (rank - seen) / bucket_count
+            seen += bucket_count
+        return self.buckets[-1]
+
+    def render(self, name: str, labels: str) -> List[str]:
+        lines, cumulative = [], 0
+        for bound, bucket_count in zip((*self.buckets, "+Inf"), self.counts):
+            cumulative += bucket_count
+            lines.append(f'{name}_bucket{{{labels},le="{bound}"}} {cumulative}')
+        lines.append(f"{name}_sum{{{labels}}} {self.sum}")
+        lines.append(f"{name}_count{{{labels}}} {self.count}")
+        return lines
+
+
+class ToolStats:
+    def __init__(self):
+        self.calls = 0
+        self.errors = 0
+        self.latency = Histogram(LATENCY_BUCKETS)
+        self.response_bytes = Histogram(SIZE_BUCKETS)
+        self.peak_memory = Histogram(MEMORY_BUCKETS)
+        self.retained_memory = Histogram(MEMORY_BUCKETS)
+
+
+class UpstreamStats:
+    def __init__(self):
+        self.calls = 0
+        self.errors = 0
+        self.latency = Histogram(LATENCY_BUCKETS)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+class MetricsRegistry:
+    """Thread-safe store for tool and upstream metrics."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.tools: Dict[str, ToolStats] = {}
+        self.upstreams: Dict[str, UpstreamStats] = {}
+        self._gauge_sources: List[Callable[[], Iterable[Tuple[str, str, Dict[str, str], float]]]] = []
+
+    def observe_tool(self, tool_name: str, seconds: float, error: bool, response_bytes: int) -> None:
+        with self._lock:
+            stats = self.tools.setdefault(tool_name, ToolStats())
+            stats.calls += 1
+            stats.errors += int(error)
+            stats.latency.observe(seconds)
+            stats.response_bytes.observe(response_bytes)
+
+    def observe_memory(self, tool_name: str, peak_bytes: int, retained_bytes: int) -> None:
+        with self._lock:
+            stats = self.tools.setdefault(tool_name, ToolStats())
+            stats.peak_memory.observe(peak_bytes)
+            stats.retained_memory.observe(retained_bytes)
+
+    def observe_upstream(self, host: str, seconds: float, error: bool = False) -> None:
+        with self._lock:
+            stats = self.upstreams.setdefault(host, UpstreamStats())
+            stats.calls += 1
+            stats.errors += int(error)
+            stats.latency.observe(seconds)
+
+    @contextmanager
+    def time_upstream(self, host: str):
+        """Time an upstream call made by a client we cannot hook (e.g. Tavily)."""
+        started = time.perf_counter()
+        failed = True
+        try:
+            yield
+            failed = False
+        finally:
+            self.observe_upstream(host, time.perf_counter() - started, failed)
+
+    def record_response(self, response, *args, **kwargs):
+        """requests response hook recording the upstream round-trip time."""
+        host = urlsplit(response.url).netloc
+        self.observe_upstream(host, response.elapsed.total_seconds(), response.status_code >= 500)
+        return response
+
+    def instrument_session(self, session) -> None:
+        """Record timings for every request made through a requests.Session, failed ones included."""
+        import requests
+
+        session.hooks.setdefault("response", []).append(self.record_response)
+        send = session.request
+
+        # The response hook never sees connection errors or timeouts, so count those here
+        @functools.wraps(send)
+        def request(method, url, *args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return send(method, url, *args, **kwargs)
+            except requests.RequestException:
+                self.observe_upstream(urlsplit(url).netloc, time.perf_counter() - started, error=True)
+                raise
+
+        session.request = request
+
+    def add_gauges(self, source: Callable[[], Iterable[Tuple[str, str, Dict[str, str], float]]]) -> None:
+        """
+        Register a callable producing (name, help, labels, value) gauge samples
+        at render time (e.g. thread pool queue depth or cache hit counters).
+        """
+        self._gauge_sources.append(source)
+
+    def instrumented(self, func: Callable) -> Callable:
+        """Wrap a tool so every call is counted and timed."""
+        tool_name = func.__name__
+
+        def observe(started: float, result, error: bool):
+            if isinstance(result, str):
+                # Tools report failures as messages starting with ❌
+                error = error or result.startswith("❌")
+                size = len(result.encode("utf-8"))
+            else:
+                size = 0
+            self.observe_tool(tool_name, time.perf_counter() - started, error, size)
+
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def wrapper(*args, **kwargs):
+                started, result, error = time.perf_counter(), None, True
+                try:
+                    result = await func(*args, **kwargs)
+                    error = False
+                    return result
+                finally:
+                    observe(started, result, error)
+        else:
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                started, result, error = time.perf_counter(), None, True
+                try:
+                    result = func(*args, **kwargs)
+                    error = False
+                    return result
+                finally:
+                    observe(started, result, error)
+        return wrapper
+
+    def render_prometheus(self) -> str:
+        """Render all metrics in the Prometheus text exposition format."""
+        with self._lock:
+            tools = {name: stats for name, stats in sorted(self.tools.items())}
+            upstreams = {host: stats for host, stats in sorted(self.upstreams.items())}
+            lines = [
+                "# HELP mcp_tool_calls_total Tool calls",
+                "# TYPE mcp_tool_calls_total counter",
+            ]
+            lines += [f'mcp_tool_calls_total{{tool="{_escape(n)}"}} {s.calls}' for n, s in tools.items()]
+            lines += ["# HELP mcp_tool_errors_total Tool calls that failed",
+                      "# TYPE mcp_tool_errors_total counter"]
+            lines += [f'mcp_tool_errors_total{{tool="{_escape(n)}"}} {s.errors}' for n, s in tools.items()]
+            lines += ["# HELP mcp_tool_latency_seconds Tool call latency",
+                      "# TYPE mcp_tool_latency_seconds histogram"]
+            for name, stats in tools.items():
+                lines += stats.latency.render("mcp_tool_latency_seconds", f'tool="{_escape(name)}"')
+            lines += ["# HELP mcp_tool_response_bytes Tool response size",
+                      "# TYPE mcp_tool_response_bytes histogram"]
+            for name, stats in tools.items():
+                lines += stats.response_bytes.render("mcp_tool_response_bytes", f'tool="{_escape(name)}"')
+            accounted = {name: stats for name, stats in tools.items() if stats.peak_memory.count}
+            if accounted:
+                lines += ["# HELP mcp_tool_peak_memory_bytes Peak memory allocated during a tool call",
+                          "# TYPE mcp_tool_peak_memory_bytes histogram"]
+                for name, stats in accounted.items():
+                    lines += stats.peak_memory.render("mcp_tool_peak_memory_bytes", f'tool="{_escape(name)}"')
+                lines += ["# HELP mcp_tool_retained_memory_bytes Memory still allocated after a tool call",
+                          "# TYPE mcp_tool_retained_memory_bytes histogram"]
+                for name, stats in accounted.items():
+                    lines += stats.retained_memory.render("mcp_tool_retained_memory_bytes", f'tool="{_escape(name)}"')
+
+            lines += ["# HELP mcp_upstream_requests_total Upstream HTTP requests",
+                      "# TYPE mcp_upstream_requests_total counter"]
+            lines += [f'mcp_upstream_requests_total{{host="{_escape(h)}"}} {s.calls}' for h, s in upstreams.items()]
+            lines += ["# HELP mcp_upstream_errors_total Upstream HTTP requests that failed",
+                      "# TYPE mcp_upstream_errors_total counter"]
+            lines += [f'mcp_upstream_errors_total{{host="{_escape(h)}"}} {s.errors}' for h, s in upstreams.items()]
+            lines += ["# HELP mcp_upstream_latency_seconds Upstream HTTP latency",
+                      "# TYPE mcp_upstream_latency_seconds histogram"]
+            for host, stats in upstreams.items():
+                lines += stats.latency.render("mcp_upstream_latency_seconds", f'host="{_escape(host)}"')
+            sources = list(self._gauge_sources)
+
+        declared = set()
+        for source in sources:
+            for name, help_text, labels, value in source():
+                if name not in declared:
+                    lines += [f"# HELP {name} {help_text}", f"# TYPE {name} gauge"]
+                    declared.add(name)
+                label_text = ",".join(f'{k}="{_escape(str(v))}"' for k, v in labels.items())
+                lines.append(f"{name}{{{label_text}}} {value}" if label_text else f"{name} {value}")
+
+        return "\n".join(lines) + "\n"
+
+    def summary(self, extra: Optional[Dict[str, Dict]] = None) -> str:
+        """Human-readable summary for quick inspection from an agent or client."""
+        with self._lock:
+            tools = sorted(self.tools.items())
+            upstreams = sorted(self.upstreams.items())
+
+        result = "📈 **Server Metrics**\n\n🛠️ **Tools:**\n"
+        if not tools:
+            result += "   No tool calls yet\n"
+        for name, stats in tools:
+            average_bytes = stats.response_bytes.sum / stats.calls if stats.calls else 0
+            result += (
+                f"   {name}: {stats.calls} calls, {stats.errors} errors, "
+                f"p50 {stats.latency.quantile(0.5) * 1000:.0f} ms, "
+                f"p95 {stats.latency.quantile(0.95) * 1000:.0f} ms, "
+                f"avg {average_bytes:,.0f} bytes"
+            )
+            if stats.peak_memory.count:
+                result += (
+                    f", peak mem p95 {stats.peak_memory.quantile(0.95) / 1024:,.0f} KiB, "
+                    f"retained avg {stats.retained_memory.sum / stats.retained_memory.count / 1024:,.0f} KiB"
+                )
+            result += "\n"
+
+        result += "\n🌐 **Upstreams:**\n"
+        if not upstreams:
+            result += "   No upstream requests yet\n"
+        for host, stats in upstreams:
+            result += (
+                f"   {host}: {stats.calls} requests, {stats.errors} errors, "
+                f"p50 {stats.latency.quantile(0.5) * 1000:.0f} ms, "
+                f"p95 {stats.latency.quantile(0.95) * 1000:.0f} ms\n"
+            )
+
+        for section, values in (extra or {}).items():
+            result += f"\n{section}\n"
+            for name, value in values.items():
+                result += f"   {name}: {value}\n"
+        return result
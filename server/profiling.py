@@ -0,0 +1,324 @@
+"""
+On-Demand Tool Profiling
+
+When one tool gets slow in production, ToolProfiler can be armed (through
+the server_profile tool or MCP_PROFILE_* settings) to profile the next N
+calls of a named tool, or of every tool, without a restart:
+
+- sampling: a background thread samples the stacks of the threads running
+  the profiled calls every few milliseconds and writes them in the collapsed
+  stack format ("frame;frame;frame count") that flamegraph.pl and speedscope
+  read
+- deterministic: cProfile runs around each call and the aggregated stats are
+  written as a .pstats file (snakeviz, gprof2dot, flameprof)
+
+cProfile hooks the whole process through sys.monitoring, not one thread, so
+a deterministic call only runs while it is the only tool call in flight:
+pooled tool calls arriving meanwhile wait for it, and a call that starts
+while others are already running is sampled instead. Tools without a pool
+run on the event loop thread, which must not block, so they run unprofiled
+alongside it; they and background threads (e.g. GitHub prefetches) can
+still show up in its stats.
+
+Async tools are sampled on the event loop thread, so their stacks include
+every coroutine that ran at the same time; the report says so.
+
+While disarmed a profiled tool only pays for one attribute check per call.
+"""
+
+import asyncio
+import contextlib
+import functools
+import inspect
+import io
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from typing import Callable, Dict, Optional
+
+MODES = ("sampling", "deterministic")
+
+
+def _frame_label(code) -> str:
+    return f"{os.path.basename(code.co_filename)}:{code.co_qualname}"
+
+
+class ToolProfiler:
+    """Profiles the next calls of one tool (or all tools) and writes flamegraph-ready output."""
+
+    def __init__(self, output_dir: str, interval: float = 0.005):
+        """
+        Args:
+            output_dir: Folder the .collapsed / .pstats files are written to
+            interval: Seconds between stack samples in sampling mode
+        """
+        self.output_dir = output_dir
+        self.interval = interval
+        # Checked on every call; everything else is only touched while armed
+        self.active = False
+
+        self._lock = threading.Lock()
+        self._tool: Optional[str] = None
+        self._mode = "sampling"
+        self._remaining = 0
+        self._profiled_calls = 0
+        self._started = 0.0
+        # Threads currently running a profiled call, sampled in sampling mode
+        self._targets: Counter = Counter()
+        self._samples: Counter = Counter()
+        self._stats = None  # pstats.Stats aggregated over calls in deterministic mode
+        # Whether any sample came from the event loop thread of an async tool
+        self._sampled_loop = False
+        # Tool calls in flight while armed in deterministic mode, and whether
+        # a cProfile call holds the process to itself
+        self._idle = threading.Condition()
+        self._inflight = 0
+        self._exclusive = False
+        self._sampler: Optional[threading.Thread] = None
+        self._stop_sampler = threading.Event()
+        self.last_report = "No profile recorded yet"
+
+    def start(self, tool: Optional[str] = None, calls: int = 10, mode: str = "sampling") -> str:
+        """Arm the profiler for the next `calls` calls of `tool` (all tools when empty)."""
+        if mode not in MODES:
+            return f"❌ Unknown profiling mode '{mode}' (use {' or '.join(MODES)})"
+        if calls < 1:
+            return "❌ calls must be at least 1"
+        with self._lock:
+            if self.active:
+                return f"❌ Already profiling {self._tool or 'all tools'}; stop it first"
+            self._tool = tool or None
+            self._mode = mode
+            self._remaining = calls
+            self._profiled_calls = 0
+            self._started = time.time()
+            self._samples = Counter()
+            self._stats = None
+            self._sampled_loop = False
+            # Also started in deterministic mode, for async tools which are always sampled
+            self._stop_sampler.clear()
+            self._sampler = threading.Thread(target=self._sample_loop, name="tool-profiler", daemon=True)
+            self._sampler.start()
+            self.active = True
+        return f"🔬 Profiling the next {calls} call(s) of {tool or 'any tool'} ({mode})"
+
+    def stop(self) -> str:
+        """Disarm the profiler and write what was collected."""
+        with self._lock:
+            if not self.active:
+                return self.last_report
+            self.active = False
+        self._stop_sampler.set()
+        if self._sampler is not None:
+            self._sampler.join(timeout=1)
+            self._sampler = None
+        self.last_report = self._write()
+        return self.last_report
+
+    def status(self) -> str:
+        if not self.active:
+            return f"Profiler off. {self.last_report}"
+        return (f"🔬 Profiling {self._tool or 'all tools'} ({self._mode}): {self._profiled_calls} call(s) done, "
+                f"{self._remaining} to go, {sum(self._samples.values())} samples")
+
+    def _claim(self, tool: str) -> bool:
+        """Whether this call should be profiled; counts it against the remaining calls."""
+        with self._lock:
+            if not self.active or (self._tool and self._tool != tool) or self._remaining <= 0:
+                return False
+            self._remaining -= 1
+            return True
+
+    def _finish_call(self) -> None:
+        with self._lock:
+            self._profiled_calls += 1
+            done = self.active and self._remaining <= 0 and not self._targets
+        if done:
+            self.stop()
+
+    def profiled(self, func: Callable, tool: str, pooled: bool = True) -> Callable:
+        """
+        Wrap a tool body so its calls can be profiled while the profiler is armed.
+
+        Args:
+            func: Tool body
+            tool: Tool name matched against the armed tool
+            pooled: Whether the body runs on a worker thread; if not it runs on the
+                event loop thread and never waits for a deterministic call
+        """
+        if inspect.iscoroutinefunction(func):
+            # Coroutines interleave on the event loop, so they are always sampled
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                if not self.active:
+                    return await func(*args, **kwargs)
+                if self._mode == "deterministic":
+                    # Not on the loop thread's lock: poll until no cProfile call is running
+                    while not self._enter(block=False):
+                        await asyncio.sleep(self.interval)
+                    try:
+                        return await self._run_async(func, tool, args, kwargs)
+                    finally:
+                        self._leave()
+                return await self._run_async(func, tool, args, kwargs)
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not self.active:
+                return func(*args, **kwargs)
+            if self._mode != "deterministic":
+                return self._run(func, tool, args, kwargs)
+            if not self._enter(block=pooled):
+                # Waiting here would stall the event loop; run unprofiled instead
+                return func(*args, **kwargs)
+            try:
+                return self._run(func, tool, args, kwargs)
+            finally:
+                self._leave()
+        return wrapper
+
+    async def _run_async(self, func: Callable, tool: str, args, kwargs):
+        if not self._claim(tool):
+            return await func(*args, **kwargs)
+        self._sampled_loop = True
+        try:
+            with self._sampling_target():
+                return await func(*args, **kwargs)
+        finally:
+            self._finish_call()
+
+    def _run(self, func: Callable, tool: str, args, kwargs):
+        if not self._claim(tool):
+            return func(*args, **kwargs)
+        try:
+            if self._mode == "deterministic":
+                return self._run_cprofile(func, args, kwargs)
+            with self._sampling_target():
+                return func(*args, **kwargs)
+        finally:
+            self._finish_call()
+
+    def _enter(self, block: bool = True) -> bool:
+        """Count a call in flight, waiting out any cProfile call first."""
+        with self._idle:
+            while self._exclusive:
+                if not block:
+                    return False
+                self._idle.wait()
+            self._inflight += 1
+            return True
+
+    def _leave(self) -> None:
+        with self._idle:
+            self._inflight -= 1
+            self._idle.notify_all()
+
+    @contextlib.contextmanager
+    def _sampling_target(self):
+        """Mark the current thread as running a profiled call, for the sampler."""
+        ident = threading.get_ident()
+        with self._lock:
+            self._targets[ident] += 1
+        try:
+            yield
+        finally:
+            with self._lock:
+                self._targets[ident] -= 1
+                if self._targets[ident] <= 0:
+                    del self._targets[ident]
+
+    def _run_cprofile(self, func: Callable, args, kwargs):
+        # Imported here so the server does not load the profilers at startup
+        import cProfile
+        import pstats
+
+        with self._idle:
+            # cProfile would also record every other running call, so only profile a lone one
+            alone = self._inflight == 1
+            self._exclusive = alone
+        if not alone:
+            with self._sampling_target():
+                return func(*args, **kwargs)
+        profile = cProfile.Profile()
+        try:
+            try:
+                profile.enable()
+            except ValueError:
+                # Some other profiler (e.g. a debugger or coverage) already owns the hook
+                with self._sampling_target():
+                    return func(*args, **kwargs)
+            try:
+                return func(*args, **kwargs)
+            finally:
+                profile.disable()
+                with self._lock:
+                    if self._stats is None:
+                        self._stats = pstats.Stats(profile)
+                    else:
+                        self._stats.add(profile)
+        finally:
+            with self._idle:
+                self._exclusive = False
+                self._idle.notify_all()
+
+    def _sample_loop(self) -> None:
+        own = threading.get_ident()
+        while not self._stop_sampler.wait(self.interval):
+            with self._lock:
+                targets = [ident for ident in self._targets if ident != own]
+            if not targets:
+                continue
+            frames = sys._current_frames()
+            for ident in targets:
+                frame = frames.get(ident)
+                stack = []
+                while frame is not None:
+                    stack.append(_frame_label(frame.f_code))
+                    frame = frame.f_back
+                if stack:
+                    self._samples[";".join(reversed(stack))] += 1
+
+    def _write(self) -> str:
+        if self._stats is None and not self._samples:
+            return "❌ Nothing was recorded (calls may have been shorter than the sampling interval)"
+        os.makedirs(self.output_dir, exist_ok=True)
+        stamp = time.strftime("%Y%m%d-%H%M%S", time.localtime(self._started))
+        name = f"{self._tool or 'all'}-{stamp}"
+        report = [f"📁 {self._profiled_calls} call(s) profiled"]
+
+        if self._stats is not None:
+            path = os.path.join(self.output_dir, f"{name}.pstats")
+            self._stats.dump_stats(path)
+            out = io.StringIO()
+            self._stats.stream = out
+            self._stats.sort_stats("cumulative").print_stats(15)
+            report.append(f"Stats written to {path}\n\n{out.getvalue().strip()}")
+
+        if self._samples:
+            path = os.path.join(self.output_dir, f"{name}.collapsed")
+            with open(path, "w", encoding="utf-8") as f:
+                for stack, count in self._samples.most_common():
+                    f.write(f"{stack} {count}\n")
+            leaves = Counter()
+            for stack, count in self._samples.items():
+                leaves[stack.rsplit(";", 1)[-1]] += count
+            total = sum(leaves.values())
+            top = "\n".join(f"   {count * 100 / total:5.1f}%  {frame}" for frame, count in leaves.most_common(15))
+            report.append(f"{total} samples written to {path}\n\n🔥 **Hottest frames (self time):**\n{top}")
+            if self._sampled_loop:
+                report.append("⚠️ Async tools were sampled on the event loop thread, so these stacks "
+                              "also include other coroutines that ran at the same time.")
+        return "\n\n".join(report)
+
+    def stats(self) -> Dict:
+        return {
+            "active": self.active,
+            "tool": self._tool,
+            "mode": self._mode,
+            "remaining": self._remaining,
+            "profiled_calls": self._profiled_calls,
+            "samples": sum(self._samples.values()),
+        }
@@ -0,0 +1,382 @@
+"""
+Record and Replay of Upstream Traffic
+
+Tavily, Unsplash, Quotable and GitHub are live services, so performance runs
+against them are never repeatable. An HttpCassette sits under the backends
+and either records real upstream traffic or replays it:
+
+- requests sessions (GitHubTool, SocialContentCreator) get a transport
+  adapter, so the hooks, circuit breakers and metrics above it still run
+- the Tavily clients, which do not expose a session, are wrapped per method
+  call
+
+Secrets are redacted before anything is keyed or written: Authorization and
+cookie headers are never stored, and query, form and JSON fields that look
+like credentials (token, key, secret, ...) are replaced; credentials an
+upstream echoes back are scrubbed from the stored response. Cassettes are one
+JSON document, gzip-compressed when the path ends in .gz.
+
+Replays wait for the recorded latency multiplied by the timing factor (1
+keeps the original timing, 0 replays instantly), so a benchmark measures the
+server's own overhead against realistic, deterministic upstreams.
+"""
+
+import asyncio
+import base64
+import contextlib
+import datetime
+import gzip
+import hashlib
+import inspect
+import json
+import os
+import tempfile
+import threading
+import time
+from collections import defaultdict, deque
+from typing import Any, Dict, Iterable, List, Tuple
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+CASSETTE_VERSION = 1
+MODES = ("record", "replay")
+REDACTED = "REDACTED"
+# Parameter and field names treated as credentials (matched as substrings, case-insensitively)
+SECRET_NAMES = ("token", "secret", "password", "api_key", "apikey", "access_key", "client_id", "signature", "key")
+# Response headers worth keeping; everything else is dropped to keep cassettes small
+KEPT_HEADERS = ("content-type", "etag", "link", "location", "retry-after",
+                "x-ratelimit-limit", "x-ratelimit-remaining", "x-ratelimit-reset")
+SECRET_HEADERS = ("authorization", "proxy-authorization", "cookie", "x-api-key")
+
+
+class CassetteMiss(RuntimeError):
+    """Raised on replay when nothing was recorded for a request."""
+
+
+def _is_secret(name: str) -> bool:
+    name = name.lower()
+    return any(secret in name for secret in SECRET_NAMES)
+
+
+def redact_url(url: str) -> str:
+    """URL with credential-like query parameters replaced and the rest sorted, for stable keys."""
+    parts = urlsplit(url)
+    query = sorted((name, REDACTED if _is_secret(name) else value)
+                   for name, value in parse_qsl(parts.query, keep_blank_values=True))
+    return urlunsplit((parts.scheme, parts.netloc, parts.path, urlencode(query), ""))
+
+
+def redact_value(value: Any) -> Any:
+    """Copy of a JSON-like value with credential-like fields replaced."""
+    if isinstance(value, dict):
+        return {k: REDACTED if _is_secret(str(k)) else redact_value(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [redact_value(v) for v in value]
+    return value
+
+
+def redact_body(body) -> str:
+    """Request body as text with credential-like JSON or form fields replaced."""
+    if body is None:
+        return ""
+    if isinstance(body, bytes):
+        try:
+            body = body.decode("utf-8")
+        except UnicodeDecodeError:
+            return "sha256:" + hashlib.sha256(body).hexdigest()
+    with contextlib.suppress(ValueError):
+        return json.dumps(redact_value(json.loads(body)), sort_keys=True, separators=(",", ":"))
+    if "=" in body:
+        return urlencode([(name, REDACTED if _is_secret(name) else value)
+                          for name, value in parse_qsl(body, keep_blank_values=True)])
+    return body
+
+
+def _secret_values(value: Any) -> List[str]:
+    """Values of credential-like fields anywhere in a JSON-like value."""
+    if isinstance(value, dict):
+        return [secret for k, v in value.items()
+                for secret in ([str(v)] if _is_secret(str(k)) and isinstance(v, (str, int)) else _secret_values(v))]
+    if isinstance(value, (list, tuple)):
+        return [secret for v in value for secret in _secret_values(v)]
+    return []
+
+
+def request_secrets(request) -> List[str]:
+    """Credentials sent with a request, so they can also be scrubbed from what the upstream echoes back."""
+    secrets = []
+    for name, value in request.headers.items():
+        if name.lower() in SECRET_HEADERS:
+            # "token abc" / "Client-ID abc": the credential alone may be echoed too
+            secrets += [value, value.split()[-1]] if value.split() else [value]
+    secrets += [value for name, value in parse_qsl(urlsplit(request.url).query) if _is_secret(name)]
+    body = request.body.decode("utf-8", "replace") if isinstance(request.body, bytes) else request.body
+    if body:
+        try:
+            secrets += _secret_values(json.loads(body))
+        except ValueError:
+            secrets += [value for name, value in parse_qsl(body) if _is_secret(name)]
+    # Short values would scrub unrelated text
+    return sorted({secret for secret in secrets if len(secret) >= 6}, key=len, reverse=True)
+
+
+def scrub(text: str, secrets: Iterable[str]) -> str:
+    for secret in secrets:
+        text = text.replace(secret, REDACTED)
+    return text
+
+
+def _encode(data: bytes) -> Dict[str, str]:
+    try:
+        return {"body": data.decode("utf-8")}
+    except UnicodeDecodeError:
+        return {"body_b64": base64.b64encode(data).decode("ascii")}
+
+
+def _decode(entry: Dict) -> bytes:
+    if "body_b64" in entry:
+        return base64.b64decode(entry["body_b64"])
+    return entry.get("body", "").encode("utf-8")
+
+
+class HttpCassette:
+    """Records upstream requests and responses, or replays them with original or scaled timing."""
+
+    def __init__(self, path: str, mode: str = "replay", timing: float = 1.0):
+        """
+        Args:
+            path: Cassette file (.json, or .json.gz for a compressed one)
+            mode: "record" to capture live traffic, "replay" to serve it back
+            timing: Factor applied to recorded latencies on replay (0 replays instantly)
+        """
+        if mode not in MODES:
+            raise ValueError(f"Unknown cassette mode: {mode} (use {' or '.join(MODES)})")
+        self.path = path
+        self.mode = mode
+        self.timing = max(0.0, timing)
+
+        self._lock = threading.Lock()
+        self._recorded: List[Dict] = []
+        # key -> recorded entries not replayed yet; the last one is reused once the others are used up
+        self._queues: Dict[str, deque] = defaultdict(deque)
+        self._stats = {"recorded": 0, "replayed": 0, "misses": 0}
+        if mode == "replay":
+            self._load()
+
+    @property
+    def replaying(self) -> bool:
+        return self.mode == "replay"
+
+    def _load(self) -> None:
+        opener = gzip.open if self.path.endswith(".gz") else open
+        with opener(self.path, "rt", encoding="utf-8") as f:
+            cassette = json.load(f)
+        if cassette.get("version") != CASSETTE_VERSION:
+            raise ValueError(f"Unsupported cassette version in {self.path}")
+        for entry in cassette["entries"]:
+            self._queues[entry["key"]].append(entry)
+
+    def save(self) -> None:
+        """Write the recorded entries (atomically, so a crash never leaves a torn cassette)."""
+        with self._lock:
+            entries = list(self._recorded)
+        if self.mode != "record" or not entries:
+            return
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+        text = json.dumps({"version": CASSETTE_VERSION, "entries": entries}, separators=(",", ":"))
+        fd, temp_path = tempfile.mkstemp(dir=directory, prefix=".cassette.", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                data = text.encode("utf-8")
+                f.write(gzip.compress(data) if self.path.endswith(".gz") else data)
+            os.replace(temp_path, self.path)
+        except BaseException:
+            with contextlib.suppress(OSError):
+                os.unlink(temp_path)
+            raise
+
+    def _record(self, entry: Dict) -> None:
+        with self._lock:
+            self._recorded.append(entry)
+            self._stats["recorded"] += 1
+
+    def _next(self, key: str) -> Dict:
+        with self._lock:
+            queue = self._queues.get(key)
+            if not queue:
+                self._stats["misses"] += 1
+                raise CassetteMiss(f"No recorded response for {key}")
+            self._stats["replayed"] += 1
+            return queue.popleft() if len(queue) > 1 else queue[0]
+
+    def delay(self, entry: Dict) -> float:
+        return entry.get("ms", 0.0) / 1000 * self.timing
+
+    def stats(self) -> Dict:
+        return {"mode": self.mode, **self._stats}
+
+    # --- requests sessions ---------------------------------------------------------------
+
+    @staticmethod
+    def http_key(request) -> str:
+        key = f"{request.method} {redact_url(request.url)}"
+        body = redact_body(request.body)
+        if body:
+            key += " " + hashlib.sha256(body.encode("utf-8")).hexdigest()[:16]
+        return key
+
+    def install(self, session, transport=None) -> None:
+        """
+        Route a requests.Session through the cassette.
+
+        Args:
+            session: Session to record or replay
+            transport: Adapter that sends live requests when recording (default: HTTPAdapter)
+        """
+        adapter = _cassette_adapter(self, transport)
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+
+    # --- clients without a session (Tavily) ----------------------------------------------
+
+    def client(self, host: str, client=None, methods: Iterable[str] = ("get_search_context",),
+               asynchronous: bool = False):
+        """
+        Record or replay calls to an SDK client's methods.
+
+        Args:
+            host: Upstream the client talks to (part of the key)
+            client: Live client to record; not needed for replay
+            methods: Method names to record or replay
+            asynchronous: Whether the methods are coroutines
+        """
+        return _RecordedClient(self, host, client, tuple(methods), asynchronous)
+
+    def call_key(self, host: str, method: str, args: Tuple, kwargs: Dict) -> str:
+        payload = json.dumps([redact_value(list(args)), redact_value(kwargs)], sort_keys=True, default=str)
+        return f"CALL {host} {method} {payload}"
+
+
+def _cassette_adapter(cassette: HttpCassette, transport=None):
+    # requests is imported here so the server does not load it at startup
+    import requests
+    from requests.adapters import BaseAdapter, HTTPAdapter
+    from requests.structures import CaseInsensitiveDict
+
+    class CassetteAdapter(BaseAdapter):
+        def __init__(self):
+            super().__init__()
+            self.transport = transport if transport is not None else HTTPAdapter()
+
+        def send(self, request, **kwargs):
+            key = cassette.http_key(request)
+            if cassette.replaying:
+                try:
+                    entry = cassette._next(key)
+                except CassetteMiss as e:
+                    raise requests.ConnectionError(str(e), request=request)
+                time.sleep(cassette.delay(entry))
+                if "error" in entry:
+                    raise requests.ConnectionError(entry["error"], request=request)
+                response = requests.Response()
+                response.status_code = entry["status"]
+                response.headers = CaseInsensitiveDict(entry.get("headers", {}))
+                response._content = _decode(entry)
+                response.encoding = "utf-8"
+                response.url = request.url
+                response.request = request
+                response.reason = entry.get("reason", "")
+                response.elapsed = datetime.timedelta(seconds=cassette.delay(entry))
+                return response
+
+            started = time.perf_counter()
+            try:
+                response = self.transport.send(request, **kwargs)
+                content = response.content
+            except requests.RequestException as e:
+                cassette._record({"key": key, "error": scrub(f"{type(e).__name__}: {e}", request_secrets(request)),
+                                  "ms": round((time.perf_counter() - started) * 1000, 2)})
+                raise
+            secrets = request_secrets(request)
+            body = _encode(content)
+            if "body" in body:
+                body["body"] = scrub(body["body"], secrets)
+            cassette._record({
+                "key": key,
+                "status": response.status_code,
+                "reason": response.reason,
+                "headers": {name: scrub(value, secrets) for name, value in response.headers.items()
+                            if name.lower() in KEPT_HEADERS},
+                **body,
+                "ms": round((time.perf_counter() - started) * 1000, 2),
+            })
+            return response
+
+        def close(self):
+            self.transport.close()
+
+    return CassetteAdapter()
+
+
+class _RecordedClient:
+    """Stands in for an SDK client, recording or replaying calls to selected methods."""
+
+    def __init__(self, cassette: HttpCassette, host: str, client, methods: Tuple[str, ...], asynchronous: bool):
+        self._cassette = cassette
+        self._host = host
+        self._client = client
+        self._methods = methods
+        self._asynchronous = asynchronous
+
+    def __getattr__(self, name: str):
+        if name not in self._methods:
+            if self._client is None:
+                raise AttributeError(f"'{name}' is not available while replaying")
+            return getattr(self._client, name)
+        if self._asynchronous:
+            async def async_method(*args, **kwargs):
+                return await self._call_async(name, args, kwargs)
+            return async_method
+        return lambda *args, **kwargs: self._call(name, args, kwargs)
+
+    @staticmethod
+    def _result(entry: Dict):
+        if "error" in entry:
+            raise RuntimeError(entry["error"])
+        return entry["result"]
+
+    def _call(self, name: str, args, kwargs):
+        key = self._cassette.call_key(self._host, name, args, kwargs)
+        if self._cassette.replaying:
+            entry = self._cassette._next(key)
+            time.sleep(self._cassette.delay(entry))
+            return self._result(entry)
+        started = time.perf_counter()
+        try:
+            result = getattr(self._client, name)(*args, **kwargs)
+        except Exception as e:
+            self._record_error(key, e, started)
+            raise
+        self._cassette._record({"key": key, "result": result, "ms": round((time.perf_counter() - started) * 1000, 2)})
+        return result
+
+    async def _call_async(self, name: str, args, kwargs):
+        key = self._cassette.call_key(self._host, name, args, kwargs)
+        if self._cassette.replaying:
+            entry = self._cassette._next(key)
+            await asyncio.sleep(self._cassette.delay(entry))
+            return self._result(entry)
+        started = time.perf_counter()
+        try:
+            result = getattr(self._client, name)(*args, **kwargs)
+            if inspect.isawaitable(result):
+                result = await result
+        except Exception as e:
+            self._record_error(key, e, started)
+            raise
+        self._cassette._record({"key": key, "result": result, "ms": round((time.perf_counter() - started) * 1000, 2)})
+        return result
+
+    def _record_error(self, key: str, error: Exception, started: float) -> None:
+        self._cassette._record({"key": key, "error": f"{type(error).__name__}: {error}",
+                                "ms": round((time.perf_counter() - started) * 1000, 2)})
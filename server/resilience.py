@@ -0,0 +1,351 @@
+"""
+Circuit Breakers and Hedged Requests for Upstream Calls
+
+When an upstream (Quotable, Unsplash, Tavily, GitHub) is down or very slow,
+every tool call would otherwise wait for a full request to fail before using
+its fallback. A circuit breaker per host counts failed and slow calls; after
+too many in a row it opens and calls fail immediately (so fallbacks are
+served at once) until a cool-down has passed and a single trial call
+succeeds.
+
+For latency-critical reads, a request can also be hedged: if the first
+attempt has not answered within the host's recent p95 latency, a second
+identical attempt is sent and whichever finishes first wins. The loser is
+cancelled if it has not started yet, or closed as soon as it answers.
+"""
+
+import asyncio
+import contextvars
+import functools
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Callable, Dict, Iterable, Optional
+from urllib.parse import urlsplit
+
+try:
+    # Try relative imports first (when run as module)
+    from .tracing import set_attribute
+except ImportError:
+    # Fall back to absolute imports (when run directly)
+    from tracing import set_attribute
+
+CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+IDEMPOTENT_METHODS = ("GET", "HEAD", "OPTIONS")
+
+
+class CircuitOpenError(RuntimeError):
+    """Raised instead of calling an upstream whose circuit is open."""
+
+
+@functools.cache
+def _requests_circuit_open_error():
+    """CircuitOpenError that is also a requests ConnectionError, so existing fallbacks catch it."""
+    import requests
+
+    class RequestsCircuitOpenError(CircuitOpenError, requests.exceptions.ConnectionError):
+        pass
+
+    return RequestsCircuitOpenError
+
+
+class CircuitBreaker:
+    """Consecutive-failure circuit breaker for one upstream host."""
+
+    def __init__(self, name: str, failure_threshold: int = 5, slow_call_seconds: float = 5.0,
+                 reset_timeout: float = 30.0):
+        """
+        Args:
+            name: Upstream host the breaker protects
+            failure_threshold: Consecutive failed or slow calls that open the circuit
+            slow_call_seconds: Calls taking at least this long count as failures
+            reset_timeout: Seconds the circuit stays open before a trial call is let through
+        """
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.slow_call_seconds = slow_call_seconds
+        self.reset_timeout = reset_timeout
+
+        self._lock = threading.Lock()
+        self._state = CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._trial_in_flight = False
+        self.trips = 0
+        self.rejected = 0
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self._state == OPEN and time.monotonic() - self._opened_at >= self.reset_timeout:
+                return HALF_OPEN
+            return self._state
+
+    def allow(self) -> bool:
+        """Whether a call may go to the upstream now."""
+        with self._lock:
+            if self._state == OPEN:
+                if time.monotonic() - self._opened_at < self.reset_timeout:
+                    self.rejected += 1
+                    return False
+                self._state = HALF_OPEN
+                self._trial_in_flight = False
+            if self._state == HALF_OPEN:
+                # Only one trial call at a time while the upstream is on probation
+                if self._trial_in_flight:
+                    self.rejected += 1
+                    return False
+                self._trial_in_flight = True
+            return True
+
+    def record_success(self, seconds: float = 0.0) -> None:
+        if seconds >= self.slow_call_seconds:
+            self.record_failure()
+            return
+        with self._lock:
+            self._failures = 0
+            self._state = CLOSED
+            self._trial_in_flight = False
+
+    def release(self) -> None:
+        """End a call without judging the upstream (the caller went away)."""
+        with self._lock:
+            self._trial_in_flight = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            self._trial_in_flight = False
+            if self._state == HALF_OPEN or self._failures >= self.failure_threshold:
+                if self._state != OPEN:
+                    self.trips += 1
+                self._state = OPEN
+                self._opened_at = time.monotonic()
+
+    def stats(self) -> Dict:
+        return {
+            "state": self.state,
+            "consecutive_failures": self._failures,
+            "trips": self.trips,
+            "rejected": self.rejected,
+        }
+
+
+class Hedger:
+    """Sends a second attempt when the first is slower than the host's recent p95."""
+
+    def __init__(self, quantile: float = 0.95, min_delay: float = 0.05, min_samples: int = 20,
+                 window: int = 200, max_workers: int = 8):
+        """
+        Args:
+            quantile: Latency quantile after which the hedge is sent
+            min_delay: Never hedge sooner than this many seconds
+            min_samples: Latencies needed for a host before hedging starts
+            window: Recent latencies kept per host
+            max_workers: Threads running hedged attempts
+        """
+        self.quantile = quantile
+        self.min_delay = min_delay
+        self.min_samples = min_samples
+        self.window = window
+        self._latencies: Dict[str, deque] = {}
+        self._lock = threading.Lock()
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self.max_workers = max_workers
+        self.hedged = 0
+        self.hedge_wins = 0
+
+    def observe(self, host: str, seconds: float) -> None:
+        with self._lock:
+            self._latencies.setdefault(host, deque(maxlen=self.window)).append(seconds)
+
+    def delay(self, host: str) -> Optional[float]:
+        """Seconds to wait before hedging, or None while too few latencies are known."""
+        with self._lock:
+            samples = sorted(self._latencies.get(host, ()))
+        if len(samples) < self.min_samples:
+            return None
+        return max(self.min_delay, samples[min(len(samples) - 1, int(self.quantile * len(samples)))])
+
+    def _submit(self, func: Callable):
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(self.max_workers, thread_name_prefix="mcp-hedge")
+        return self._executor.submit(contextvars.copy_context().run, func)
+
+    @staticmethod
+    def _abandon(future, discard: Optional[Callable]) -> None:
+        """Drop a losing attempt: cancel it if it has not started, otherwise discard its result when it ends."""
+        if future.cancel() or discard is None:
+            return
+
+        def done(finished):
+            if not finished.cancelled() and finished.exception() is None:
+                discard(finished.result())
+        future.add_done_callback(done)
+
+    def call(self, host: str, func: Callable, discard: Optional[Callable] = None):
+        """
+        Run func, hedging it with a second attempt if it is slower than usual.
+
+        Args:
+            host: Upstream whose latencies decide when to hedge
+            func: The attempt to run
+            discard: Called with the losing attempt's result (e.g. to close a response)
+        """
+        hedge_after = self.delay(host)
+        started = time.perf_counter()
+        if hedge_after is None:
+            result = func()
+            self.observe(host, time.perf_counter() - started)
+            return result
+
+        first = self._submit(func)
+        done, _ = wait([first], timeout=hedge_after)
+        if not done:
+            self.hedged += 1
+            second = self._submit(func)
+            done, _ = wait([first, second], return_when=FIRST_COMPLETED)
+            winner = first if first in done else second
+            other = second if winner is first else first
+            if winner.exception() is not None:
+                # The faster attempt failed; the other one may still succeed
+                winner = other
+            if winner is second:
+                self.hedge_wins += 1
+                set_attribute("hedge.won", True)
+            self._abandon(second if winner is first else first, discard)
+        else:
+            winner = first
+
+        result = winner.result()
+        self.observe(host, time.perf_counter() - started)
+        return result
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+class CircuitBreakerRegistry:
+    """One breaker per upstream host, plus default timeouts and optional hedging."""
+
+    def __init__(self, failure_threshold: int = 5, slow_call_seconds: float = 5.0,
+                 reset_timeout: float = 30.0, request_timeout: float = 10.0,
+                 hedge_hosts: Iterable[str] = (), hedger: Optional[Hedger] = None):
+        """
+        Args:
+            failure_threshold: Consecutive failed or slow calls that open a circuit
+            slow_call_seconds: Calls taking at least this long count as failures
+            reset_timeout: Seconds a circuit stays open before a trial call
+            request_timeout: Timeout applied to HTTP requests that do not set one
+            hedge_hosts: Hosts whose idempotent requests are hedged
+            hedger: Hedger to use (one is created if omitted)
+        """
+        self.failure_threshold = failure_threshold
+        self.slow_call_seconds = slow_call_seconds
+        self.reset_timeout = reset_timeout
+        self.request_timeout = request_timeout
+        self.hedge_hosts = frozenset(hedge_hosts)
+        self.hedger = hedger or Hedger()
+        self._breakers: Dict[str, CircuitBreaker] = {}
+        self._lock = threading.Lock()
+
+    def get(self, host: str) -> CircuitBreaker:
+        with self._lock:
+            if host not in self._breakers:
+                self._breakers[host] = CircuitBreaker(
+                    host, self.failure_threshold, self.slow_call_seconds, self.reset_timeout
+                )
+            return self._breakers[host]
+
+    def _check(self, host: str, error_type=CircuitOpenError) -> CircuitBreaker:
+        breaker = self.get(host)
+        if not breaker.allow():
+            set_attribute("circuit_breaker.open", host)
+            raise error_type(f"Circuit open for {host}: skipping call while the upstream recovers")
+        return breaker
+
+    def call(self, host: str, func: Callable, *args, **kwargs):
+        """
+        Call a blocking upstream function through the host's breaker.
+
+        Raises:
+            CircuitOpenError: If the circuit is open
+        """
+        breaker = self._check(host)
+        started = time.perf_counter()
+        try:
+            result = func(*args, **kwargs)
+        except Exception:
+            breaker.record_failure()
+            raise
+        breaker.record_success(time.perf_counter() - started)
+        return result
+
+    async def call_async(self, host: str, func: Callable, *args, **kwargs):
+        """Await an async upstream function through the host's breaker."""
+        breaker = self._check(host)
+        started = time.perf_counter()
+        try:
+            result = await func(*args, **kwargs)
+        except asyncio.CancelledError:
+            # A client that disconnected says nothing about the upstream
+            breaker.release()
+            raise
+        except Exception:
+            breaker.record_failure()
+            raise
+        breaker.record_success(time.perf_counter() - started)
+        return result
+
+    def protect_session(self, session) -> None:
+        """
+        Route every request made through a requests.Session via its host's breaker.
+
+        Requests without a timeout get request_timeout. 5xx and 429 responses
+        count as failures. While a circuit is open, requests raise a
+        CircuitOpenError that is also a requests ConnectionError, so callers'
+        existing fallbacks run without waiting on the network.
+        """
+        send = session.request
+        error_type = _requests_circuit_open_error()
+
+        @functools.wraps(send)
+        def request(method, url, *args, **kwargs):
+            host = urlsplit(url).netloc
+            breaker = self._check(host, error_type)
+            kwargs.setdefault("timeout", self.request_timeout)
+            attempt = functools.partial(send, method, url, *args, **kwargs)
+
+            started = time.perf_counter()
+            try:
+                if host in self.hedge_hosts and method.upper() in IDEMPOTENT_METHODS:
+                    # Attempts stream so the losing one is closed before its body is downloaded
+                    streamed = functools.partial(send, method, url, *args, **{**kwargs, "stream": True})
+                    response = self.hedger.call(host, streamed, discard=lambda loser: loser.close())
+                    if not kwargs.get("stream"):
+                        response.content  # read the winner's body, as a plain request would
+                else:
+                    response = attempt()
+            except Exception:
+                breaker.record_failure()
+                raise
+
+            if response.status_code >= 500 or response.status_code == 429:
+                breaker.record_failure()
+            else:
+                breaker.record_success(time.perf_counter() - started)
+            return response
+
+        session.request = request
+
+    def stats(self) -> Dict[str, Dict]:
+        with self._lock:
+            breakers = dict(self._breakers)
+        return {host: breaker.stats() for host, breaker in sorted(breakers.items())}
+
+    def shutdown(self) -> None:
+        self.hedger.shutdown()
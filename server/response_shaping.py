@@ -0,0 +1,304 @@
+"""
+Token-Budgeted Response Shaping
+
+Keeps tool output within a token budget so a single large file, search context
+or generated post cannot flood the agent's context window. Each tool gets a
+budget (overridable per call with max_tokens) and a trim strategy:
+
+- head: keep the beginning of the text
+- head_tail: keep the beginning and the end (useful for source files)
+- top_k: keep the first results of a JSON list (useful for search contexts)
+
+Whatever is trimmed is stored under a continuation handle that the agent can
+page through with the fetch_continuation tool.
+"""
+
+import functools
+import inspect
+import json
+import os
+import secrets
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, Optional, Tuple
+
+try:
+    # Try relative imports first (when run as module)
+    from .tokens import count_tokens, split_at_token, truncate_to_tokens
+except ImportError:
+    # Fall back to absolute imports (when run directly)
+    from tokens import count_tokens, split_at_token, truncate_to_tokens
+
+STRATEGIES = ("head", "head_tail", "top_k")
+# Length of a continuation handle (secrets.token_urlsafe(8))
+HANDLE_CHARS = 11
+
+
+class ContinuationStore:
+    """In-memory LRU store for the trimmed remainder of tool responses."""
+
+    def __init__(self, max_entries: int = 256, ttl_seconds: int = 30 * 60):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, Tuple[float, str, str]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def put(self, remainder: str, strategy: str) -> str:
+        """Store a remainder and return its handle."""
+        handle = secrets.token_urlsafe(8)
+        with self._lock:
+            self._entries[handle] = (time.time() + self.ttl_seconds, remainder, strategy)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return handle
+
+    def pop(self, handle: str) -> Optional[Tuple[str, str]]:
+        """Remove and return (remainder, strategy) for a handle, if it is still valid."""
+        with self._lock:
+            entry = self._entries.pop(handle, None)
+        if entry is None or entry[0] < time.time():
+            return None
+        return entry[1], entry[2]
+
+    def export_entries(self) -> Dict:
+        """Unexpired continuations as [handle, expires_at, remainder, strategy] rows, for snapshots."""
+        now = time.time()
+        with self._lock:
+            return {"entries": [[handle, *entry] for handle, entry in self._entries.items() if entry[0] > now]}
+
+    def import_entries(self, data: Dict) -> None:
+        """Restore continuations from export_entries, skipping expired ones."""
+        now = time.time()
+        with self._lock:
+            for handle, expires_at, remainder, strategy in data.get("entries", []):
+                if expires_at > now:
+                    self._entries.setdefault(handle, (expires_at, remainder, strategy))
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+
+class SqliteContinuationStore:
+    """
+    Continuation store shared through a SQLite file.
+
+    Used when several server worker processes sit behind one port, so a
+    handle created by one worker can be fetched from any other.
+    """
+
+    def __init__(self, path: str, max_entries: int = 1024, ttl_seconds: int = 30 * 60):
+        self.path = path
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self._connection: Optional[sqlite3.Connection] = None
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._connection is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            connection = sqlite3.connect(self.path, check_same_thread=False, timeout=10)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("""
+                CREATE TABLE IF NOT EXISTS continuations (
+                    handle TEXT PRIMARY KEY,
+                    expires_at REAL NOT NULL,
+                    remainder TEXT NOT NULL,
+                    strategy TEXT NOT NULL
+                )
+            """)
+            connection.commit()
+            self._connection = connection
+        return self._connection
+
+    def put(self, remainder: str, strategy: str) -> str:
+        handle = secrets.token_urlsafe(8)
+        now = time.time()
+        with self._lock:
+            connection = self._connect()
+            connection.execute(
+                "INSERT INTO continuations (handle, expires_at, remainder, strategy) VALUES (?, ?, ?, ?)",
+                (handle, now + self.ttl_seconds, remainder, strategy),
+            )
+            connection.execute("DELETE FROM continuations WHERE expires_at < ?", (now,))
+            connection.execute(
+                "DELETE FROM continuations WHERE handle NOT IN "
+                "(SELECT handle FROM continuations ORDER BY expires_at DESC LIMIT ?)",
+                (self.max_entries,),
+            )
+            connection.commit()
+        return handle
+
+    def pop(self, handle: str) -> Optional[Tuple[str, str]]:
+        with self._lock:
+            connection = self._connect()
+            row = connection.execute(
+                "SELECT expires_at, remainder, strategy FROM continuations WHERE handle = ?", (handle,)
+            ).fetchone()
+            connection.execute("DELETE FROM continuations WHERE handle = ?", (handle,))
+            connection.commit()
+        if row is None or row[0] < time.time():
+            return None
+        return row[1], row[2]
+
+    def close(self) -> None:
+        with self._lock:
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
+
+
+class ResponseShaper:
+    """Applies per-tool token budgets and trim strategies to tool output."""
+
+    def __init__(self, default_budget: int = 2000, budgets: Optional[Dict[str, int]] = None,
+                 store: Optional[ContinuationStore] = None):
+        """
+        Args:
+            default_budget: Token budget for tools without their own budget
+            budgets: Per-tool budgets that override the ones given at registration
+            store: Where trimmed remainders are kept for fetch_continuation
+        """
+        self.default_budget = default_budget
+        self.budget_overrides = budgets or {}
+        self.store = store or ContinuationStore()
+        self._budgets: Dict[str, int] = {}
+
+    def budget_for(self, tool_name: str) -> int:
+        return self.budget_overrides.get(tool_name, self._budgets.get(tool_name, self.default_budget))
+
+    def shape(self, text: str, budget: int, strategy: str = "head") -> str:
+        """
+        Trim text to the budget with the given strategy.
+
+        Returns:
+            The text unchanged if it fits, otherwise the trimmed text with a
+            continuation handle for the rest
+        """
+        if not isinstance(text, str) or budget <= 0 or len(text) <= budget:
+            return text
+        if count_tokens(text) <= budget:
+            return text
+
+        if strategy == "top_k":
+            shaped = self._shape_top_k(text, budget)
+            if shaped is not None:
+                return shaped
+        if strategy == "head_tail":
+            return self._shape_head_tail(text, budget)
+        return self._shape_head(text, budget)
+
+    def _shape_head(self, text: str, budget: int) -> str:
+        head, rest = split_at_token(text, budget)
+        handle = self.store.put(rest, "head")
+        return head + self._footer(handle, count_tokens(rest))
+
+    def _shape_head_tail(self, text: str, budget: int) -> str:
+        head, rest = split_at_token(text, budget * 2 // 3)
+        tail = truncate_to_tokens(rest, budget - budget * 2 // 3, from_end=True)
+        middle = rest[:len(rest) - len(tail)]
+        handle = self.store.put(middle, "head")
+        omitted = count_tokens(middle)
+        return (
+            f"{head}\n\n[... {omitted} tokens omitted - "
+            f'call fetch_continuation(handle="{handle}") to read them ...]\n\n{tail}'
+        )
+
+    def _shape_top_k(self, text: str, budget: int) -> Optional[str]:
+        """
+        Keep leading items of a JSON list; None if text is not a JSON list.
+
+        The page, separators and continuation marker included, stays within the
+        budget unless a single item is larger than the budget on its own.
+        """
+        try:
+            items = json.loads(text)
+        except ValueError:
+            return None
+        if not isinstance(items, list):
+            return None
+
+        # Room for the brackets and the marker, which includes the handle the store picks
+        marker = self._marker("x" * HANDLE_CHARS, len(items))
+        kept, used = [], count_tokens(json.dumps([marker]))
+        for item in items:
+            # Plus the ", " separator in front of it
+            tokens = count_tokens(json.dumps(item)) + 1
+            if used + tokens > budget and kept:
+                break
+            kept.append(item)
+            used += tokens
+
+        while True:
+            remaining = items[len(kept):]
+            if not remaining:
+                return json.dumps(kept)
+            handle = self.store.put(json.dumps(remaining), "top_k")
+            page = json.dumps(kept + [self._marker(handle, len(remaining))])
+            # Token counts of joined JSON are not strictly additive, so check the real page
+            if len(kept) <= 1 or count_tokens(page) <= budget:
+                return page
+            self.store.pop(handle)
+            kept.pop()
+
+    @staticmethod
+    def _marker(handle: str, remaining: int) -> Dict:
+        return {"continuation": handle, "remaining_results": remaining}
+
+    @staticmethod
+    def _footer(handle: str, remaining_tokens: int) -> str:
+        return (
+            f"\n\n[... truncated, {remaining_tokens} more tokens - "
+            f'call fetch_continuation(handle="{handle}") to continue]'
+        )
+
+    def continue_response(self, handle: str, budget: int = 0) -> str:
+        """Return the next page of a trimmed response."""
+        entry = self.store.pop(handle)
+        if entry is None:
+            return f"❌ Continuation '{handle}' not found or expired"
+        remainder, strategy = entry
+        return self.shape(remainder, budget or self.default_budget, strategy)
+
+    def shaped(self, func: Callable, strategy: str = "head", budget: Optional[int] = None) -> Callable:
+        """
+        Wrap a tool function so its output is shaped.
+
+        The wrapper accepts a max_tokens argument for a per-call budget. If the
+        tool already declares max_tokens it is passed through as well.
+        """
+        if strategy not in STRATEGIES:
+            raise ValueError(f"Unknown trim strategy: {strategy}")
+
+        tool_name = func.__name__
+        if budget is not None:
+            self._budgets[tool_name] = budget
+
+        signature = inspect.signature(func)
+        passes_max_tokens = "max_tokens" in signature.parameters
+
+        def call_budget(kwargs: Dict) -> int:
+            requested = kwargs.get("max_tokens") if passes_max_tokens else kwargs.pop("max_tokens", 0)
+            return requested or self.budget_for(tool_name)
+
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def wrapper(*args, **kwargs):
+                call_tokens = call_budget(kwargs)
+                return self.shape(await func(*args, **kwargs), call_tokens, strategy)
+        else:
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                call_tokens = call_budget(kwargs)
+                return self.shape(func(*args, **kwargs), call_tokens, strategy)
+
+        if not passes_max_tokens:
+            max_tokens = inspect.Parameter(
+                "max_tokens", inspect.Parameter.POSITIONAL_OR_KEYWORD, default=0, annotation=int
+            )
+            wrapper.__signature__ = signature.replace(
+                parameters=[*signature.parameters.values(), max_tokens]
+            )
+        return wrapper
@@ -0,0 +1,258 @@
+"""
+Persistent Search Cache for the web_search Tool
+
+Stores Tavily search contexts in a small SQLite database so repeated and
+near-identical queries are served from disk instead of the paid API.
+Entries expire after a TTL, the store is bounded by entry count and total
+size (least recently used entries are evicted first), and hit/miss counters
+are kept for reporting.
+"""
+
+import os
+import re
+import sqlite3
+import threading
+import time
+from typing import Dict, FrozenSet, List, Optional
+
+
+# Words that do not change what a search is about
+STOPWORDS = frozenset({
+    "a", "an", "the", "of", "for", "in", "on", "at", "to", "and", "or",
+    "about", "is", "are", "what", "whats", "me", "please", "find", "search",
+})
+
+_TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+
+
+def query_words(query: str) -> List[str]:
+    """Split a query into its meaningful lowercase words, in order and without repeats."""
+    tokens = _TOKEN_PATTERN.findall(query.lower())
+    # A query made only of stop words still needs a key
+    words = [token for token in tokens if token not in STOPWORDS] or tokens
+    return list(dict.fromkeys(words))
+
+
+def query_tokens(query: str) -> FrozenSet[str]:
+    """Split a query into its set of meaningful lowercase tokens."""
+    return frozenset(query_words(query))
+
+
+def normalize_query(query: str) -> str:
+    """
+    Normalise a query into a cache key.
+
+    Case, punctuation, stop words and repeated words are ignored, so "Latest
+    AI news?" and "the latest AI news" share a key. Word order is kept:
+    "flights from london to paris" is a different search from "flights from
+    paris to london".
+    """
+    return " ".join(query_words(query))
+
+
+def _same_order(words: List[str], other: List[str]) -> bool:
+    """Whether the words two queries share appear in the same order in both."""
+    shared = set(words) & set(other)
+    return [w for w in words if w in shared] == [w for w in other if w in shared]
+
+
+class SearchCache:
+    """SQLite-backed TTL cache for web search contexts."""
+
+    def __init__(self, path: str, ttl_seconds: int = 6 * 60 * 60, max_entries: int = 1000,
+                 max_bytes: int = 50 * 1024 * 1024, similarity_threshold: float = 0.8,
+                 near_match_window: int = 200):
+        """
+        Args:
+            path: Location of the SQLite database file
+            ttl_seconds: How long a search context stays fresh (0 disables the cache)
+            max_entries: Maximum number of cached queries
+            max_bytes: Maximum total size of cached contexts
+            similarity_threshold: Minimum token overlap (Jaccard) for a near-duplicate hit
+            near_match_window: Most recently used entries scanned for a near-duplicate on a miss
+        """
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.similarity_threshold = similarity_threshold
+        self.near_match_window = near_match_window
+
+        self._lock = threading.Lock()
+        self._connection: Optional[sqlite3.Connection] = None
+        self.hits = 0
+        self.near_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl_seconds > 0
+
+    def _connect(self) -> sqlite3.Connection:
+        """Open the database on first use."""
+        if self._connection is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            connection = sqlite3.connect(self.path, check_same_thread=False, timeout=10)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("""
+                CREATE TABLE IF NOT EXISTS search_cache (
+                    query_key TEXT PRIMARY KEY,
+                    context TEXT NOT NULL,
+                    size INTEGER NOT NULL,
+                    created_at REAL NOT NULL,
+                    last_access REAL NOT NULL
+                )
+            """)
+            connection.execute(
+                "CREATE INDEX IF NOT EXISTS search_cache_last_access ON search_cache (last_access)"
+            )
+            connection.commit()
+            self._connection = connection
+        return self._connection
+
+    def get(self, query: str) -> Optional[str]:
+        """Return the cached context for a query (or a near-duplicate of it), if still fresh."""
+        if not self.enabled:
+            return None
+
+        key = normalize_query(query)
+        now = time.time()
+        oldest_fresh = now - self.ttl_seconds
+
+        with self._lock:
+            connection = self._connect()
+            row = connection.execute(
+                "SELECT query_key, context FROM search_cache WHERE query_key = ? AND created_at >= ?",
+                (key, oldest_fresh),
+            ).fetchone()
+
+            if row is None:
+                row = self._find_near_duplicate(connection, key, oldest_fresh)
+                if row is not None:
+                    self.near_hits += 1
+            else:
+                self.hits += 1
+
+            if row is None:
+                self.misses += 1
+                return None
+
+            connection.execute(
+                "UPDATE search_cache SET last_access = ? WHERE query_key = ?", (now, row[0])
+            )
+            connection.commit()
+            return row[1]
+
+    def _find_near_duplicate(self, connection: sqlite3.Connection, key: str,
+                             oldest_fresh: float) -> Optional[tuple]:
+        """
+        Find the recent fresh entry whose tokens overlap most with the query's tokens.
+
+        Overlap ignores word order, but the shared words must still come in the
+        same order, so a reversed query is never served another's results. Only
+        the most recently used entries are scanned, so a miss stays cheap as the
+        table grows.
+        """
+        words = key.split()
+        tokens = frozenset(words)
+        if not tokens or self.near_match_window <= 0:
+            return None
+
+        best_row, best_score = None, self.similarity_threshold
+        rows = connection.execute(
+            "SELECT query_key FROM search_cache WHERE created_at >= ? ORDER BY last_access DESC LIMIT ?",
+            (oldest_fresh, self.near_match_window),
+        )
+        for (candidate_key,) in rows:
+            candidate_words = candidate_key.split()
+            candidate = frozenset(candidate_words)
+            score = len(tokens & candidate) / len(tokens | candidate)
+            if score >= best_score and _same_order(words, candidate_words):
+                best_row, best_score = candidate_key, score
+
+        if best_row is None:
+            return None
+        return connection.execute(
+            "SELECT query_key, context FROM search_cache WHERE query_key = ?", (best_row,)
+        ).fetchone()
+
+    def put(self, query: str, context: str) -> None:
+        """Store the context for a query and enforce the size bounds."""
+        if not self.enabled:
+            return
+
+        key = normalize_query(query)
+        size = len(context.encode("utf-8"))
+        if size > self.max_bytes:
+            return
+
+        now = time.time()
+        with self._lock:
+            connection = self._connect()
+            connection.execute(
+                "INSERT OR REPLACE INTO search_cache (query_key, context, size, created_at, last_access) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (key, context, size, now, now),
+            )
+            self._evict(connection, now)
+            connection.commit()
+
+    def _evict(self, connection: sqlite3.Connection, now: float) -> None:
+        """Drop expired entries, then least recently used ones until within bounds."""
+        connection.execute(
+            "DELETE FROM search_cache WHERE created_at < ?", (now - self.ttl_seconds,)
+        )
+
+        count, total_bytes = connection.execute(
+            "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM search_cache"
+        ).fetchone()
+        if count <= self.max_entries and total_bytes <= self.max_bytes:
+            return
+
+        rows = connection.execute(
+            "SELECT query_key, size FROM search_cache ORDER BY last_access ASC"
+        ).fetchall()
+        for query_key, size in rows:
+            if count <= self.max_entries and total_bytes <= self.max_bytes:
+                break
+            connection.execute("DELETE FROM search_cache WHERE query_key = ?", (query_key,))
+            count -= 1
+            total_bytes -= size
+            self.evictions += 1
+
+    def clear(self) -> None:
+        """Remove every cached entry."""
+        with self._lock:
+            connection = self._connect()
+            connection.execute("DELETE FROM search_cache")
+            connection.commit()
+
+    def close(self) -> None:
+        """Close the database connection (it is reopened on next use)."""
+        with self._lock:
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
+
+    def stats(self) -> Dict:
+        """Return hit/miss counters and storage usage."""
+        entries, total_bytes = 0, 0
+        if self.enabled:
+            with self._lock:
+                entries, total_bytes = self._connect().execute(
+                    "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM search_cache"
+                ).fetchone()
+
+        lookups = self.hits + self.near_hits + self.misses
+        return {
+            "hits": self.hits,
+            "near_hits": self.near_hits,
+            "misses": self.misses,
+            "hit_rate": (self.hits + self.near_hits) / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "entries": entries,
+            "bytes": total_bytes,
+        }
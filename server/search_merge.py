@@ -0,0 +1,76 @@
+"""
+Search Context Merging
+
+Combines the JSON search contexts returned by Tavily for several queries into
+one context: results are interleaved so every query's best hits come first,
+duplicate URLs are dropped, and the merged list is cut to a token budget.
+"""
+
+import json
+from typing import Dict, List, Sequence
+from urllib.parse import urlsplit, urlunsplit
+
+try:
+    # Try relative imports first (when run as module)
+    from .tokens import count_tokens
+except ImportError:
+    # Fall back to absolute imports (when run directly)
+    from tokens import count_tokens
+
+
+def canonical_url(url: str) -> str:
+    """Normalise a URL so trivially different links compare equal."""
+    parts = urlsplit(url.strip())
+    path = parts.path.rstrip("/")
+    return urlunsplit((parts.scheme.lower(), parts.netloc.lower(), path, parts.query, ""))
+
+
+def parse_context(context: str) -> List[Dict]:
+    """Parse a Tavily search context string into its list of results."""
+    try:
+        items = json.loads(context)
+    except (TypeError, ValueError):
+        return []
+    if isinstance(items, str):
+        # Older tavily-python releases double-encode the JSON payload
+        return parse_context(items)
+    return [item for item in items if isinstance(item, dict)] if isinstance(items, list) else []
+
+
+def merge_contexts(contexts: Dict[str, str], max_tokens: int = 4000) -> List[Dict]:
+    """
+    Merge search contexts for several queries.
+
+    Args:
+        contexts: Mapping of query to its Tavily search context string
+        max_tokens: Token budget for the merged results
+
+    Returns:
+        List of {"url", "content", "query"} results, deduplicated by URL
+    """
+    per_query: List[Sequence[Dict]] = [parse_context(context) for context in contexts.values()]
+    queries = list(contexts.keys())
+
+    merged, seen_urls, used_tokens = [], set(), 0
+    depth = max((len(results) for results in per_query), default=0)
+
+    # Round-robin so the top results of every query are kept before lower-ranked ones
+    for rank in range(depth):
+        for query, results in zip(queries, per_query):
+            if rank >= len(results):
+                continue
+            item = results[rank]
+            url = canonical_url(str(item.get("url", "")))
+            if not url or url in seen_urls:
+                continue
+
+            entry = {"url": item.get("url"), "content": item.get("content", ""), "query": query}
+            tokens = count_tokens(json.dumps(entry))
+            if used_tokens + tokens > max_tokens:
+                continue
+
+            seen_urls.add(url)
+            merged.append(entry)
+            used_tokens += tokens
+
+    return merged
@@ -0,0 +1,154 @@
+"""
+Cache Snapshots and Warm Start
+
+Every stdio client spawns a fresh server process, which would otherwise start
+with empty in-memory caches (GitHub summaries and prefetched responses,
+continuation handles) and fetch everything again. CacheSnapshotter writes
+each registered cache to a compact JSON file periodically and on shutdown,
+and restores it when the cache is registered. Backends are created lazily, so
+a snapshot is only read when its cache is first needed. Periodic snapshots
+only run once the server calls start(), so importing the server starts no
+threads.
+
+Caches export their entries with wall-clock expiry times, so TTLs keep
+counting while the server is down and expired entries are dropped on load.
+"""
+
+import contextlib
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from typing import Callable, Dict, Optional
+
+SNAPSHOT_VERSION = 1
+
+
+class CacheSnapshotter:
+    """Periodic and shutdown snapshots of registered in-memory caches."""
+
+    def __init__(self, directory: str, interval: float = 300.0, enabled: bool = True):
+        """
+        Args:
+            directory: Folder holding one <name>.json snapshot per cache
+            interval: Seconds between periodic snapshots (0 only snapshots on shutdown)
+            enabled: Whether snapshots are read and written at all
+        """
+        self.directory = directory
+        self.interval = interval
+        self.enabled = enabled
+
+        self._caches: Dict[str, tuple] = {}
+        # Digest of the last snapshot written per cache, to skip unchanged writes
+        self._digests: Dict[str, str] = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._stats = {"restored": 0, "saved": 0, "unchanged": 0, "errors": 0}
+
+    def path(self, name: str) -> str:
+        return os.path.join(self.directory, f"{name}.json")
+
+    def register(self, name: str, export: Callable[[], Optional[Dict]],
+                 restore: Callable[[Dict], None]) -> bool:
+        """
+        Add a cache and restore its last snapshot.
+
+        Args:
+            name: Snapshot file name
+            export: Returns the cache's JSON-serialisable state, or None to skip saving
+            restore: Loads state previously returned by export
+
+        Returns:
+            Whether a snapshot was restored
+        """
+        if not self.enabled:
+            return False
+        with self._lock:
+            self._caches[name] = (export, restore)
+        return self._restore(name, restore)
+
+    def _restore(self, name: str, restore: Callable[[Dict], None]) -> bool:
+        try:
+            with open(self.path(name), "r", encoding="utf-8") as f:
+                snapshot = json.load(f)
+            if snapshot.get("version") != SNAPSHOT_VERSION:
+                return False
+            restore(snapshot["data"])
+        except FileNotFoundError:
+            return False
+        except Exception:
+            # A corrupt or outdated snapshot only costs a cold start
+            self._stats["errors"] += 1
+            return False
+        self._stats["restored"] += 1
+        return True
+
+    def save(self, name: Optional[str] = None) -> None:
+        """Write the snapshot of one cache, or of every registered cache."""
+        with self._lock:
+            caches = {name: self._caches[name]} if name else dict(self._caches)
+        for cache_name, (export, _) in caches.items():
+            try:
+                data = export()
+                if data is None:
+                    continue
+                text = json.dumps({"version": SNAPSHOT_VERSION, "data": data}, separators=(",", ":"))
+                digest = hashlib.sha256(text.encode("utf-8")).hexdigest()
+                if self._digests.get(cache_name) == digest:
+                    self._stats["unchanged"] += 1
+                    continue
+                self._write(cache_name, text)
+                self._digests[cache_name] = digest
+                self._stats["saved"] += 1
+            except Exception:
+                self._stats["errors"] += 1
+
+    def _write(self, name: str, text: str) -> None:
+        """Write atomically, so a crash or a concurrent worker never leaves a torn file."""
+        os.makedirs(self.directory, exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(dir=self.directory, prefix=f".{name}.", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                f.write(text)
+            os.replace(temp_path, self.path(name))
+        except BaseException:
+            with contextlib.suppress(OSError):
+                os.unlink(temp_path)
+            raise
+
+    def start(self) -> None:
+        """Start writing snapshots every interval seconds in a background thread."""
+        if not self.enabled:
+            return
+        with self._lock:
+            if self._thread is not None or self.interval <= 0:
+                return
+            self._thread = threading.Thread(target=self._loop, name="cache-snapshots", daemon=True)
+            self._thread.start()
+
+    def _loop(self) -> None:
+        while not self._stop.wait(self.interval):
+            self.save()
+
+    def stats(self) -> Dict:
+        return {**self._stats, "caches": len(self._caches)}
+
+    def shutdown(self) -> None:
+        """Stop periodic snapshots and write a final one."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+        self.save()
+
+
+def to_wall_clock(monotonic_deadline: float) -> float:
+    """Convert a time.monotonic() deadline into a time.time() one that survives restarts."""
+    return time.time() + (monotonic_deadline - time.monotonic())
+
+
+def to_monotonic(wall_clock_deadline: float) -> float:
+    """Convert a time.time() deadline back into a time.monotonic() one."""
+    return time.monotonic() + (wall_clock_deadline - time.time())
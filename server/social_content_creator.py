@@ -3,6 +3,13 @@ import random
 import os
 from typing import Dict, Optional
 
+try:
+    # Try relative imports first (when run as module)
+    from .tracing import set_attribute, trace_session, traced
+except ImportError:
+    # Fall back to absolute imports (when run directly)
+    from tracing import set_attribute, trace_session, traced
+
 
 class SocialContentCreator:
     """A class to create social media content using free APIs."""
@@ -11,7 +18,10 @@ class SocialContentCreator:
         self.unsplash_access_key = os.getenv("UNSPLASH_ACCESS_KEY")
         self.quotable_base_url = "https://api.quotable.io"
         self.unsplash_base_url = "https://api.unsplash.com"
+        self.session = requests.Session()
+        trace_session(self.session)
         
+    @traced(name="social.get_random_quote")
     def get_random_quote(self, min_length: int = 50, max_length: int = 140) -> Dict:
         """Get a random inspirational quote from Quotable API."""
         try:
@@ -20,11 +30,12 @@ class SocialContentCreator:
                 "maxLength": max_length,
                 "tags": "inspirational|motivational|success|wisdom"
             }
-            response = requests.get(f"{self.quotable_base_url}/random", params=params)
+            response = self.session.get(f"{self.quotable_base_url}/random", params=params)
             response.raise_for_status()
             return response.json()
         except requests.exceptions.RequestException as e:
             # Fallback quotes if API fails
+            set_attribute("social.fallback", "builtin_quotes")
             fallback_quotes = [
                 {"content": "The only way to do great work is to love what you do.", "author": "Steve Jobs"},
                 {"content": "Innovation distinguishes between a leader and a follower.", "author": "Steve Jobs"},
@@ -33,10 +44,12 @@ class SocialContentCreator:
             ]
             return random.choice(fallback_quotes)
     
+    @traced(name="social.search_unsplash_images")
     def search_unsplash_images(self, query: str, per_page: int = 10) -> Dict:
         """Search for images on Unsplash."""
         if not self.unsplash_access_key:
             # Return Lorem Picsum fallback if no Unsplash key
+            set_attribute("social.fallback", "picsum")
             return {
                 "results": [
                     {
@@ -58,12 +71,13 @@ class SocialContentCreator:
                 "per_page": per_page,
                 "orientation": "landscape"
             }
-            response = requests.get(f"{self.unsplash_base_url}/search/photos", 
-                                  headers=headers, params=params)
+            response = self.session.get(f"{self.unsplash_base_url}/search/photos", 
+                                        headers=headers, params=params)
             response.raise_for_status()
             return response.json()
         except requests.exceptions.RequestException as e:
             # Fallback to Lorem Picsum
+            set_attribute("social.fallback", "picsum")
             return {
                 "results": [
                     {
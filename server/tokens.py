@@ -0,0 +1,89 @@
+"""
+Token Counting Utilities
+
+Counts tokens with tiktoken's cl100k_base encoding (the same family used by
+the OpenAI models the agent runs on). tiktoken downloads its encoding on first
+use, so when it is unavailable or offline we fall back to a character-based
+estimate instead of failing the tool call.
+"""
+
+from typing import Tuple
+
+ENCODING_NAME = "cl100k_base"
+CHARS_PER_TOKEN = 4
+
+_encoding = None
+_encoding_failed = False
+
+
+def _get_encoding():
+    """Load the tiktoken encoding once; remember if it cannot be loaded."""
+    global _encoding, _encoding_failed
+    if _encoding is None and not _encoding_failed:
+        try:
+            import tiktoken
+            _encoding = tiktoken.get_encoding(ENCODING_NAME)
+        except Exception:
+            _encoding_failed = True
+    return _encoding
+
+
+def count_tokens(text: str) -> int:
+    """Return the number of tokens in text."""
+    if not text:
+        return 0
+    encoding = _get_encoding()
+    if encoding is None:
+        return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+    return len(encoding.encode(text, disallowed_special=()))
+
+
+def split_at_token(text: str, num_tokens: int) -> Tuple[str, str]:
+    """
+    Split text after its first num_tokens tokens.
+
+    Returns:
+        (head, rest) where head holds at most num_tokens tokens and
+        head + rest == text
+    """
+    if num_tokens <= 0:
+        return "", text
+    if len(text) <= num_tokens:
+        # Every token covers at least one character
+        return text, ""
+
+    encoding = _get_encoding()
+    if encoding is None:
+        cut = num_tokens * CHARS_PER_TOKEN
+        return text[:cut], text[cut:]
+
+    tokens = encoding.encode(text, disallowed_special=())
+    if len(tokens) <= num_tokens:
+        return text, ""
+    # Cut on a character boundary even when a token ends mid-character
+    head_bytes = encoding.decode_bytes(tokens[:num_tokens])
+    head = head_bytes.decode("utf-8", errors="ignore")
+    return head, text[len(head):]
+
+
+def truncate_to_tokens(text: str, max_tokens: int, from_end: bool = False) -> str:
+    """
+    Cut text down to at most max_tokens tokens.
+
+    Args:
+        text: Text to truncate
+        max_tokens: Token budget
+        from_end: Keep the last tokens instead of the first ones
+
+    Returns:
+        The truncated text (unchanged if it already fits)
+    """
+    if max_tokens <= 0:
+        return ""
+    if not from_end:
+        return split_at_token(text, max_tokens)[0]
+
+    total = count_tokens(text)
+    if total <= max_tokens:
+        return text
+    return split_at_token(text, total - max_tokens)[1]
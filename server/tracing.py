@@ -0,0 +1,366 @@
+"""
+Request Tracing
+
+Lightweight, OpenTelemetry-style spans for seeing where the time goes inside
+a single tool call (cache lookup, upstream HTTP, decoding, formatting).
+
+A trace starts at the tool call and child spans attach to it through a
+context variable, which the thread pools copy into their workers. Whether a
+trace is recorded is decided once at its root span, so with a low sample rate
+unsampled calls only pay for one random() call and a context variable lookup.
+
+Finished spans are batched on a background thread and written either to a
+JSON-lines file or to an OTLP/HTTP collector (JSON encoding).
+"""
+
+import contextvars
+import functools
+import inspect
+import json
+import os
+import queue
+import random
+import secrets
+import threading
+import time
+from typing import Callable, Dict, List, Optional
+from urllib.parse import urlsplit
+
+
+class Span:
+    """A timed operation within a trace."""
+
+    def __init__(self, name: str, trace_id: str, parent_id: Optional[str], attributes: Dict):
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = secrets.token_hex(8)
+        self.parent_id = parent_id
+        self.attributes = attributes
+        self.status = "ok"
+        self.error: Optional[str] = None
+        self.start_ns = time.time_ns()
+        self.end_ns: Optional[int] = None
+
+    @property
+    def sampled(self) -> bool:
+        return True
+
+    def set_attribute(self, key: str, value) -> None:
+        self.attributes[key] = value
+
+    def record_error(self, message: str) -> None:
+        self.status = "error"
+        self.error = message
+
+    @property
+    def duration_ms(self) -> float:
+        return ((self.end_ns or time.time_ns()) - self.start_ns) / 1e6
+
+    def to_dict(self) -> Dict:
+        return {
+            "name": self.name,
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "start_time_unix_nano": self.start_ns,
+            "end_time_unix_nano": self.end_ns,
+            "duration_ms": round(self.duration_ms, 3),
+            "status": self.status,
+            "error": self.error,
+            "attributes": self.attributes,
+        }
+
+
+class _NonRecordingSpan:
+    """Stands in for spans of unsampled traces; every method is a no-op."""
+
+    sampled = False
+    trace_id = span_id = None
+
+    def set_attribute(self, key: str, value) -> None:
+        pass
+
+    def record_error(self, message: str) -> None:
+        pass
+
+
+NON_RECORDING_SPAN = _NonRecordingSpan()
+_current_span: contextvars.ContextVar = contextvars.ContextVar("mcp_current_span", default=None)
+
+
+class JsonLinesExporter:
+    """Appends finished spans to a file, one JSON object per line."""
+
+    def __init__(self, path: str):
+        self.path = path
+
+    def export(self, spans: List[Span]) -> None:
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(self.path, "a", encoding="utf-8") as trace_file:
+            for span in spans:
+                trace_file.write(json.dumps(span.to_dict(), default=str) + "\n")
+
+
+class OtlpHttpExporter:
+    """Posts spans to an OTLP/HTTP collector endpoint using the JSON encoding."""
+
+    def __init__(self, endpoint: str, service_name: str = "mcp-server", timeout: float = 5.0):
+        self.endpoint = endpoint
+        self.service_name = service_name
+        self.timeout = timeout
+
+    @staticmethod
+    def _attribute(key: str, value) -> Dict:
+        if isinstance(value, bool):
+            return {"key": key, "value": {"boolValue": value}}
+        if isinstance(value, int):
+            return {"key": key, "value": {"intValue": str(value)}}
+        if isinstance(value, float):
+            return {"key": key, "value": {"doubleValue": value}}
+        return {"key": key, "value": {"stringValue": str(value)}}
+
+    def payload(self, spans: List[Span]) -> Dict:
+        return {
+            "resourceSpans": [{
+                "resource": {"attributes": [self._attribute("service.name", self.service_name)]},
+                "scopeSpans": [{
+                    "scope": {"name": "mcp-server.tracing"},
+                    "spans": [{
+                        "traceId": span.trace_id,
+                        "spanId": span.span_id,
+                        "parentSpanId": span.parent_id or "",
+                        "name": span.name,
+                        "kind": 1,
+                        "startTimeUnixNano": str(span.start_ns),
+                        "endTimeUnixNano": str(span.end_ns),
+                        "attributes": [self._attribute(k, v) for k, v in span.attributes.items()],
+                        "status": {"code": 2, "message": span.error or ""} if span.status == "error" else {"code": 1},
+                    } for span in spans],
+                }],
+            }],
+        }
+
+    def export(self, spans: List[Span]) -> None:
+        import urllib.request
+
+        request = urllib.request.Request(
+            self.endpoint,
+            data=json.dumps(self.payload(spans)).encode("utf-8"),
+            headers={"Content-Type": "application/json"},
+            method="POST",
+        )
+        with urllib.request.urlopen(request, timeout=self.timeout):
+            pass
+
+
+class InMemoryExporter:
+    """Keeps finished spans in a list (for tests and ad-hoc inspection)."""
+
+    def __init__(self):
+        self.spans: List[Span] = []
+
+    def export(self, spans: List[Span]) -> None:
+        self.spans.extend(spans)
+
+
+class Tracer:
+    """Creates spans, samples traces and hands finished spans to an exporter."""
+
+    def __init__(self, sample_rate: float = 0.0, exporter=None, batch_size: int = 256,
+                 flush_interval: float = 2.0, max_queue: int = 10000):
+        """
+        Args:
+            sample_rate: Fraction of traces to record (0 disables tracing)
+            exporter: Object with an export(spans) method
+            batch_size: Spans exported per batch
+            flush_interval: Seconds between background exports
+            max_queue: Finished spans kept waiting for export before new ones are dropped
+        """
+        self.sample_rate = sample_rate if exporter is not None else 0.0
+        self.exporter = exporter
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.dropped = 0
+        self.export_errors = 0
+        self._queue: "queue.Queue[Span]" = queue.Queue(maxsize=max_queue)
+        self._export_lock = threading.Lock()
+        self._worker: Optional[threading.Thread] = None
+        self._stopping = threading.Event()
+
+    @property
+    def enabled(self) -> bool:
+        return self.sample_rate > 0
+
+    def span(self, name: str, **attributes) -> "_SpanScope":
+        """
+        Start a span as a context manager.
+
+        The span is a child of the current span, or the root of a new trace
+        (sampled at sample_rate) when there is none.
+        """
+        return _SpanScope(self, name, attributes)
+
+    def _start(self, name: str, attributes: Dict):
+        parent = _current_span.get()
+        if parent is None:
+            if not self.enabled or random.random() >= self.sample_rate:
+                return NON_RECORDING_SPAN
+            return Span(name, secrets.token_hex(16), None, attributes)
+        if not parent.sampled:
+            return NON_RECORDING_SPAN
+        return Span(name, parent.trace_id, parent.span_id, attributes)
+
+    def _finish(self, span: Span) -> None:
+        span.end_ns = time.time_ns()
+        try:
+            self._queue.put_nowait(span)
+        except queue.Full:
+            self.dropped += 1
+            return
+        if self._worker is None:
+            self._start_worker()
+
+    def _start_worker(self) -> None:
+        with self._export_lock:
+            if self._worker is None:
+                self._worker = threading.Thread(target=self._export_loop, name="mcp-trace-export", daemon=True)
+                self._worker.start()
+
+    def _export_loop(self) -> None:
+        while not self._stopping.wait(self.flush_interval):
+            self.flush()
+
+    def flush(self) -> None:
+        """Export every finished span that is waiting."""
+        with self._export_lock:
+            while True:
+                batch = []
+                while len(batch) < self.batch_size:
+                    try:
+                        batch.append(self._queue.get_nowait())
+                    except queue.Empty:
+                        break
+                if not batch:
+                    return
+                try:
+                    self.exporter.export(batch)
+                except Exception:
+                    # Tracing must never break a tool call
+                    self.export_errors += 1
+
+    def shutdown(self) -> None:
+        """Stop the background exporter and flush what is left."""
+        self._stopping.set()
+        if self.exporter is not None:
+            self.flush()
+
+
+class _SpanScope:
+    """Context manager that activates a span for the duration of a block."""
+
+    __slots__ = ("tracer", "name", "attributes", "span", "token")
+
+    def __init__(self, tracer: Tracer, name: str, attributes: Dict):
+        self.tracer = tracer
+        self.name = name
+        self.attributes = attributes
+
+    def __enter__(self):
+        self.span = self.tracer._start(self.name, self.attributes)
+        if not self.span.sampled and _current_span.get() is not None:
+            # Already inside an unsampled trace: nothing to activate
+            self.token = None
+            return self.span
+        self.token = _current_span.set(self.span)
+        return self.span
+
+    def __exit__(self, exc_type, exc, tb):
+        if self.token is not None:
+            _current_span.reset(self.token)
+        if self.span.sampled:
+            if exc is not None:
+                self.span.record_error(f"{exc_type.__name__}: {exc}")
+            self.tracer._finish(self.span)
+        return False
+
+
+tracer = Tracer()
+
+
+def configure(sample_rate: float = 0.0, exporter=None, **options) -> Tracer:
+    """Replace the process-wide tracer used by span() and the tool backends."""
+    global tracer
+    tracer.shutdown()
+    tracer = Tracer(sample_rate, exporter, **options)
+    return tracer
+
+
+def span(name: str, **attributes):
+    """Start a span on the process-wide tracer."""
+    return tracer.span(name, **attributes)
+
+
+def current_span():
+    """The active span, or None outside any trace."""
+    return _current_span.get()
+
+
+def set_attribute(key: str, value) -> None:
+    """Set an attribute on the active span, if there is one."""
+    active = _current_span.get()
+    if active is not None:
+        active.set_attribute(key, value)
+
+
+def traced(func: Optional[Callable] = None, name: Optional[str] = None) -> Callable:
+    """
+    Wrap a function so each call runs inside its own span.
+
+    Can be applied directly (@traced) or with a span name (@traced(name="...")).
+    """
+    if func is None:
+        return functools.partial(traced, name=name)
+    span_name = name or func.__name__
+
+    def finish(scope, result):
+        if isinstance(result, str) and result.startswith("❌"):
+            scope.record_error(result[:200])
+
+    if inspect.iscoroutinefunction(func):
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            with span(span_name) as scope:
+                result = await func(*args, **kwargs)
+                finish(scope, result)
+                return result
+    else:
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with span(span_name) as scope:
+                result = func(*args, **kwargs)
+                finish(scope, result)
+                return result
+    return wrapper
+
+
+def trace_session(session) -> None:
+    """Record a span around every HTTP request made through a requests.Session."""
+    send = session.request
+
+    @functools.wraps(send)
+    def request(method, url, *args, **kwargs):
+        parts = urlsplit(url)
+        with span(f"HTTP {method.upper()}", **{
+            "http.method": method.upper(),
+            "server.address": parts.netloc,
+            "url.path": parts.path,
+        }) as scope:
+            response = send(method, url, *args, **kwargs)
+            scope.set_attribute("http.status_code", response.status_code)
+            if response.status_code >= 400:
+                scope.record_error(f"HTTP {response.status_code}")
+            return response
+
+    session.request = request
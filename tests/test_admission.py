@@ -0,0 +1,150 @@
+"""
+Pytest tests for admission control and load shedding.
+"""
+
+import sys
+import os
+import asyncio
+import contextvars
+import pytest
+
+# Add parent directory to path to import server module
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from server.admission import AdmissionController, AdmissionRejected
+
+caller = contextvars.ContextVar("caller", default="alice")
+
+
+def controller(**options):
+    return AdmissionController(client_id=caller.get, **options)
+
+
+async def hold(admission, tool, priority, release, client="alice", order=None):
+    """Run one admitted call that lasts until release is set."""
+    caller.set(client)
+
+    async def body():
+        if order is not None:
+            order.append((tool, priority, client))
+        await release.wait()
+        return "done"
+
+    return await admission.admit(body, tool, priority)()
+
+
+class TestAdmissionController:
+    """Test suite for AdmissionController."""
+
+    @pytest.mark.asyncio
+    async def test_tool_limit_queues_then_runs(self):
+        """Calls beyond a tool's limit wait and start as slots free up."""
+        admission = controller(tool_limits={"web_search": 1})
+        release = asyncio.Event()
+        calls = [asyncio.create_task(hold(admission, "web_search", "bulk", release)) for _ in range(3)]
+        await asyncio.sleep(0.01)
+
+        stats = admission.stats()["web_search"]
+        assert stats["running"] == 1 and stats["queued"] == 2
+
+        release.set()
+        assert await asyncio.gather(*calls) == ["done"] * 3
+        assert admission.stats()["web_search"]["admitted"] == 3
+
+    @pytest.mark.asyncio
+    async def test_full_queue_sheds(self):
+        """Once a tool's queue is full, further calls are rejected at once."""
+        admission = controller(tool_limits={"web_search": 1}, tool_queues={"web_search": 1})
+        release = asyncio.Event()
+        calls = [asyncio.create_task(hold(admission, "web_search", "bulk", release)) for _ in range(2)]
+        await asyncio.sleep(0.01)
+
+        result = await hold(admission, "web_search", "bulk", release)
+        assert result.startswith("❌ Server busy")
+        assert admission.stats()["web_search"]["shed"] == {"queue_full": 1}
+        release.set()
+        await asyncio.gather(*calls)
+
+    @pytest.mark.asyncio
+    async def test_deadline_estimate_sheds_on_arrival(self):
+        """A call that would wait past its deadline is rejected without queueing."""
+        admission = controller(tool_limits={"web_search": 1}, deadlines={"bulk": 0.5})
+        admission._service_seconds["web_search"] = 1.0
+        release = asyncio.Event()
+        running = asyncio.create_task(hold(admission, "web_search", "bulk", release))
+        await asyncio.sleep(0.01)
+
+        with pytest.raises(AdmissionRejected) as rejected:
+            await admission.acquire("web_search", "bulk")
+        assert rejected.value.reason == "deadline"
+        assert admission.stats()["web_search"]["queued"] == 0
+        release.set()
+        await running
+
+    @pytest.mark.asyncio
+    async def test_deadline_expires_while_queued(self):
+        """A queued call is dropped when its deadline passes."""
+        admission = controller(tool_limits={"web_search": 1}, deadlines={"bulk": 0.05})
+        release = asyncio.Event()
+        running = asyncio.create_task(hold(admission, "web_search", "bulk", release))
+        await asyncio.sleep(0.01)
+
+        with pytest.raises(AdmissionRejected) as rejected:
+            await admission.acquire("web_search", "bulk")
+        assert rejected.value.reason == "expired"
+        assert admission.stats()["web_search"]["queued"] == 0
+        release.set()
+        await running
+
+    @pytest.mark.asyncio
+    async def test_waiters_are_served_by_priority(self):
+        """When a client slot frees up, its standard call goes before its bulk call."""
+        admission = controller(client_limit=1)
+        release, order = asyncio.Event(), []
+        first = asyncio.create_task(hold(admission, "web_search", "bulk", release, order=order))
+        await asyncio.sleep(0.01)
+        bulk = asyncio.create_task(hold(admission, "web_search", "bulk", release, order=order))
+        await asyncio.sleep(0.01)
+        standard = asyncio.create_task(hold(admission, "github_list_files", "standard", release, order=order))
+        await asyncio.sleep(0.01)
+
+        release.set()
+        await asyncio.gather(first, bulk, standard)
+        assert [tool for tool, _, _ in order] == ["web_search", "github_list_files", "web_search"]
+
+    @pytest.mark.asyncio
+    async def test_noisy_client_does_not_block_others(self):
+        """One client at its limit leaves other clients and interactive tools unaffected."""
+        admission = controller(client_limit=2)
+        release = asyncio.Event()
+        spam = [asyncio.create_task(hold(admission, "web_search", "bulk", release, client="spammer"))
+                for _ in range(5)]
+        await asyncio.sleep(0.01)
+        assert admission.stats()["web_search"]["queued"] == 3
+
+        caller.set("spammer")
+        await asyncio.wait_for(admission.acquire("roll_dice", "interactive"), 0.1)
+        caller.set("bob")
+        await asyncio.wait_for(admission.acquire("web_search", "bulk"), 0.1)
+        assert admission.stats()["web_search"]["running"] == 3
+
+        release.set()
+        await asyncio.gather(*spam)
+
+    @pytest.mark.asyncio
+    async def test_cancelled_waiter_leaves_the_queue(self):
+        """A call cancelled while queued frees its queue place."""
+        admission = controller(tool_limits={"web_search": 1})
+        release = asyncio.Event()
+        running = asyncio.create_task(hold(admission, "web_search", "bulk", release))
+        await asyncio.sleep(0.01)
+        waiting = asyncio.create_task(hold(admission, "web_search", "bulk", release))
+        await asyncio.sleep(0.01)
+
+        waiting.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiting
+        assert admission.stats()["web_search"]["queued"] == 0
+        release.set()
+        await running
+        assert admission.stats()["web_search"]["running"] == 0
@@ -0,0 +1,97 @@
+"""
+Pytest tests for the concurrent batch runner.
+
+Conversations run against a fake agent graph that sleeps and records how
+many conversations are in flight, so no OpenAI key or server is needed.
+"""
+
+import asyncio
+import json
+import os
+import sys
+
+import pytest
+from langchain_core.messages import AIMessage, ToolMessage
+from langchain_core.rate_limiters import InMemoryRateLimiter
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from client.batch_runner import BatchRunner, load_prompts, percentile
+from client.langgraph_agent import MCPLangGraphAgent
+
+
+class FakeGraph:
+    """Answers each prompt after a short delay; prompts containing "fail" raise."""
+
+    def __init__(self):
+        self.in_flight = 0
+        self.peak = 0
+
+    async def ainvoke(self, state):
+        prompt = state["messages"][0][1]
+        self.in_flight += 1
+        self.peak = max(self.peak, self.in_flight)
+        try:
+            await asyncio.sleep(0.05)
+            if "fail" in prompt:
+                raise RuntimeError("model unavailable")
+            return {"messages": [ToolMessage("🎲 4", tool_call_id="1"), AIMessage(f"answer to {prompt}")]}
+        finally:
+            self.in_flight -= 1
+
+
+@pytest.fixture
+def agent():
+    agent = MCPLangGraphAgent(openai_api_key="sk-test")
+    agent.agent = FakeGraph()
+    return agent
+
+
+class TestBatchRunner:
+    """Test suite for BatchRunner."""
+
+    def test_load_prompts_accepts_backlog_style_files(self, tmp_path):
+        """Prompts come from prompt/body fields or bare strings; ids default to line numbers."""
+        path = tmp_path / "prompts.jsonl"
+        path.write_text('{"request_id": "r-1", "title": "t", "body": "Roll 2d6"}\n'
+                        '\n'
+                        '"Search for AI news"\n'
+                        '{"prompt": "Create a quote card"}\n')
+
+        assert load_prompts(str(path)) == [
+            {"id": "r-1", "prompt": "Roll 2d6"},
+            {"id": "3", "prompt": "Search for AI news"},
+            {"id": "4", "prompt": "Create a quote card"},
+        ]
+
+    @pytest.mark.asyncio
+    async def test_runs_concurrently_and_streams_results(self, agent, tmp_path):
+        """Conversations overlap up to the limit, failures are recorded, and every result is written."""
+        prompts = [{"id": str(i), "prompt": f"prompt {i}"} for i in range(8)] + [{"id": "bad", "prompt": "fail"}]
+        output = tmp_path / "results.jsonl"
+
+        started = asyncio.get_running_loop().time()
+        report = await BatchRunner(agent, concurrency=4).run(prompts, str(output))
+        elapsed = asyncio.get_running_loop().time() - started
+
+        assert agent.agent.peak == 4, f"Expected 4 conversations in flight, saw {agent.agent.peak}"
+        assert elapsed < 0.05 * len(prompts), "Conversations should not run one at a time"
+
+        records = {record["id"]: record for record in map(json.loads, output.read_text().splitlines())}
+        assert len(records) == 9
+        assert records["3"]["answer"] == "answer to prompt 3" and records["3"]["tool_calls"] == 1
+        assert not records["bad"]["ok"] and "model unavailable" in records["bad"]["error"]
+
+        assert report["conversations"] == 9 and report["failed"] == 1
+        assert report["latency_ms"]["p50"] <= report["latency_ms"]["p99"] <= report["latency_ms"]["max"]
+        assert report["throughput_per_minute"] > 0
+
+    def test_percentile_and_rate_limiter_wiring(self):
+        """Nearest-rank percentiles, and the agent's model uses the shared rate limiter."""
+        values = list(range(1, 101))
+        assert (percentile(values, 50), percentile(values, 90), percentile(values, 99)) == (50, 90, 99)
+        assert percentile([], 50) is None
+
+        limiter = InMemoryRateLimiter(requests_per_second=2)
+        agent = MCPLangGraphAgent(openai_api_key="sk-test", rate_limiter=limiter)
+        assert agent.llm.rate_limiter is limiter
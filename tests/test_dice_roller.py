@@ -0,0 +1,93 @@
+"""
+Pytest tests for the dice roller, including count-based sampling of large pools.
+"""
+
+import sys
+import os
+import pytest
+
+# Add parent directory to path to import server module
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from server.dice_roller import DiceRoller, COUNT_SAMPLING_THRESHOLD, total_distribution
+
+
+class TestDiceRoller:
+    """Test suite for DiceRoller."""
+
+    def test_keep_highest_and_lowest(self):
+        """kK / khK keep the highest dice and klK the lowest."""
+        rolls, kept = DiceRoller("10d6k3").roll_dice()
+        assert kept == sorted(rolls, reverse=True)[:3]
+        rolls, kept = DiceRoller("10d6kh3").roll_dice()
+        assert kept == sorted(rolls, reverse=True)[:3]
+        rolls, kept = DiceRoller("10d6kl3").roll_dice()
+        assert sorted(kept) == sorted(rolls)[:3]
+
+    def test_invalid_notation(self):
+        """Unparseable notation and zero-sided dice are rejected."""
+        with pytest.raises(ValueError):
+            DiceRoller("d6").roll_dice()
+        with pytest.raises(ValueError):
+            DiceRoller("3d0").roll_dice()
+
+    def test_small_pools_roll_individual_dice(self):
+        """Pools at or under the threshold keep listing every die."""
+        roller = DiceRoller(f"{COUNT_SAMPLING_THRESHOLD}d6")
+        assert not roller.use_counts
+        assert "face×count" not in str(roller)
+
+    def test_large_pool_counts(self):
+        """Huge pools are sampled as face counts that add up to the pool."""
+        counts, kept_counts = DiceRoller("100000d6").roll_counts()
+        assert sum(counts.values()) == 100000
+        assert set(counts) <= set(range(1, 7))
+        assert list(counts) == sorted(counts, reverse=True)
+        assert kept_counts == counts
+
+    def test_large_pool_keep_highest_and_lowest(self):
+        """Keeping K dice takes them from the top or bottom faces."""
+        counts, kept_counts = DiceRoller("100000d6k10").roll_counts()
+        assert sum(kept_counts.values()) == 10
+        assert kept_counts == {6: 10}
+        counts, kept_counts = DiceRoller("100000d6kl10").roll_counts()
+        assert kept_counts == {1: 10}
+
+    def test_large_pool_output_shows_face_counts(self):
+        """Output for a huge pool lists face counts instead of every die."""
+        output = str(DiceRoller("1000000d20k5"))
+        assert output.startswith("ROLLS: 1000000 dice as face×count: 20×")
+        assert output.endswith("-> RETURNS: 100")
+
+    def test_large_pool_mean_is_plausible(self):
+        """The sampled total stays close to the expected value."""
+        result = DiceRoller("1000000d6").roll_multiple()[0]
+        assert abs(result["total"] / 1000000 - 3.5) < 0.01
+
+    def test_more_faces_than_dice_rolls_individually(self):
+        """Pools with more faces than dice stay on the per-die path."""
+        assert not DiceRoller("2000d10000").use_counts
+
+    def test_total_distribution_is_exact(self):
+        """The tabulated 4d6k3 distribution matches the known counts."""
+        totals, cum_weights = total_distribution(4, 6, 3, False)
+        assert totals == list(range(3, 19))
+        assert cum_weights[0] * 6 ** 4 == pytest.approx(1)
+        assert (1 - cum_weights[-2]) * 6 ** 4 == pytest.approx(21)
+        assert cum_weights[-1] == pytest.approx(1)
+
+    def test_total_distribution_skips_huge_pools(self):
+        """Notations too large to tabulate fall back to simulation."""
+        assert total_distribution(100000, 6, 10, False) is None
+        roller = DiceRoller("100000d6k10", 2, show_rolls=False)
+        assert all("counts" in result for result in roller.roll_multiple())
+
+    def test_totals_only_output(self):
+        """With show_rolls=False only sampled totals are reported."""
+        output = str(DiceRoller("4d6k3", 3, show_rolls=False))
+        lines = output.split("\n")
+        assert len(lines) == 3
+        for i, line in enumerate(lines, 1):
+            prefix, total = line.split(": RETURNS: ")
+            assert prefix == f"Roll {i}"
+            assert 3 <= int(total) <= 18
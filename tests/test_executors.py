@@ -0,0 +1,92 @@
+"""
+Pytest tests for the bounded per-upstream thread pools.
+"""
+
+import sys
+import os
+import time
+import asyncio
+import threading
+import pytest
+
+# Add parent directory to path to import server module
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from server.executors import BoundedExecutor, ExecutorRegistry, PoolFullError
+from server import main as server_main
+
+
+class TestBoundedExecutor:
+    """Test suite for BoundedExecutor."""
+
+    def test_queue_limit_rejects_excess_calls(self):
+        """Calls beyond workers + max_queue are rejected instead of queued."""
+        release = threading.Event()
+        pool = BoundedExecutor("test", max_workers=1, max_queue=1)
+        try:
+            first = pool.submit(release.wait)
+            time.sleep(0.05)
+            second = pool.submit(release.wait)
+
+            with pytest.raises(PoolFullError):
+                pool.submit(release.wait)
+
+            stats = pool.stats()
+            assert stats["queue_depth"] == 1, f"Expected one queued call, got {stats}"
+            assert stats["rejected"] == 1
+        finally:
+            release.set()
+            first.result(timeout=1)
+            second.result(timeout=1)
+            pool.shutdown()
+
+    def test_wait_time_is_recorded(self):
+        """Wait time covers the time spent queued behind a busy worker."""
+        pool = BoundedExecutor("test", max_workers=1, max_queue=4)
+        try:
+            futures = [pool.submit(time.sleep, 0.05) for _ in range(3)]
+            for future in futures:
+                future.result(timeout=1)
+
+            stats = pool.stats()
+            assert stats["completed"] == 3
+            assert stats["max_queue_depth"] >= 2
+            assert stats["wait_ms_max"] >= 50, f"Queued calls should wait, got {stats}"
+        finally:
+            pool.shutdown()
+
+
+class TestToolOffloading:
+    """Test that blocking tool bodies run off the event loop."""
+
+    @pytest.mark.asyncio
+    async def test_slow_upstream_does_not_block_other_tools(self, monkeypatch):
+        """A slow GitHub call does not delay a dice roll."""
+        class SlowGitHub:
+            def get_authentication_status(self):
+                time.sleep(0.5)
+                return "slow"
+
+        monkeypatch.setattr(server_main, "get_github_tool", SlowGitHub)
+
+        slow = asyncio.create_task(server_main.mcp.call_tool("github_auth_status", {}))
+        await asyncio.sleep(0.05)
+
+        started = time.perf_counter()
+        await server_main.mcp.call_tool("roll_dice", {"notation": "1d6"})
+        elapsed = time.perf_counter() - started
+
+        assert elapsed < 0.3, f"roll_dice waited {elapsed:.2f}s behind the GitHub call"
+        _, metadata = await slow
+        assert metadata["result"] == "slow"
+
+    def test_registry_uses_configured_sizes(self):
+        """Pools are created on demand with their configured sizes."""
+        registry = ExecutorRegistry(workers={"github": 8}, queues={"github": 2})
+        try:
+            assert registry.stats() == {}
+            pool = registry.get("github")
+            assert pool.max_workers == 8 and pool.max_queue == 2
+            assert registry.get("tavily").max_workers == registry.default_workers
+        finally:
+            registry.shutdown()
@@ -0,0 +1,182 @@
+"""
+Pytest tests for speculative GitHub prefetching (offline, with a fake session).
+"""
+
+import sys
+import os
+import json
+import threading
+import pytest
+
+# Add parent directory to path to import server module
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from server.github_prefetch import GitHubPrefetcher
+from server.github_tool import GitHubTool
+
+API = "https://api.github.com"
+
+
+class FakeResponse:
+    def __init__(self, status_code, data, remaining=5000):
+        self.status_code = status_code
+        self._data = data
+        self.headers = {"X-RateLimit-Remaining": str(remaining)}
+
+    @property
+    def text(self):
+        return json.dumps(self._data)
+
+    def json(self):
+        return self._data
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise RuntimeError(f"{self.status_code} error")
+
+
+class FakeSession:
+    """Serves a repository, its root listing and README, and runs response hooks like requests."""
+
+    def __init__(self, remaining=5000, gate=None):
+        self.hooks = {"response": []}
+        self.requests = []
+        self.remaining = remaining
+        self.gate = gate
+        self.lock = threading.Lock()
+
+    def get(self, url, params=None):
+        if self.gate:
+            self.gate.wait(5)
+        with self.lock:
+            self.requests.append((url, params))
+        if url.endswith("/contents/"):
+            response = FakeResponse(200, [{"name": "src", "type": "dir"}, {"name": "README.md", "type": "file"}],
+                                    self.remaining)
+        elif url.endswith("/README.md"):
+            response = FakeResponse(200, {"type": "file", "content": "", "size": 0}, self.remaining)
+        else:
+            name = url.split("/repos/")[1]
+            response = FakeResponse(200, {
+                "full_name": name, "default_branch": "trunk", "description": None, "language": None,
+                "stargazers_count": 1, "forks_count": 0, "watchers_count": 1, "size": 1, "private": False,
+                "created_at": "2024-01-01", "updated_at": "2024-01-01", "html_url": f"https://github.com/{name}",
+            }, self.remaining)
+        for hook in self.hooks["response"]:
+            hook(response)
+        return response
+
+
+def repos(*names):
+    return [{"full_name": name, "default_branch": "trunk"} for name in names]
+
+
+class TestGitHubPrefetcher:
+    """Test suite for GitHubPrefetcher."""
+
+    def test_warms_info_listing_and_readme(self):
+        """The top results' info, root listing and README are served from the cache."""
+        session = FakeSession()
+        prefetcher = GitHubPrefetcher(session, top_n=2)
+        prefetcher.prefetch(repos("a/one", "b/two", "c/three"))
+        prefetcher._executor.shutdown(wait=True)
+
+        assert len(session.requests) == 6, "Only the top 2 repositories are prefetched"
+        assert prefetcher.lookup(f"{API}/repos/a/one") is not None
+        assert prefetcher.lookup(f"{API}/repos/b/two/contents/", {"ref": "trunk"}) is not None
+        assert prefetcher.lookup(f"{API}/repos/a/one/contents/README.md", {"ref": "trunk"}) is not None
+        assert prefetcher.lookup(f"{API}/repos/c/three") is None
+        assert prefetcher.stats()["hits"] == 3
+
+    def test_each_lookup_gets_its_own_response(self):
+        """Callers never share a Response object, only the cached status and body."""
+        session = FakeSession()
+        prefetcher = GitHubPrefetcher(session, top_n=1)
+        prefetcher.prefetch(repos("a/one"), include_info=False)
+        prefetcher._executor.shutdown(wait=True)
+
+        url = f"{API}/repos/a/one/contents/"
+        first, second = prefetcher.lookup(url, {"ref": "trunk"}), prefetcher.lookup(url, {"ref": "trunk"})
+        assert first is not second
+        assert first.status_code == second.status_code == 200
+        assert first.json() == second.json() == [{"name": "src", "type": "dir"},
+                                                 {"name": "README.md", "type": "file"}]
+
+    def test_request_budget(self):
+        """No more than max_requests prefetch requests are sent per window."""
+        session = FakeSession()
+        prefetcher = GitHubPrefetcher(session, top_n=3, max_requests=4, workers=1)
+        prefetcher.prefetch(repos("a/one", "b/two", "c/three"))
+        prefetcher._executor.shutdown(wait=True)
+
+        assert len(session.requests) == 4
+        assert prefetcher.stats()["skipped_budget"] > 0
+
+    def test_low_quota_cancels_queued_prefetches(self):
+        """Once GitHub reports little quota left, queued work is cancelled."""
+        gate = threading.Event()
+        session = FakeSession(remaining=50, gate=gate)
+        prefetcher = GitHubPrefetcher(session, top_n=3, min_remaining=100, workers=1)
+        prefetcher.prefetch(repos("a/one", "b/two", "c/three"))
+        gate.set()
+        prefetcher._executor.shutdown(wait=True)
+
+        # The first request reports 50 left, so nothing else is sent
+        assert len(session.requests) == 1
+        assert prefetcher.stats()["cancelled"] == 2
+        prefetcher.prefetch(repos("d/four"))
+        assert prefetcher.stats()["pending"] == 0
+
+    def test_entries_expire(self):
+        """Prefetched responses are only served for ttl seconds."""
+        now = [0.0]
+        session = FakeSession()
+        prefetcher = GitHubPrefetcher(session, top_n=1, ttl=10, clock=lambda: now[0])
+        prefetcher.prefetch(repos("a/one"), include_info=False)
+        prefetcher._executor.shutdown(wait=True)
+
+        assert prefetcher.lookup(f"{API}/repos/a/one/contents/", {"ref": "trunk"}) is not None
+        now[0] = 11
+        assert prefetcher.lookup(f"{API}/repos/a/one/contents/", {"ref": "trunk"}) is None
+
+    def test_github_tool_follow_up_reads_hit_the_cache(self):
+        """After a repository lookup, its listing and README need no further requests."""
+        tool = GitHubTool()
+        tool.session = FakeSession()
+        prefetcher = tool.enable_prefetch(top_n=1)
+
+        assert "Repository Information: a/one" in tool.get_repository_info("a", "one")
+        prefetcher._executor.shutdown(wait=True)
+        sent = len(tool.session.requests)
+
+        assert "README.md" in tool.list_repository_files("a", "one", "", "trunk")
+        assert "File Content: a/one/README.md" in tool.get_file_content("a", "one", "README.md", "trunk")
+        assert len(tool.session.requests) == sent
+        assert prefetcher.stats()["hits"] == 2
+
+    def test_lookups_ignore_repository_case_and_default_to_the_default_branch(self):
+        """Names typed in another case, and the tools' "main" default, hit the default-branch entries."""
+        session = FakeSession()
+        prefetcher = GitHubPrefetcher(session, top_n=1)
+        prefetcher.prefetch(repos("Octo/Hello"), include_info=False)
+        prefetcher._executor.shutdown(wait=True)
+
+        assert prefetcher.lookup(f"{API}/repos/octo/HELLO/contents/", {"ref": "main"}) is not None
+        assert prefetcher.lookup(f"{API}/repos/octo/hello/contents/README.md", {"ref": "main"}) is not None
+        assert prefetcher.lookup(f"{API}/repos/octo/hello/contents/readme.md", {"ref": "main"}) is None, \
+            "File paths stay case sensitive"
+        assert prefetcher.lookup(f"{API}/repos/octo/hello/contents/", {"ref": "dev"}) is None
+
+    def test_github_tool_default_branch_reads_hit_the_cache(self):
+        """Follow-up reads without a branch, in any case, are served from the prefetch."""
+        tool = GitHubTool()
+        tool.session = FakeSession()
+        prefetcher = tool.enable_prefetch(top_n=1)
+
+        tool.get_repository_info("a", "one")
+        prefetcher._executor.shutdown(wait=True)
+        sent = len(tool.session.requests)
+
+        assert "README.md" in tool.list_repository_files("A", "One")
+        assert "File Content" in tool.get_file_content("a", "ONE", "README.md")
+        assert len(tool.session.requests) == sent
@@ -0,0 +1,149 @@
+"""
+Pytest tests for per-tool memory accounting and response-size guards.
+"""
+
+import sys
+import os
+import asyncio
+import base64
+import tracemalloc
+import pytest
+
+# Add parent directory to path to import server module
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from server.memory_guard import MemoryGuard, check_memory, reserve_response
+from server.metrics import MetricsRegistry
+from server.dice_roller import DiceRoller
+from server.github_tool import GitHubTool
+
+
+class FakeResponse:
+    def __init__(self, data):
+        self._data = data
+
+    def json(self):
+        return self._data
+
+    def raise_for_status(self):
+        pass
+
+
+class FakeSession:
+    """Returns one file whose reported size is far bigger than its content."""
+
+    def __init__(self, size):
+        self.size = size
+        self.requests = 0
+
+    def get(self, url, params=None):
+        self.requests += 1
+        content = base64.b64encode(b"print('hi')").decode()
+        return FakeResponse({"type": "file", "content": content, "size": self.size})
+
+
+@pytest.fixture
+def traced():
+    """Stop tracemalloc again if a test started it."""
+    was_tracing = tracemalloc.is_tracing()
+    yield
+    if not was_tracing:
+        tracemalloc.stop()
+
+
+class TestMemoryGuard:
+    """Test suite for MemoryGuard."""
+
+    def test_oversized_response_is_replaced(self):
+        """Results over the limit become an error; smaller ones pass through."""
+        guard = MemoryGuard(max_response_bytes=100)
+        echo = guard.guarded(lambda text: text, "echo")
+
+        assert echo("small") == "small"
+        assert echo("x" * 101).startswith("❌ Response too large")
+        # Multi-byte characters are measured in UTF-8 bytes
+        assert echo("é" * 60).startswith("❌ Response too large")
+        assert guard.stats() == {"echo": {"response": 2}}
+
+    def test_per_tool_limits(self):
+        """A tool's own limit overrides the default, and 0 means no limit."""
+        guard = MemoryGuard(max_response_bytes=10, response_limits={"big": 0, "tiny": 2})
+        assert guard.guarded(lambda: "x" * 1000, "big")() == "x" * 1000
+        assert guard.guarded(lambda: "xyz", "tiny")().startswith("❌")
+        assert guard.guarded(lambda: "x" * 11, "other")().startswith("❌")
+
+    def test_huge_roll_is_refused_before_rolling(self):
+        """roll_dice checks its estimated output size before rolling anything."""
+        guard = MemoryGuard(max_response_bytes=10_000)
+        roll = guard.guarded(lambda notation, rolls: str(DiceRoller(notation, rolls)), "roll_dice")
+
+        assert "RETURNS" in roll("3d6", 2)
+        result = roll("20d6", 100)
+        assert result.startswith("❌ Response too large") and "20d6" in result
+        # Totals alone are small, so the same roll is fine without the individual dice
+        totals = guard.guarded(lambda: str(DiceRoller("20d6", 100, show_rolls=False)), "roll_dice")
+        assert totals().count("RETURNS") == 100
+
+    def test_large_github_file_is_not_downloaded_into_memory(self):
+        """A file bigger than the limit is refused from its reported size, before decoding."""
+        tool = GitHubTool()
+        tool.session = FakeSession(size=50_000_000)
+        guard = MemoryGuard(response_limits={"github_get_file_content": 1_000_000})
+        get_file = guard.guarded(tool.get_file_content, "github_get_file_content")
+
+        result = get_file("a", "b", "big.bin")
+        assert result.startswith("❌ Response too large") and "'big.bin'" in result
+        assert tool.session.requests == 1
+
+    def test_checkpoints_are_no_ops_outside_tool_calls(self):
+        """Backends can be used directly without any limits."""
+        reserve_response(10**12)
+        check_memory()
+        assert str(DiceRoller("2000d6", 3)).count("RETURNS") == 3
+
+    def test_accounting_reports_peak_and_retained(self, traced):
+        """Peak and retained bytes are recorded and rendered as histograms."""
+        registry = MetricsRegistry()
+        guard = MemoryGuard(accounting=True, observe=registry.observe_memory)
+        guard.start()
+        kept = []
+
+        def allocate():
+            scratch = bytearray(4 * 1024 * 1024)
+            kept.append(bytearray(1024 * 1024))
+            del scratch
+            return "ok"
+
+        assert guard.guarded(allocate, "allocate")() == "ok"
+        stats = registry.tools["allocate"]
+        assert stats.peak_memory.sum >= 5 * 1024 * 1024
+        assert 1024 * 1024 <= stats.retained_memory.sum < 4 * 1024 * 1024
+        assert 'mcp_tool_peak_memory_bytes_count{tool="allocate"} 1' in registry.render_prometheus()
+
+    def test_memory_limit_stops_a_runaway_call(self, traced):
+        """A call that keeps allocating fails at its next checkpoint once over the limit."""
+        guard = MemoryGuard(max_call_memory=2 * 1024 * 1024)
+        guard.start()
+        chunks = []
+
+        def runaway():
+            for _ in range(100):
+                check_memory()
+                chunks.append(bytearray(256 * 1024))
+            return "finished"
+
+        result = guard.guarded(runaway, "runaway")()
+        assert result.startswith("❌ Out of memory budget")
+        assert len(chunks) < 20
+        assert guard.stats() == {"runaway": {"memory": 1}}
+
+    def test_async_tools_are_guarded(self):
+        """Coroutine tools get the same limits."""
+        guard = MemoryGuard(max_response_bytes=10)
+
+        async def search():
+            reserve_response(500, "search context")
+            return "never"
+
+        result = asyncio.run(guard.guarded(search, "web_search_many")())
+        assert result.startswith("❌ Response too large: search context")
@@ -0,0 +1,115 @@
+"""
+Pytest tests for per-tool and upstream metrics.
+"""
+
+import sys
+import os
+import pytest
+
+# Add parent directory to path to import server module
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from server.metrics import Histogram, MetricsRegistry
+from server import main as server_main
+
+
+class TestMetricsRegistry:
+    """Test suite for MetricsRegistry."""
+
+    def test_histogram_quantiles(self):
+        """Quantiles are estimated from bucket counts."""
+        histogram = Histogram((0.1, 0.2, 0.5, 1.0))
+        for value in (0.05, 0.15, 0.15, 0.15, 0.9):
+            histogram.observe(value)
+
+        assert histogram.count == 5
+        assert 0.1 <= histogram.quantile(0.5) <= 0.2
+        assert 0.5 <= histogram.quantile(0.95) <= 1.0
+
+    def test_instrumented_counts_calls_errors_and_bytes(self):
+        """Exceptions and ❌ messages both count as errors."""
+        registry = MetricsRegistry()
+
+        @registry.instrumented
+        def flaky(fail: str = "") -> str:
+            if fail == "raise":
+                raise RuntimeError("boom")
+            return "❌ upstream error" if fail else "ok"
+
+        flaky()
+        flaky("message")
+        with pytest.raises(RuntimeError):
+            flaky("raise")
+
+        stats = registry.tools["flaky"]
+        assert stats.calls == 3
+        assert stats.errors == 2
+        assert stats.response_bytes.sum == len("ok") + len("❌ upstream error".encode("utf-8"))
+
+    def test_session_failures_are_recorded(self):
+        """Connection errors and timeouts count as upstream errors, not just 5xx responses."""
+        import requests
+        from requests.adapters import BaseAdapter
+
+        class Unreachable(BaseAdapter):
+            def send(self, request, **kwargs):
+                raise requests.ConnectTimeout("timed out", request=request)
+
+            def close(self):
+                pass
+
+        registry = MetricsRegistry()
+        session = requests.Session()
+        session.mount("https://", Unreachable())
+        registry.instrument_session(session)
+
+        with pytest.raises(requests.ConnectTimeout):
+            session.get("https://api.github.com/rate_limit")
+        stats = registry.upstreams["api.github.com"]
+        assert (stats.calls, stats.errors) == (1, 1)
+
+    def test_prometheus_rendering(self):
+        """Rendered metrics follow the Prometheus text format."""
+        registry = MetricsRegistry()
+        registry.observe_tool("roll_dice", 0.002, False, 40)
+        registry.observe_upstream("api.github.com", 0.3)
+        registry.add_gauges(lambda: [("mcp_pool_queue_depth", "Queue depth", {"pool": "github"}, 3)])
+
+        text = registry.render_prometheus()
+        assert 'mcp_tool_calls_total{tool="roll_dice"} 1' in text
+        assert 'mcp_tool_latency_seconds_bucket{tool="roll_dice",le="+Inf"} 1' in text
+        assert 'mcp_upstream_requests_total{host="api.github.com"} 1' in text
+        assert "# TYPE mcp_pool_queue_depth gauge" in text
+        assert 'mcp_pool_queue_depth{pool="github"} 3' in text
+
+
+class TestServerMetricsTool:
+    """Test that tools are instrumented and metrics are exposed."""
+
+    @pytest.mark.asyncio
+    async def test_server_metrics_reports_tool_calls(self, monkeypatch, tmp_path):
+        """server_metrics reports calls made to other tools."""
+        monkeypatch.setattr(server_main, "search_cache",
+                            server_main.SearchCache(str(tmp_path / "cache.sqlite3")))
+        await server_main.mcp.call_tool("roll_dice", {"notation": "2d6"})
+
+        _, metadata = await server_main.mcp.call_tool("server_metrics", {})
+        assert "roll_dice" in metadata["result"]
+        assert "Thread Pools" in metadata["result"]
+
+        _, metadata = await server_main.mcp.call_tool("server_metrics", {"output_format": "prometheus"})
+        assert 'mcp_tool_calls_total{tool="roll_dice"}' in metadata["result"]
+
+    def test_metrics_endpoint(self, monkeypatch, tmp_path):
+        """The HTTP app exposes Prometheus metrics at /metrics."""
+        from starlette.applications import Starlette
+        from starlette.testclient import TestClient
+
+        monkeypatch.setattr(server_main, "search_cache",
+                            server_main.SearchCache(str(tmp_path / "cache.sqlite3")))
+        # Only the custom routes, so the shared MCP session manager is left untouched
+        app = Starlette(routes=server_main.mcp._custom_starlette_routes)
+        response = TestClient(app).get("/metrics")
+
+        assert response.status_code == 200
+        assert "# TYPE mcp_tool_calls_total counter" in response.text
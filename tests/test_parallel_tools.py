@@ -0,0 +1,104 @@
+"""
+Pytest tests for parallel tool execution in the StateGraph agent.
+"""
+
+import sys
+import os
+import time
+import asyncio
+import threading
+import pytest
+
+# Add parent directory to path to import client module
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from langchain_core.messages import AIMessage, HumanMessage, ToolMessage
+from langchain_core.runnables import RunnableLambda
+from langchain_core.tools import StructuredTool
+
+from client.langgraph_agent import MCPLangGraphAgent
+
+
+def async_tool(latency: float, active: list, peak: list) -> StructuredTool:
+    """An async tool that sleeps and records how many calls run at the same time."""
+    async def fetch(path: str) -> str:
+        active.append(path)
+        peak.append(len(active))
+        await asyncio.sleep(latency)
+        active.remove(path)
+        return f"content of {path}"
+
+    return StructuredTool.from_function(coroutine=fetch, name="fetch", description="Fetch a file")
+
+
+def sync_tool(latency: float, active: list, peak: list) -> StructuredTool:
+    """The same tool as a blocking function, run on ToolNode's thread pool."""
+    lock = threading.Lock()
+
+    def fetch(path: str) -> str:
+        with lock:
+            active.append(path)
+            peak.append(len(active))
+        time.sleep(latency)
+        with lock:
+            active.remove(path)
+        return f"content of {path}"
+
+    return StructuredTool.from_function(func=fetch, name="fetch", description="Fetch a file")
+
+
+def agent_with(tool: StructuredTool, paths, concurrency: int) -> MCPLangGraphAgent:
+    """The agent's real StateGraph with a model that asks for every path in its first turn."""
+    def respond(messages) -> AIMessage:
+        if isinstance(messages[-1], HumanMessage):
+            return AIMessage(content="", tool_calls=[
+                {"name": "fetch", "id": f"call_{i}", "args": {"path": path}} for i, path in enumerate(paths)
+            ])
+        return AIMessage(content="Done")
+
+    agent = MCPLangGraphAgent(openai_api_key="sk-test")
+    agent.tools = [tool]
+    agent.llm_with_tools = RunnableLambda(respond)
+    agent.tool_concurrency = concurrency
+    agent._create_state_graph()
+    return agent
+
+
+class TestParallelToolCalls:
+    """Test suite for the agent's tool node."""
+
+    @pytest.mark.asyncio
+    async def test_calls_run_concurrently_in_call_order(self):
+        """A turn takes about as long as its slowest call and keeps call order."""
+        active, peak = [], []
+        paths = ["a.py", "b.py", "c.py"]
+        agent = agent_with(async_tool(0.1, active, peak), paths, concurrency=4)
+
+        started = time.perf_counter()
+        result = await agent.state_graph.ainvoke({"messages": [HumanMessage("Read the files")]})
+        elapsed = time.perf_counter() - started
+
+        messages = [m for m in result["messages"] if isinstance(m, ToolMessage)]
+        assert [m.tool_call_id for m in messages] == ["call_0", "call_1", "call_2"]
+        assert [m.content for m in messages] == [f"content of {p}" for p in paths]
+        assert elapsed < 0.25, f"Three 100 ms calls should overlap, took {elapsed:.2f}s"
+
+    def test_max_concurrency_caps_sync_tools(self):
+        """The graph's max_concurrency config caps how many blocking calls run at once."""
+        active, peak = [], []
+        agent = agent_with(sync_tool(0.05, active, peak), [f"file_{i}.py" for i in range(6)], concurrency=2)
+
+        agent.state_graph.invoke({"messages": [HumanMessage("Read the files")]})
+
+        assert max(peak) == 2, f"Expected at most 2 concurrent calls, saw {max(peak)}"
+
+    @pytest.mark.asyncio
+    async def test_tool_concurrency_caps_async_tools(self):
+        """ToolNode gathers every async call, so the agent's own cap is what bounds them."""
+        active, peak = [], []
+        agent = agent_with(async_tool(0.05, active, peak), [f"file_{i}.py" for i in range(6)], concurrency=2)
+
+        result = await agent.state_graph.ainvoke({"messages": [HumanMessage("Read the files")]})
+
+        assert len([m for m in result["messages"] if isinstance(m, ToolMessage)]) == 6
+        assert max(peak) == 2, f"Expected at most 2 concurrent calls, saw {max(peak)}"
@@ -0,0 +1,177 @@
+"""
+Pytest tests for the on-demand tool profiler.
+"""
+
+import sys
+import os
+import time
+import asyncio
+import pstats
+import threading
+import pytest
+
+# Add parent directory to path to import server module
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from server.profiling import ToolProfiler
+
+
+def busy(seconds=0.05):
+    """Burn CPU for a while so the sampler sees the frame."""
+    end = time.perf_counter() + seconds
+    total = 0
+    while time.perf_counter() < end:
+        total += 1
+    return total
+
+
+class TestToolProfiler:
+    """Test suite for ToolProfiler."""
+
+    def test_disarmed_calls_pass_through(self, tmp_path):
+        """Without a running profile, calls are unchanged and nothing is written."""
+        profiler = ToolProfiler(str(tmp_path))
+        search = profiler.profiled(lambda query: f"results for {query}", "web_search")
+
+        assert search("python") == "results for python"
+        assert profiler.stats()["profiled_calls"] == 0
+        assert not os.listdir(tmp_path)
+
+    def test_sampling_writes_collapsed_stacks(self, tmp_path):
+        """Sampling stops after N calls and writes flamegraph-ready stacks."""
+        profiler = ToolProfiler(str(tmp_path), interval=0.001)
+        search = profiler.profiled(busy, "web_search")
+        profiler.start("web_search", calls=2)
+
+        search()
+        search()
+
+        assert not profiler.active, "The profile stops by itself after N calls"
+        assert "2 call(s) profiled" in profiler.last_report
+        [name] = os.listdir(tmp_path)
+        assert name.startswith("web_search-") and name.endswith(".collapsed")
+        with open(tmp_path / name, encoding="utf-8") as f:
+            lines = f.read().splitlines()
+        assert any("test_profiling.py:busy" in line for line in lines)
+        assert all(line.rsplit(" ", 1)[1].isdigit() for line in lines)
+
+    def test_deterministic_writes_pstats(self, tmp_path):
+        """Deterministic mode writes cProfile stats and lists the slowest functions."""
+        profiler = ToolProfiler(str(tmp_path))
+        dice = profiler.profiled(busy, "roll_dice")
+        profiler.start("roll_dice", calls=1, mode="deterministic")
+
+        dice(0.01)
+
+        [name] = os.listdir(tmp_path)
+        assert name.endswith(".pstats")
+        assert "busy" in profiler.last_report
+
+    def test_deterministic_calls_hold_other_tools_back(self, tmp_path):
+        """cProfile sees every thread, so other tool calls wait until the profiled call is done."""
+        profiler = ToolProfiler(str(tmp_path))
+        started, order = threading.Event(), []
+
+        def roll():
+            started.set()
+            busy(0.05)
+            order.append("roll_dice")
+
+        def other_tool():
+            order.append("web_search")
+            return sum(range(100_000))
+
+        dice = profiler.profiled(roll, "roll_dice")
+        search = profiler.profiled(other_tool, "web_search")
+        profiler.start("roll_dice", calls=1, mode="deterministic")
+        worker = threading.Thread(target=dice)
+        worker.start()
+        started.wait(5)
+        search()
+        worker.join()
+
+        assert order == ["roll_dice", "web_search"]
+        [name] = os.listdir(tmp_path)
+        functions = {func for _, _, func in pstats.Stats(str(tmp_path / name)).stats}
+        assert "roll" in functions and "other_tool" not in functions
+
+    def test_deterministic_falls_back_to_sampling_when_busy(self, tmp_path):
+        """A call that starts while other tool calls are running is sampled instead."""
+        profiler = ToolProfiler(str(tmp_path), interval=0.001)
+        release = threading.Event()
+        dice = profiler.profiled(busy, "roll_dice")
+        search = profiler.profiled(lambda: release.wait(5), "web_search")
+        profiler.start("roll_dice", calls=1, mode="deterministic")
+        worker = threading.Thread(target=search)
+        worker.start()
+        while profiler._inflight == 0:
+            time.sleep(0.001)
+
+        dice()
+        release.set()
+        worker.join()
+
+        [name] = os.listdir(tmp_path)
+        assert name.endswith(".collapsed")
+
+    def test_unpooled_tools_never_wait_for_deterministic_calls(self, tmp_path):
+        """Tools on the event loop thread run unprofiled instead of stalling behind cProfile."""
+        profiler = ToolProfiler(str(tmp_path))
+        started, release, order = threading.Event(), threading.Event(), []
+
+        def roll():
+            started.set()
+            release.wait(5)
+            order.append("roll_dice")
+
+        dice = profiler.profiled(roll, "roll_dice")
+        metrics = profiler.profiled(lambda: order.append("server_metrics"), "server_metrics", pooled=False)
+        profiler.start("roll_dice", calls=1, mode="deterministic")
+        worker = threading.Thread(target=dice)
+        worker.start()
+        started.wait(5)
+        metrics()
+        release.set()
+        worker.join()
+
+        assert order == ["server_metrics", "roll_dice"]
+
+    def test_only_the_named_tool_is_profiled(self, tmp_path):
+        """Calls of other tools neither get profiled nor count towards N."""
+        profiler = ToolProfiler(str(tmp_path), interval=0.001)
+        search = profiler.profiled(busy, "web_search")
+        dice = profiler.profiled(busy, "roll_dice")
+        profiler.start("web_search", calls=1)
+
+        dice(0.01)
+        assert profiler.active and profiler.stats()["remaining"] == 1
+        search()
+        assert not profiler.active
+
+    def test_async_tools_are_sampled(self, tmp_path):
+        """Coroutine tools are profiled by sampling the event loop thread."""
+        profiler = ToolProfiler(str(tmp_path), interval=0.001)
+
+        async def fetch():
+            return busy()
+
+        fetch = profiler.profiled(fetch, "fetch_continuation")
+        profiler.start(calls=1, mode="deterministic")
+        asyncio.run(fetch())
+
+        assert not profiler.active
+        [name] = os.listdir(tmp_path)
+        assert name.startswith("all-") and name.endswith(".collapsed")
+        assert "other coroutines" in profiler.last_report, "The report flags event loop samples"
+
+    def test_start_validates_and_stop_reports(self, tmp_path):
+        """Bad arguments are rejected, and stopping early writes what was collected."""
+        profiler = ToolProfiler(str(tmp_path))
+        assert profiler.start(mode="tracing").startswith("❌")
+        assert profiler.start(calls=0).startswith("❌")
+
+        profiler.start("web_search", calls=5)
+        assert profiler.start("roll_dice").startswith("❌ Already profiling")
+        assert "5 to go" in profiler.status()
+        assert profiler.stop().startswith("❌ Nothing was recorded")
+        assert profiler.status().startswith("Profiler off")
@@ -0,0 +1,185 @@
+"""
+Pytest tests for recording and replaying upstream traffic.
+"""
+
+import sys
+import os
+import gzip
+import time
+import asyncio
+import pytest
+import requests
+from requests.adapters import BaseAdapter
+
+# Add parent directory to path to import server module
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from server.replay import CassetteMiss, HttpCassette
+
+
+class FakeTransport(BaseAdapter):
+    """Answers every request with a small JSON body echoing the path, like a live upstream."""
+
+    def __init__(self, latency=0.0):
+        super().__init__()
+        self.latency = latency
+        self.sent = []
+
+    def send(self, request, **kwargs):
+        self.sent.append(request)
+        time.sleep(self.latency)
+        response = requests.Response()
+        response.status_code = 200
+        response.reason = "OK"
+        response.headers["Content-Type"] = "application/json"
+        response.headers["X-RateLimit-Remaining"] = "4999"
+        response.headers["Set-Cookie"] = "session=abc"
+        response._content = b'{"path": "%s"}' % request.path_url.encode()
+        response.url = request.url
+        response.request = request
+        return response
+
+    def close(self):
+        pass
+
+
+class FakeTavily:
+    def __init__(self, latency=0.0):
+        self.latency = latency
+        self.calls = 0
+
+    def get_search_context(self, query, **kwargs):
+        self.calls += 1
+        time.sleep(self.latency)
+        if query == "fail":
+            raise ValueError("quota exceeded")
+        return f"context for {query}"
+
+
+def session_for(cassette, transport=None):
+    session = requests.Session()
+    cassette.install(session, transport)
+    return session
+
+
+class TestHttpCassette:
+    """Test suite for HttpCassette."""
+
+    def test_http_round_trip(self, tmp_path):
+        """Recorded responses are replayed offline with their status, body and kept headers."""
+        path = str(tmp_path / "github.json")
+        recorder = HttpCassette(path, mode="record")
+        live = session_for(recorder, FakeTransport())
+        recorded = live.get("https://api.github.com/repos/a/b", params={"ref": "main", "per_page": 5})
+        recorder.save()
+
+        replayed = session_for(HttpCassette(path)).get(
+            "https://api.github.com/repos/a/b", params={"per_page": 5, "ref": "main"})
+        assert replayed.status_code == 200
+        assert replayed.json() == recorded.json()
+        assert replayed.headers["X-RateLimit-Remaining"] == "4999"
+        assert "Set-Cookie" not in replayed.headers
+
+    def test_secrets_are_redacted(self, tmp_path):
+        """Credentials in headers, query strings and JSON bodies never reach the cassette."""
+        path = str(tmp_path / "secrets.json")
+        recorder = HttpCassette(path, mode="record")
+        live = session_for(recorder, FakeTransport())
+        live.get("https://api.unsplash.com/search/photos", params={"query": "cats", "client_id": "unsplash-secret"},
+                 headers={"Authorization": "Client-ID unsplash-secret"})
+        live.post("https://api.tavily.com/search", json={"api_key": "tvly-secret", "query": "mcp"})
+        recorder.save()
+
+        with open(path, encoding="utf-8") as f:
+            text = f.read()
+        assert "secret" not in text
+        assert "REDACTED" in text
+
+        # The same requests with other credentials still match
+        replay = session_for(HttpCassette(path))
+        assert replay.post("https://api.tavily.com/search", json={"api_key": "other", "query": "mcp"}).ok
+        assert replay.get("https://api.unsplash.com/search/photos",
+                          params={"query": "cats", "client_id": "other"}).ok
+
+    def test_miss_raises_connection_error(self, tmp_path):
+        """Unrecorded requests fail like an unreachable upstream, so fallbacks run."""
+        path = str(tmp_path / "empty.json")
+        recorder = HttpCassette(path, mode="record")
+        session_for(recorder, FakeTransport()).get("https://api.quotable.io/random")
+        recorder.save()
+
+        cassette = HttpCassette(path)
+        with pytest.raises(requests.ConnectionError):
+            session_for(cassette).get("https://api.quotable.io/quotes")
+        assert cassette.stats()["misses"] == 1
+
+    def test_replay_timing_is_scaled(self, tmp_path):
+        """Replays wait for the recorded latency times the timing factor."""
+        path = str(tmp_path / "slow.json.gz")
+        recorder = HttpCassette(path, mode="record")
+        session_for(recorder, FakeTransport(latency=0.2)).get("https://api.github.com/rate_limit")
+        recorder.save()
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            assert '"version":1' in f.read()
+
+        started = time.perf_counter()
+        response = session_for(HttpCassette(path, timing=0.5)).get("https://api.github.com/rate_limit")
+        elapsed = time.perf_counter() - started
+        assert 0.08 < elapsed < 0.18
+        assert 0.08 < response.elapsed.total_seconds() < 0.12
+
+        started = time.perf_counter()
+        session_for(HttpCassette(path, timing=0)).get("https://api.github.com/rate_limit")
+        assert time.perf_counter() - started < 0.05
+
+    def test_client_calls_round_trip(self, tmp_path):
+        """SDK calls (Tavily) are replayed without the live client, errors included."""
+        path = str(tmp_path / "tavily.json")
+        recorder = HttpCassette(path, mode="record")
+        tavily = recorder.client("api.tavily.com", FakeTavily())
+        assert tavily.get_search_context(query="mcp") == "context for mcp"
+        with pytest.raises(ValueError):
+            tavily.get_search_context(query="fail")
+        recorder.save()
+
+        replay = HttpCassette(path, timing=0).client("api.tavily.com")
+        assert replay.get_search_context(query="mcp") == "context for mcp"
+        with pytest.raises(RuntimeError, match="quota exceeded"):
+            replay.get_search_context(query="fail")
+        with pytest.raises(CassetteMiss):
+            replay.get_search_context(query="other")
+
+    def test_async_client_calls(self, tmp_path):
+        """Async clients are recorded and replayed as coroutines."""
+        path = str(tmp_path / "async.json")
+
+        class AsyncTavily:
+            async def get_search_context(self, query, **kwargs):
+                await asyncio.sleep(0)
+                return f"async context for {query}"
+
+        recorder = HttpCassette(path, mode="record")
+        live = recorder.client("api.tavily.com", AsyncTavily(), asynchronous=True)
+        assert asyncio.run(live.get_search_context(query="mcp")) == "async context for mcp"
+        recorder.save()
+
+        replay = HttpCassette(path, timing=0).client("api.tavily.com", asynchronous=True)
+        assert asyncio.run(replay.get_search_context(query="mcp")) == "async context for mcp"
+
+    def test_repeated_requests_replay_in_order(self, tmp_path):
+        """The same request replays its recordings in order, then keeps the last one."""
+        path = str(tmp_path / "repeat.json")
+        recorder = HttpCassette(path, mode="record")
+        counter = iter(range(10))
+
+        class Counting:
+            def get_search_context(self, query):
+                return f"{query} #{next(counter)}"
+
+        live = recorder.client("api.tavily.com", Counting())
+        live.get_search_context("news")
+        live.get_search_context("news")
+        recorder.save()
+
+        replay = HttpCassette(path, timing=0).client("api.tavily.com")
+        assert [replay.get_search_context("news") for _ in range(3)] == ["news #0", "news #1", "news #1"]
@@ -0,0 +1,178 @@
+"""
+Pytest tests for circuit breakers and hedged requests.
+"""
+
+import sys
+import os
+import asyncio
+import time
+import threading
+import pytest
+
+# Add parent directory to path to import server module
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from server.resilience import CircuitBreaker, CircuitBreakerRegistry, CircuitOpenError, Hedger
+from server.social_content_creator import SocialContentCreator
+
+
+class TestCircuitBreaker:
+    """Test suite for CircuitBreaker state changes."""
+
+    def test_opens_after_consecutive_failures(self):
+        """The circuit opens after failure_threshold failures in a row."""
+        breaker = CircuitBreaker("api.quotable.io", failure_threshold=3, reset_timeout=60)
+        for _ in range(2):
+            assert breaker.allow()
+            breaker.record_failure()
+        breaker.record_success(0.1)
+        for _ in range(3):
+            breaker.record_failure()
+
+        assert breaker.state == "open"
+        assert not breaker.allow(), "Calls should be skipped while the circuit is open"
+        assert breaker.stats()["rejected"] == 1
+
+    def test_slow_calls_count_as_failures(self):
+        """Calls slower than slow_call_seconds trip the circuit."""
+        breaker = CircuitBreaker("api.unsplash.com", failure_threshold=2, slow_call_seconds=1.0)
+        breaker.record_success(2.5)
+        breaker.record_success(1.0)
+
+        assert breaker.state == "open"
+
+    def test_half_open_allows_one_trial(self):
+        """After the cool-down a single trial call decides whether to close again."""
+        breaker = CircuitBreaker("api.github.com", failure_threshold=1, reset_timeout=0.05)
+        breaker.record_failure()
+        time.sleep(0.06)
+
+        assert breaker.state == "half_open"
+        assert breaker.allow(), "The first call after the cool-down is a trial"
+        assert not breaker.allow(), "Only one trial call may be in flight"
+        breaker.record_failure()
+        assert breaker.state == "open", "A failed trial reopens the circuit"
+
+        time.sleep(0.06)
+        assert breaker.allow()
+        breaker.record_success(0.01)
+        assert breaker.state == "closed"
+
+
+class TestCircuitBreakerRegistry:
+    """Test suite for breakers applied to upstream calls."""
+
+    def test_call_fails_fast_when_open(self):
+        """An open circuit skips the upstream function entirely."""
+        registry = CircuitBreakerRegistry(failure_threshold=2, reset_timeout=60)
+        calls = []
+
+        def failing_search():
+            calls.append(1)
+            raise ConnectionError("tavily down")
+
+        for _ in range(2):
+            with pytest.raises(ConnectionError):
+                registry.call("api.tavily.com", failing_search)
+        with pytest.raises(CircuitOpenError):
+            registry.call("api.tavily.com", failing_search)
+
+        assert len(calls) == 2
+        assert registry.stats()["api.tavily.com"]["state"] == "open"
+
+    def test_cancelled_async_call_is_not_a_failure(self):
+        """A caller that goes away neither counts against the upstream nor blocks the next trial."""
+        registry = CircuitBreakerRegistry(failure_threshold=1, reset_timeout=0.01)
+        registry.get("api.tavily.com").record_failure()
+        time.sleep(0.02)
+
+        async def slow_search():
+            await asyncio.sleep(10)
+
+        async def cancel_trial():
+            task = asyncio.ensure_future(registry.call_async("api.tavily.com", slow_search))
+            await asyncio.sleep(0.01)
+            task.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await task
+
+        asyncio.run(cancel_trial())
+        breaker = registry.get("api.tavily.com")
+        assert breaker.stats()["consecutive_failures"] == 1
+        assert breaker.allow(), "The cancelled trial must not hold the half-open slot"
+
+    def test_open_circuit_serves_social_fallback_immediately(self, monkeypatch):
+        """SocialContentCreator falls back without touching the network while Quotable is open."""
+        creator = SocialContentCreator()
+        registry = CircuitBreakerRegistry(failure_threshold=1, reset_timeout=60)
+        registry.protect_session(creator.session)
+        registry.get("api.quotable.io").record_failure()
+
+        started = time.perf_counter()
+        quote = creator.get_random_quote()
+
+        assert time.perf_counter() - started < 0.1
+        assert quote["content"] and quote["author"], "The built-in fallback quote should be returned"
+
+
+class TestHedger:
+    """Test suite for hedged requests."""
+
+    def test_no_hedge_until_latency_is_known(self):
+        """Calls run once until enough latencies have been observed."""
+        hedger = Hedger(min_samples=5)
+        assert hedger.call("api.github.com", lambda: "ok") == "ok"
+        assert hedger.delay("api.github.com") is None
+        assert hedger.hedged == 0
+
+    def test_slow_first_attempt_is_hedged(self):
+        """A second attempt is sent after the p95 delay and the faster one wins."""
+        hedger = Hedger(min_samples=5, min_delay=0.01)
+        for _ in range(10):
+            hedger.observe("api.github.com", 0.02)
+
+        attempts = []
+        lock = threading.Lock()
+
+        def fetch():
+            with lock:
+                attempts.append(1)
+                attempt = len(attempts)
+            time.sleep(1.0 if attempt == 1 else 0.01)
+            return f"attempt {attempt}"
+
+        started = time.perf_counter()
+        result = hedger.call("api.github.com", fetch)
+        elapsed = time.perf_counter() - started
+        hedger.shutdown()
+
+        assert result == "attempt 2"
+        assert elapsed < 0.5, f"Hedged call should not wait for the slow attempt, took {elapsed:.2f}s"
+        assert hedger.hedged == 1 and hedger.hedge_wins == 1
+
+    def test_losing_attempt_is_discarded(self):
+        """The slower attempt's result is handed to discard once it finishes."""
+        hedger = Hedger(min_samples=5, min_delay=0.01)
+        for _ in range(10):
+            hedger.observe("api.github.com", 0.02)
+
+        attempts, discarded = [], threading.Event()
+        lock = threading.Lock()
+
+        def fetch():
+            with lock:
+                attempts.append(1)
+                attempt = len(attempts)
+            time.sleep(0.2 if attempt == 1 else 0.01)
+            return f"attempt {attempt}"
+
+        losers = []
+
+        def discard(result):
+            losers.append(result)
+            discarded.set()
+
+        assert hedger.call("api.github.com", fetch, discard=discard) == "attempt 2"
+        assert discarded.wait(1)
+        hedger.shutdown()
+        assert losers == ["attempt 1"]
@@ -0,0 +1,154 @@
+"""
+Pytest tests for token-budgeted response shaping.
+
+These tests run offline: when the tiktoken encoding cannot be downloaded the
+shaper falls back to its character estimate, which these tests also cover.
+"""
+
+import sys
+import os
+import json
+import pytest
+
+# Add parent directory to path to import server module
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from server.response_shaping import ResponseShaper, SqliteContinuationStore
+from server.config import parse_int_mapping
+from server.tokens import count_tokens
+from server import main as server_main
+
+
+class TestResponseShaper:
+    """Test suite for ResponseShaper."""
+
+    def test_short_text_is_unchanged(self):
+        """Text within budget is returned as-is."""
+        shaper = ResponseShaper()
+        assert shaper.shape("hello world", 100) == "hello world"
+
+    def test_head_strategy_pages_through_continuations(self):
+        """Trimmed text can be read back in full through continuation handles."""
+        shaper = ResponseShaper(default_budget=50)
+        text = " ".join(f"word{i}" for i in range(500))
+
+        pieces = []
+        page = shaper.shape(text, 50, "head")
+        while 'fetch_continuation(handle="' in page:
+            body, _, footer = page.partition("\n\n[... truncated")
+            pieces.append(body)
+            handle = footer.split('handle="')[1].split('"')[0]
+            page = shaper.continue_response(handle)
+        pieces.append(page)
+
+        assert len(pieces) > 1, "Expected the text to be split into several pages"
+        assert "".join(pieces) == text
+        assert all(count_tokens(piece) <= 50 for piece in pieces)
+
+    def test_head_tail_keeps_both_ends(self):
+        """head_tail keeps the start and end of a file and elides the middle."""
+        shaper = ResponseShaper()
+        text = "FIRST LINE\n" + "middle line\n" * 2000 + "LAST LINE"
+        shaped = shaper.shape(text, 300, "head_tail")
+
+        assert shaped.startswith("FIRST LINE")
+        assert shaped.endswith("LAST LINE")
+        assert "tokens omitted" in shaped
+
+    def test_top_k_keeps_valid_json(self):
+        """top_k keeps leading results and records the rest under a handle."""
+        shaper = ResponseShaper()
+        results = [{"url": f"https://example.com/{i}", "content": "x " * 100} for i in range(20)]
+        page = shaper.shape(json.dumps(results), 400, "top_k")
+        assert count_tokens(page) <= 400
+        shaped = json.loads(page)
+
+        marker = shaped[-1]
+        assert "continuation" in marker, "Expected a continuation marker as the last item"
+        assert len(shaped) - 1 + marker["remaining_results"] == 20
+
+        rest = json.loads(shaper.continue_response(marker["continuation"], 100000))
+        assert rest == results[len(shaped) - 1:]
+
+    def test_top_k_page_counts_separators_and_marker(self):
+        """Separators and the continuation marker count towards the budget too."""
+        shaper = ResponseShaper()
+        results = [{"title": f"Result {i}", "url": f"https://example.com/{i}", "score": 0.5} for i in range(20)]
+        page = shaper.shape(json.dumps(results), 200, "top_k")
+
+        assert count_tokens(page) <= 200
+        assert "continuation" in json.loads(page)[-1]
+
+    def test_sqlite_store_is_shared_between_instances(self, tmp_path):
+        """A handle created through one store can be fetched through another (another worker)."""
+        path = str(tmp_path / "continuations.sqlite3")
+        writer = ResponseShaper(store=SqliteContinuationStore(path))
+        reader = ResponseShaper(store=SqliteContinuationStore(path))
+
+        page = writer.shape("word " * 400, 20, "head")
+        handle = page.split('handle="')[1].split('"')[0]
+
+        assert reader.continue_response(handle, 100000).endswith("word ")
+        assert "not found" in writer.continue_response(handle), "Handles are single use"
+
+    def test_unknown_handle(self):
+        """Expired or unknown handles produce an error message."""
+        assert "not found" in ResponseShaper().continue_response("missing")
+
+    def test_parse_budget_overrides(self):
+        """Budget overrides are parsed from the environment format."""
+        assert parse_int_mapping("web_search=500, roll_dice=100,bad") == {"web_search": 500, "roll_dice": 100}
+
+
+class TestShapedTools:
+    """Test that shaping is applied to registered MCP tools."""
+
+    @pytest.mark.asyncio
+    async def test_tools_accept_max_tokens(self):
+        """Every shaped tool exposes an optional max_tokens argument."""
+        tools = {tool.name: tool for tool in await server_main.mcp.list_tools()}
+        for name in ("roll_dice", "web_search", "github_get_file_content", "create_social_post"):
+            properties = tools[name].inputSchema["properties"]
+            assert "max_tokens" in properties, f"{name} does not accept max_tokens"
+
+    @pytest.mark.asyncio
+    async def test_per_call_budget(self):
+        """A per-call max_tokens trims the tool output."""
+        _, metadata = await server_main.mcp.call_tool("roll_dice", {
+            "notation": "20d6",
+            "num_rolls": 50,
+            "max_tokens": 40,
+        })
+        assert "fetch_continuation" in metadata["result"]
+
+        handle = metadata["result"].split('handle="')[1].split('"')[0]
+        _, metadata = await server_main.mcp.call_tool("fetch_continuation", {"handle": handle})
+        assert "Roll" in metadata["result"]
+
+    @pytest.mark.asyncio
+    async def test_top_k_pages_stay_valid_json(self):
+        """Paging a top_k result through fetch_continuation yields whole JSON pages to the end."""
+        results = [{"url": f"https://example.com/{i}", "content": "word " * 60} for i in range(6)]
+        page = server_main.response_shaper.shape(json.dumps(results), 60, "top_k")
+
+        fetched = []
+        while True:
+            items = json.loads(page)
+            if "continuation" not in items[-1]:
+                fetched += items
+                break
+            fetched += items[:-1]
+            _, metadata = await server_main.mcp.call_tool("fetch_continuation", {
+                "handle": items[-1]["continuation"],
+                "max_tokens": 60,
+            })
+            page = metadata["result"]
+        assert fetched == results
+
+    @pytest.mark.asyncio
+    async def test_prometheus_metrics_are_not_shaped(self, monkeypatch):
+        """The exposition text is returned whole, without a continuation footer."""
+        monkeypatch.setattr(server_main.response_shaper, "default_budget", 5)
+        _, metadata = await server_main.mcp.call_tool("server_metrics", {"output_format": "prometheus"})
+        assert "truncated" not in metadata["result"]
+        assert metadata["result"].startswith("# HELP") and metadata["result"].endswith("\n")
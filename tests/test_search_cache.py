@@ -0,0 +1,101 @@
+"""
+Pytest tests for the persistent web search cache.
+
+These tests use a temporary SQLite file and never call the Tavily API.
+"""
+
+import sys
+import os
+import time
+
+# Add parent directory to path to import server module
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from server.search_cache import SearchCache, normalize_query
+
+
+class TestSearchCache:
+    """Test suite for SearchCache."""
+
+    def test_normalize_query_ignores_case_and_stopwords(self):
+        """Equivalent phrasings share one cache key."""
+        assert normalize_query("Latest AI news?") == normalize_query("the latest ai ai news")
+        assert normalize_query("python") != normalize_query("rust")
+
+    def test_word_order_is_kept(self, tmp_path):
+        """Reordered words are a different search, exactly and as a near-duplicate."""
+        assert normalize_query("flights from london to paris") != normalize_query("flights from paris to london")
+
+        cache = SearchCache(str(tmp_path / "cache.sqlite3"), similarity_threshold=0.5)
+        cache.put("flights from london to paris", "london to paris")
+        assert cache.get("flights from paris to london") is None
+        assert cache.get("cheap flights from london to paris") == "london to paris"
+
+    def test_put_then_get(self, tmp_path):
+        """A stored context is returned and counted as a hit."""
+        cache = SearchCache(str(tmp_path / "cache.sqlite3"))
+        assert cache.get("python news") is None
+
+        cache.put("python news", '[{"url": "https://a", "content": "x"}]')
+        assert cache.get("Python News") == '[{"url": "https://a", "content": "x"}]'
+
+        stats = cache.stats()
+        assert stats["hits"] == 1, f"Expected 1 hit, got {stats}"
+        assert stats["misses"] == 1, f"Expected 1 miss, got {stats}"
+        assert stats["entries"] == 1
+
+    def test_near_duplicate_query_hits(self, tmp_path):
+        """A query with nearly the same words reuses the cached context."""
+        cache = SearchCache(str(tmp_path / "cache.sqlite3"), similarity_threshold=0.75)
+        cache.put("latest python web framework benchmarks", "context")
+
+        assert cache.get("latest python web framework benchmark results") is None
+        assert cache.get("latest python web framework benchmarks 2024") == "context"
+        assert cache.stats()["near_hits"] == 1
+
+    def test_near_duplicate_scan_is_bounded(self, tmp_path):
+        """Only the most recently used entries are considered for a near-duplicate hit."""
+        cache = SearchCache(str(tmp_path / "cache.sqlite3"), similarity_threshold=0.75, near_match_window=2)
+        cache.put("latest python web framework benchmarks", "context")
+        cache.put("rust", "1")
+        cache.put("go", "2")
+
+        assert cache.get("latest python web framework benchmarks 2024") is None
+        cache.get("latest python web framework benchmarks")
+        assert cache.get("latest python web framework benchmarks 2024") == "context"
+
+    def test_expired_entries_are_misses(self, tmp_path):
+        """Entries older than the TTL are not served."""
+        cache = SearchCache(str(tmp_path / "cache.sqlite3"), ttl_seconds=1)
+        cache.put("python", "context")
+        time.sleep(1.1)
+        assert cache.get("python") is None
+
+    def test_lru_eviction_by_entry_count(self, tmp_path):
+        """The least recently used entry is evicted when the cache is full."""
+        cache = SearchCache(str(tmp_path / "cache.sqlite3"), max_entries=2)
+        cache.put("first", "1")
+        cache.put("second", "2")
+        cache.get("first")
+        cache.put("third", "3")
+
+        assert cache.get("second") is None, "Least recently used entry should be evicted"
+        assert cache.get("first") == "1"
+        assert cache.get("third") == "3"
+        assert cache.stats()["evictions"] == 1
+
+    def test_eviction_by_size(self, tmp_path):
+        """Total stored bytes stay within max_bytes."""
+        cache = SearchCache(str(tmp_path / "cache.sqlite3"), max_bytes=10)
+        cache.put("first", "x" * 6)
+        cache.put("second", "y" * 6)
+
+        assert cache.stats()["bytes"] <= 10
+        assert cache.get("second") == "y" * 6
+
+    def test_disabled_cache(self, tmp_path):
+        """A TTL of zero disables caching entirely."""
+        cache = SearchCache(str(tmp_path / "cache.sqlite3"), ttl_seconds=0)
+        cache.put("python", "context")
+        assert cache.get("python") is None
+        assert not (tmp_path / "cache.sqlite3").exists()
@@ -9,6 +9,8 @@ This tests the MCP server by importing it directly and verifying:
 
 import sys
 import os
+import json
+import asyncio
 import pytest
 
 # Add parent directory to path to import server module
@@ -25,6 +27,53 @@ class TestMCPServer:
         assert hasattr(server_main, 'mcp'), "MCP server instance not found"
         assert server_main.mcp is not None, "MCP server instance is None"
     
+    def test_server_advertises_tool_schema_version(self):
+        """The initialize instructions carry a hash of the registered tool schemas."""
+        options = server_main.mcp._mcp_server.create_initialization_options()
+        assert options.instructions == server_main.TOOL_SCHEMA_LINE + server_main.tool_schema_version()
+        assert server_main.tool_schema_version().startswith("tools-")
+
+    def test_import_starts_no_threads(self):
+        """Importing the server module (tests, benchmarks, --help) leaves background work to startup()."""
+        import subprocess
+
+        code = "import threading, server.main; print(len(threading.enumerate()))"
+        root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        output = subprocess.run([sys.executable, "-c", code], cwd=root, capture_output=True, text=True, check=True)
+        assert output.stdout.strip().splitlines()[-1] == "1"
+
+    def test_backends_load_lazily(self):
+        """Test that importing the server does not import tool backends."""
+        from benchmarks.startup import run_once
+
+        run = run_once()
+        assert run["loaded_lazy_modules"] == [], f"Loaded at import: {run['loaded_lazy_modules']}"
+
+    def test_concurrent_first_calls_build_one_backend(self):
+        """Test that backend getters called from several threads at once build a single backend."""
+        import threading
+        import time
+        from concurrent.futures import ThreadPoolExecutor
+
+        built = []
+        barrier = threading.Barrier(8)
+
+        @server_main.backend
+        def get_backend():
+            time.sleep(0.05)
+            built.append(object())
+            return built[-1]
+
+        def first_call():
+            barrier.wait()
+            return get_backend()
+
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            backends = list(pool.map(lambda _: first_call(), range(8)))
+        assert len(built) == 1, f"Built {len(built)} backends"
+        assert all(b is built[0] for b in backends)
+        assert get_backend.cache_info().currsize == 1
+
     @pytest.mark.asyncio
     async def test_tools_are_registered(self):
         """Test that all expected tools are properly registered."""
@@ -33,15 +82,20 @@ class TestMCPServer:
         
         expected_tools = [
             "web_search", 
+            "web_search_many",
             "roll_dice", 
             "create_social_post", 
             "get_slide_image", 
             "create_quote_card",
             "github_search_repositories",
             "github_get_repository_info", 
+            "github_get_repositories_info",
             "github_get_file_content",
             "github_list_files",
-            "github_auth_status"
+            "github_auth_status",
+            "fetch_continuation",
+            "server_metrics",
+            "server_profile"
         ]
         
         for tool in expected_tools:
@@ -100,6 +154,86 @@ class TestMCPServer:
         _, metadata = result
         assert 'result' in metadata, "No 'result' key in metadata for multiple rolls"
     
+    @pytest.mark.asyncio
+    async def test_web_search_many_merges_and_deduplicates(self, monkeypatch, tmp_path):
+        """Test that web_search_many fans out concurrently and merges results by URL."""
+        in_flight, peak = 0, 0
+
+        class FakeAsyncTavily:
+            async def get_search_context(self, query):
+                nonlocal in_flight, peak
+                in_flight += 1
+                peak = max(peak, in_flight)
+                await asyncio.sleep(0.01)
+                in_flight -= 1
+                return json.dumps([
+                    {"url": "https://shared.example.com/", "content": "shared"},
+                    {"url": f"https://{query.replace(' ', '-')}.example.com", "content": query},
+                ])
+
+        monkeypatch.setattr(server_main, "get_async_tavily_client", FakeAsyncTavily)
+        monkeypatch.setattr(server_main, "web_search_concurrency", 2)
+        monkeypatch.setattr(server_main, "search_cache",
+                            server_main.SearchCache(str(tmp_path / "cache.sqlite3")))
+
+        queries = ["python news", "rust news", "go news", "Python news?"]
+        _, metadata = await server_main.mcp.call_tool("web_search_many", {"queries": queries})
+        results = json.loads(metadata["result"])
+        urls = [item["url"] for item in results]
+
+        assert len(urls) == len(set(urls)), f"Duplicate URLs in merged results: {urls}"
+        assert "https://shared.example.com/" in urls
+        assert len(results) == 4, f"Expected shared result plus one per unique query, got {urls}"
+        assert peak <= 2, f"Concurrency cap exceeded: {peak} searches in flight"
+
+    @pytest.mark.asyncio
+    async def test_web_search_many_reports_failed_queries(self, monkeypatch, tmp_path):
+        """Test that queries which failed are listed alongside the results of the others."""
+        class FlakyAsyncTavily:
+            async def get_search_context(self, query):
+                if query == "rust news":
+                    raise ValueError("quota exceeded")
+                return json.dumps([{"url": "https://python.example.com", "content": query}])
+
+        monkeypatch.setattr(server_main, "get_async_tavily_client", FlakyAsyncTavily)
+        monkeypatch.setattr(server_main, "search_cache",
+                            server_main.SearchCache(str(tmp_path / "cache.sqlite3")))
+
+        _, metadata = await server_main.mcp.call_tool("web_search_many", {"queries": ["python news", "rust news"]})
+        results = json.loads(metadata["result"])
+
+        assert results[0]["note"].startswith("No results for 1 of 2 queries: 'rust news' (quota exceeded)")
+        assert [item["url"] for item in results[1:]] == ["https://python.example.com"]
+
+    def test_http_app_serves_health_and_tools(self, monkeypatch, tmp_path):
+        """Test that the streamable HTTP app answers health checks and tool listings."""
+        from starlette.testclient import TestClient
+
+        monkeypatch.setattr(server_main, "cache_dir", str(tmp_path))
+        monkeypatch.setattr(server_main.mcp.settings, "stateless_http", False)
+        monkeypatch.setattr(server_main.response_shaper, "store", server_main.response_shaper.store)
+        # The lifespan's startup and shutdown would snapshot into .cache/ and close
+        # the tracer, breakers, caches and snapshotter the rest of the session still uses
+        lifecycle = []
+        monkeypatch.setattr(server_main, "startup", lambda: lifecycle.append("startup"))
+        monkeypatch.setattr(server_main, "shutdown", lambda: lifecycle.append("shutdown"))
+
+        with TestClient(server_main.create_http_app(), base_url="http://localhost:8000") as http:
+            assert http.get("/healthz").json()["status"] == "ok"
+
+            response = http.post(
+                "/mcp/",
+                json={"jsonrpc": "2.0", "id": 1, "method": "tools/list", "params": {}},
+                headers={"Accept": "application/json, text/event-stream"},
+            )
+            assert response.status_code == 200, response.text
+            assert "roll_dice" in response.text
+
+        assert lifecycle == ["startup", "shutdown"]
+        assert server_main.mcp.settings.stateless_http, "HTTP workers must run stateless"
+        assert isinstance(server_main.response_shaper.store, server_main.SqliteContinuationStore), \
+            "HTTP workers must share continuations through SQLite"
+
     @pytest.mark.asyncio
     async def test_github_repository_search(self):
         """Test GitHub repository search functionality."""
@@ -134,6 +268,22 @@ class TestMCPServer:
         assert "Repository Information" in repo_info, "Missing repo info header"
         assert "octocat/Hello-World" in repo_info, "Missing repository name"
 
+    @pytest.mark.asyncio
+    async def test_github_repositories_info(self):
+        """Test batched GitHub repository info functionality."""
+        result = await server_main.mcp.call_tool("github_get_repositories_info", {
+            "repositories": ["octocat/Hello-World", "octocat/Spoon-Knife"]
+        })
+
+        assert result is not None, "GitHub repos info returned None"
+        _, metadata = result
+        assert 'result' in metadata, "No 'result' key in metadata for GitHub repos info"
+
+        repos_info = metadata['result']
+        assert "| Repository |" in repos_info, "Missing table header"
+        assert "octocat/Hello-World" in repos_info, "Missing first repository"
+        assert "octocat/Spoon-Knife" in repos_info, "Missing second repository"
+
 
 # Backwards compatibility: keep the main function for direct execution
 async def main():
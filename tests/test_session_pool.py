@@ -0,0 +1,84 @@
+"""
+Pytest tests for the shared MCP session pool.
+
+These tests spawn the real server over STDIO and only call local tools.
+"""
+
+import sys
+import os
+import asyncio
+import pytest
+
+# Add parent directory to path to import client module
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+from langchain_mcp_adapters.tools import load_mcp_tools
+from client.session_pool import MCPSessionPool, close_shared_pools, get_shared_pool
+
+STDIO_CONNECTION = {
+    "command": sys.executable,
+    "args": [os.path.join(project_root, "run_server.py")],
+    "cwd": project_root,
+    "transport": "stdio",
+}
+
+
+class TestMCPSessionPool:
+    """Test suite for MCPSessionPool."""
+
+    @pytest.mark.asyncio
+    async def test_tool_calls_reuse_warm_sessions(self):
+        """Many tool calls are served by the pool's sessions without reconnecting."""
+        pool = MCPSessionPool(STDIO_CONNECTION, size=2)
+        try:
+            tools = {tool.name: tool for tool in await load_mcp_tools(pool)}
+            for _ in range(5):
+                result = await tools["roll_dice"].ainvoke({"notation": "2d6"})
+                assert "RETURNS" in str(result)
+
+            stats = pool.stats()
+            assert stats["connects"] == 2, f"Expected 2 sessions to be opened once, got {stats}"
+            assert stats["calls"] == 5
+            assert stats["reconnects"] == 0
+        finally:
+            await pool.close()
+
+    @pytest.mark.asyncio
+    async def test_dead_session_is_reconnected(self):
+        """A session whose server went away is replaced on the next call."""
+        pool = MCPSessionPool(STDIO_CONNECTION, size=1, health_check_interval=0)
+        try:
+            await pool.start()
+            await pool._slots[0].close()   # server process exits
+
+            result = await pool.call_tool("roll_dice", {"notation": "1d20"})
+
+            assert not result.isError
+            assert pool.stats()["reconnects"] == 1
+        finally:
+            await pool.close()
+
+    @pytest.mark.asyncio
+    async def test_shared_pool_is_reused(self):
+        """Agents on the same loop with the same config share one pool."""
+        try:
+            first = await get_shared_pool(STDIO_CONNECTION, size=1)
+            second = await get_shared_pool(dict(STDIO_CONNECTION), size=1)
+            assert first is second
+        finally:
+            await close_shared_pools()
+        assert first.closed
+
+    def test_pools_of_closed_loops_are_dropped(self):
+        """A pool never outlives its event loop, and a new loop never gets a dead pool."""
+        from client import session_pool
+
+        loop = asyncio.new_event_loop()
+        stale = MCPSessionPool(STDIO_CONNECTION, size=1)
+        session_pool._shared_pools[loop] = {"config": stale}
+        loop.close()
+
+        session_pool._drop_closed_loops()
+        assert loop not in session_pool._shared_pools
+        assert stale.closed
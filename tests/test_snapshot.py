@@ -0,0 +1,114 @@
+"""
+Pytest tests for cache snapshots and warm start.
+"""
+
+import sys
+import os
+import time
+import pytest
+
+# Add parent directory to path to import server module
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from server.snapshot import CacheSnapshotter
+from server.response_shaping import ContinuationStore
+from server.github_tool import GitHubTool
+
+
+class TestCacheSnapshotter:
+    """Test suite for CacheSnapshotter."""
+
+    def test_round_trip(self, tmp_path):
+        """A cache saved on shutdown is restored when registered in a new process."""
+        state = {"a": 1}
+        snapshots = CacheSnapshotter(str(tmp_path), interval=0)
+        assert not snapshots.register("demo", lambda: state, state.update)
+        snapshots.shutdown()
+
+        restored = {}
+        fresh = CacheSnapshotter(str(tmp_path), interval=0)
+        assert fresh.register("demo", lambda: restored, restored.update)
+        assert restored == {"a": 1}
+
+    def test_unchanged_snapshots_are_not_rewritten(self, tmp_path):
+        """Saving the same state twice writes the file once."""
+        snapshots = CacheSnapshotter(str(tmp_path), interval=0)
+        snapshots.register("demo", lambda: {"a": 1}, lambda data: None)
+        snapshots.save()
+        snapshots.save()
+        assert snapshots.stats()["saved"] == 1
+        assert snapshots.stats()["unchanged"] == 1
+
+    def test_corrupt_snapshot_is_ignored(self, tmp_path):
+        """A torn or foreign file just means a cold start."""
+        (tmp_path / "demo.json").write_text("{not json")
+        snapshots = CacheSnapshotter(str(tmp_path), interval=0)
+        assert not snapshots.register("demo", lambda: {}, lambda data: pytest.fail("restored garbage"))
+        assert snapshots.stats()["errors"] == 1
+
+    def test_disabled(self, tmp_path):
+        """With snapshots disabled nothing is read or written."""
+        snapshots = CacheSnapshotter(str(tmp_path), enabled=False)
+        assert not snapshots.register("demo", lambda: {"a": 1}, lambda data: None)
+        snapshots.shutdown()
+        assert not list(tmp_path.iterdir())
+
+    def test_periodic_snapshots(self, tmp_path):
+        """Snapshots are also written in the background every interval."""
+        snapshots = CacheSnapshotter(str(tmp_path), interval=0.05)
+        snapshots.register("demo", lambda: {"a": 1}, lambda data: None)
+        assert snapshots._thread is None, "Registering a cache starts no thread"
+        snapshots.start()
+        deadline = time.time() + 5
+        while not (tmp_path / "demo.json").exists() and time.time() < deadline:
+            time.sleep(0.01)
+        snapshots.shutdown()
+        assert (tmp_path / "demo.json").exists()
+
+
+class TestCacheExports:
+    """Test suite for the snapshot state of individual caches."""
+
+    def test_continuations_keep_their_expiry(self):
+        """Continuations survive a restart and expired ones are dropped."""
+        store = ContinuationStore(ttl_seconds=60)
+        handle = store.put("rest of the file", "head")
+        data = store.export_entries()
+        data["entries"].append(["stale", time.time() - 1, "old", "head"])
+
+        restored = ContinuationStore()
+        restored.import_entries(data)
+        assert restored.pop(handle) == ("rest of the file", "head")
+        assert restored.pop("stale") is None
+
+    def test_github_repository_summaries(self):
+        """Repository summaries are restored with their remaining TTL."""
+        tool = GitHubTool(repo_cache_ttl=60)
+        tool._cache_repository("octocat/Hello-World", {"full_name": "octocat/Hello-World"})
+        data = tool.export_cache()
+        data["repositories"].append(["octocat/stale", time.time() - 1, {"full_name": "octocat/stale"}])
+
+        restored = GitHubTool()
+        restored.import_cache(data)
+        assert restored._cached_repository("octocat/Hello-World") == {"full_name": "octocat/Hello-World"}
+        assert restored._cached_repository("octocat/stale") is None
+
+    def test_github_prefetched_responses(self):
+        """Prefetched responses come back as real responses that behave like the originals."""
+        tool = GitHubTool()
+        prefetcher = tool.enable_prefetch()
+        url = f"{tool.base_url}/repos/octocat/Hello-World/contents/"
+        prefetcher.import_entries([
+            [url, {"ref": "master"}, time.time() + 60, 200, '[{"name": "README", "type": "file"}]'],
+            [url + "missing", {"ref": "master"}, time.time() + 60, 404, "{}"],
+        ])
+        exported = tool.export_cache()["prefetched"]
+
+        restored = GitHubTool()
+        restored.enable_prefetch()
+        restored.import_cache({"prefetched": exported})
+        assert "📄 README" in restored.list_repository_files("octocat", "Hello-World", "", "master")
+        missing = restored.prefetcher.lookup(url + "missing", {"ref": "master"})
+        assert missing.status_code == 404
+        with pytest.raises(Exception, match="404"):
+            missing.raise_for_status()
@@ -0,0 +1,104 @@
+"""
+Pytest tests for streaming agent responses.
+
+The agent's StateGraph is driven by a scripted chat model that streams its
+output in chunks, with a stub tool standing in for the MCP server, so no
+OpenAI key or server process is needed.
+"""
+
+import os
+import sys
+from typing import Any, Iterator, List, Optional
+
+import pytest
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk, BaseMessage, HumanMessage
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+from langchain_core.tools import StructuredTool
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from client.langgraph_agent import MCPLangGraphAgent
+
+
+class ScriptedChatModel(BaseChatModel):
+    """Asks for one dice roll, then streams its answer word by word."""
+
+    answer: str = "You rolled a four"
+
+    @property
+    def _llm_type(self) -> str:
+        return "scripted"
+
+    def _chunks(self, messages: List[BaseMessage]) -> List[AIMessageChunk]:
+        if isinstance(messages[-1], HumanMessage):
+            return [AIMessageChunk(content="", tool_call_chunks=[
+                {"name": "roll_dice", "args": '{"notation": "1d6"}', "id": "call_0", "index": 0}
+            ])]
+        words = self.answer.split(" ")
+        return [AIMessageChunk(content=word if i == 0 else f" {word}") for i, word in enumerate(words)]
+
+    def _stream(self, messages: List[BaseMessage], stop: Optional[List[str]] = None,
+                run_manager=None, **kwargs: Any) -> Iterator[ChatGenerationChunk]:
+        for chunk in self._chunks(messages):
+            if run_manager and chunk.content:
+                run_manager.on_llm_new_token(chunk.content, chunk=ChatGenerationChunk(message=chunk))
+            yield ChatGenerationChunk(message=chunk)
+
+    def _generate(self, messages: List[BaseMessage], stop: Optional[List[str]] = None,
+                  run_manager=None, **kwargs: Any) -> ChatResult:
+        message = sum(self._chunks(messages)[1:], self._chunks(messages)[0])
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(
+            content=message.content, tool_calls=message.tool_calls))])
+
+
+def roll_dice(notation: str) -> str:
+    """Roll dice using standard notation."""
+    return f"🎲 {notation}: ROLLS: 4"
+
+
+@pytest.fixture
+def agent() -> MCPLangGraphAgent:
+    agent = MCPLangGraphAgent(openai_api_key="sk-test")
+    agent.tools = [StructuredTool.from_function(roll_dice)]
+    agent.llm_with_tools = ScriptedChatModel()
+    agent.agent = object()  # Skip initialize(); only the state graph is streamed
+    agent._create_state_graph()
+    return agent
+
+
+class TestStreamingAgent:
+    """Test suite for astream_chat / chat_streaming."""
+
+    @pytest.mark.asyncio
+    async def test_streams_tokens_tool_events_and_timings(self, agent):
+        """Tokens, tool starts/ends and step timings arrive as events, ending with a summary."""
+        events = [event async for event in agent.astream_chat("Roll a d6", use_state_graph=True)]
+        kinds = [event["type"] for event in events]
+
+        tokens = [event["content"] for event in events if event["type"] == "token"]
+        assert "".join(tokens) == "You rolled a four", f"Unexpected tokens: {tokens}"
+        assert len(tokens) > 1, "The answer should arrive in several chunks"
+
+        assert kinds.index("tool_start") < kinds.index("tool_end") < kinds.index("token"), \
+            f"Tool events should precede the final answer: {kinds}"
+        tool_end = next(event for event in events if event["type"] == "tool_end")
+        assert tool_end["name"] == "roll_dice"
+        assert "ROLLS: 4" in tool_end["output"]
+        assert tool_end["duration_ms"] >= 0
+
+        done = events[-1]
+        assert done["type"] == "done", f"The stream must end with a summary, got {kinds}"
+        assert done["content"] == "You rolled a four"
+        assert [step["node"] for step in done["steps"]] == ["call_model", "tools", "call_model"], done["steps"]
+        assert 0 <= done["ttft_ms"] <= done["total_ms"]
+
+    @pytest.mark.asyncio
+    async def test_chat_streaming_prints_and_returns_answer(self, agent, capsys):
+        """chat_streaming prints tokens as they arrive and returns the full answer."""
+        answer = await agent.chat_streaming("Roll a d6", use_state_graph=True)
+
+        output = capsys.readouterr().out
+        assert answer == "You rolled a four"
+        assert "roll_dice" in output, "Tool calls should be shown while streaming"
+        assert "First token after" in output
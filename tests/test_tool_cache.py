@@ -0,0 +1,101 @@
+"""
+Pytest tests for the client-side tool result cache.
+
+Tools are converted from MCP tool definitions exactly as the agent loads
+them, but bound to a fake session that counts round trips.
+"""
+
+import os
+import sys
+
+import pytest
+from langchain_mcp_adapters.tools import convert_mcp_tool_to_langchain_tool
+from mcp.types import CallToolResult, TextContent, Tool
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from client.tool_cache import ToolResultCache, canonical_arguments, parse_ttls, result_text
+
+
+class CountingSession:
+    """Stands in for the session pool; answers every call like the server does and counts it."""
+
+    def __init__(self):
+        self.calls = []
+
+    async def call_tool(self, name, arguments, **kwargs):
+        self.calls.append((name, arguments))
+        if arguments.get("repo") == "missing":
+            # The server reports failures as text, without setting isError
+            return CallToolResult(content=[TextContent(type="text", text="❌ Error getting repository info: 404")])
+        if arguments.get("repo") == "huge":
+            return CallToolResult(content=[TextContent(type="text", text=(
+                'README...\n\n[... truncated, 900 more tokens - call fetch_continuation(handle="abc123") to continue]'
+            ))])
+        return CallToolResult(content=[TextContent(type="text", text=f"{name} #{len(self.calls)}")])
+
+
+def mcp_tool(name: str) -> Tool:
+    return Tool(name=name, description=name, inputSchema={
+        "type": "object",
+        "properties": {"owner": {"type": "string"}, "repo": {"type": "string"}, "notation": {"type": "string"}},
+    })
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestToolResultCache:
+    """Test suite for ToolResultCache."""
+
+    @pytest.mark.asyncio
+    async def test_repeated_calls_skip_the_round_trip(self):
+        """Equivalent calls are answered from the cache until their TTL runs out."""
+        session, clock = CountingSession(), FakeClock()
+        cache = ToolResultCache(ttls={"github_get_repository_info": 60}, clock=clock)
+        tool = cache.wrap_tool(convert_mcp_tool_to_langchain_tool(session, mcp_tool("github_get_repository_info")))
+
+        first = result_text(await tool.ainvoke({"owner": "octocat", "repo": "Hello-World"}))
+        again = result_text(await tool.ainvoke({"repo": "hello-world ", "owner": "OctoCat"}))
+        assert first == again == "github_get_repository_info #1"
+        assert len(session.calls) == 1, f"Cached call reached the server: {session.calls}"
+
+        clock.now += 61
+        assert result_text(await tool.ainvoke({"owner": "octocat", "repo": "Hello-World"})) == \
+            "github_get_repository_info #2"
+        assert cache.stats() == {"entries": 1, "hits": 1, "misses": 2}
+
+    @pytest.mark.asyncio
+    async def test_nondeterministic_tools_and_errors_are_not_cached(self):
+        """roll_dice always reaches the server, and failed or trimmed calls are retried."""
+        session = CountingSession()
+        cache = ToolResultCache()
+        dice = cache.wrap_tools([convert_mcp_tool_to_langchain_tool(session, mcp_tool("roll_dice"))])[0]
+        info = cache.wrap_tool(convert_mcp_tool_to_langchain_tool(session, mcp_tool("github_get_repository_info")))
+
+        await dice.ainvoke({"notation": "1d6"})
+        await dice.ainvoke({"notation": "1d6"})
+        for _ in range(2):
+            assert result_text(await info.ainvoke({"owner": "octocat", "repo": "missing"})).startswith("❌")
+        for _ in range(2):
+            assert "fetch_continuation" in result_text(await info.ainvoke({"owner": "octocat", "repo": "huge"}))
+
+        assert len(session.calls) == 6, f"Expected every call to reach the server: {session.calls}"
+        assert cache.stats()["entries"] == 0
+
+    def test_canonical_arguments_and_ttl_parsing(self, monkeypatch):
+        """Argument order, whitespace, None values and name case do not split entries."""
+        assert canonical_arguments({"repo": "Hello-World", "owner": " octocat", "limit": None}) == \
+            {"owner": "octocat", "repo": "hello-world"}
+        assert canonical_arguments({"file_path": "README.md"}) == {"file_path": "README.md"}, \
+            "File paths are case sensitive"
+        monkeypatch.setenv("MCP_TOOL_CACHE_TTLS", "web_search=30, github_list_files=0,bogus,x=y")
+        cache = ToolResultCache.from_env()
+        assert (cache.ttl("web_search"), cache.ttl("github_list_files"), cache.ttl("x")) == (30, 0, 0)
+        assert parse_ttls("web_search=30, github_list_files=0,bogus,x=y,search=1.5") == \
+            {"web_search": 30.0, "github_list_files": 0.0, "search": 1.5}
@@ -0,0 +1,87 @@
+"""
+Pytest tests for cached tool schemas.
+
+These tests spawn the real server over STDIO and never call the LLM.
+"""
+
+import sys
+import os
+import pytest
+
+# Add parent directory to path to import client module
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+from client.session_pool import MCPSessionPool
+from client.tool_schema_cache import ToolSchemaCache, load_tools, schema_version
+
+STDIO_CONNECTION = {
+    "command": sys.executable,
+    "args": [os.path.join(project_root, "run_server.py")],
+    "cwd": project_root,
+    "transport": "stdio",
+}
+
+
+class TestToolSchemaCache:
+    """Test suite for ToolSchemaCache and load_tools."""
+
+    @pytest.mark.asyncio
+    async def test_second_startup_skips_list_tools(self, tmp_path):
+        """Tools are listed once, then built from the cache while the schema hash matches."""
+        cache = ToolSchemaCache(str(tmp_path / "tool_schemas.json"))
+
+        first = await MCPSessionPool(STDIO_CONNECTION, size=1).start()
+        try:
+            assert schema_version(first.server_instructions).startswith("tools-"), \
+                "Server should advertise its schema hash"
+            assert not first.server_version.startswith("tools-"), "serverInfo.version stays the real version"
+            listed = await load_tools(first, cache)
+            assert first.stats()["tool_listings"] == 1
+        finally:
+            await first.close()
+
+        second = await MCPSessionPool(STDIO_CONNECTION, size=1).start()
+        try:
+            cached = await load_tools(second, cache)
+            assert second.stats()["tool_listings"] == 0, "list_tools should be skipped on a cache hit"
+            assert [tool.name for tool in cached] == [tool.name for tool in listed]
+            assert cached[0].args_schema == listed[0].args_schema
+
+            tools = {tool.name: tool for tool in cached}
+            result = await tools["roll_dice"].ainvoke({"notation": "1d6"})
+            assert "RETURNS" in str(result), "Cached tools should call through the pool"
+        finally:
+            await second.close()
+
+    def test_changed_version_misses(self, tmp_path):
+        """A different schema hash (or a server without one) is never served from the cache."""
+        from mcp.types import Tool
+
+        cache = ToolSchemaCache(str(tmp_path / "tool_schemas.json"))
+        tool = Tool(name="roll_dice", description="Roll dice", inputSchema={"type": "object"})
+        cache.put(STDIO_CONNECTION, "tools-aaaa", [tool])
+
+        assert cache.get(STDIO_CONNECTION, "tools-aaaa")[0].name == "roll_dice"
+        assert cache.get(STDIO_CONNECTION, "tools-bbbb") is None
+        assert cache.get(STDIO_CONNECTION, "1.12.4") is None
+
+    @pytest.mark.asyncio
+    async def test_agent_binds_tools_once(self, tmp_path, monkeypatch):
+        """The agent builds its tool-bound model during initialize, not per model step."""
+        from client.langgraph_agent import MCPLangGraphAgent
+
+        monkeypatch.setenv("MCP_CACHE_DIR", str(tmp_path))
+        agent = MCPLangGraphAgent(openai_api_key="sk-test")
+        agent.mcp_config = {"my-mcp-server": STDIO_CONNECTION}
+
+        calls = []
+        bind_tools = type(agent.llm).bind_tools
+        monkeypatch.setattr(type(agent.llm), "bind_tools",
+                            lambda llm, *args, **kwargs: calls.append(1) or bind_tools(llm, *args, **kwargs))
+        try:
+            await agent.initialize()
+            assert agent.llm_with_tools is not None
+            assert len(calls) == 1, f"bind_tools should run once, ran {len(calls)} times"
+        finally:
+            await agent.close(close_sessions=True)
@@ -0,0 +1,171 @@
+"""
+Pytest tests for request tracing spans.
+"""
+
+import sys
+import os
+import json
+import pytest
+
+# Add parent directory to path to import server module
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from server import tracing
+from server import main as server_main
+
+
+@pytest.fixture
+def exporter():
+    """Trace every call into an in-memory exporter, restoring the tracer afterwards."""
+    previous = tracing.tracer
+    memory = tracing.InMemoryExporter()
+    tracing.configure(sample_rate=1.0, exporter=memory)
+    yield memory
+    tracing.tracer.shutdown()
+    tracing.tracer = previous
+
+
+class TestTracer:
+    """Test suite for spans, sampling and exporters."""
+
+    def test_child_spans_share_trace(self, exporter):
+        """Nested spans belong to one trace and point at their parent."""
+        with tracing.span("parent") as parent:
+            with tracing.span("child", step=1):
+                tracing.set_attribute("extra", True)
+        tracing.tracer.flush()
+
+        child, root = exporter.spans
+        assert root.name == "parent" and root.parent_id is None
+        assert child.trace_id == root.trace_id
+        assert child.parent_id == parent.span_id
+        assert child.attributes == {"step": 1, "extra": True}
+
+    def test_errors_are_recorded(self, exporter):
+        """Exceptions and ❌ results mark the span as failed."""
+        @tracing.traced
+        def failing():
+            return "❌ upstream error"
+
+        failing()
+        with pytest.raises(ValueError):
+            with tracing.span("raises"):
+                raise ValueError("bad input")
+        tracing.tracer.flush()
+
+        assert [span.status for span in exporter.spans] == ["error", "error"]
+        assert exporter.spans[1].error == "ValueError: bad input"
+
+    def test_github_rest_fallback_spans_join_the_call_trace(self, exporter):
+        """REST lookups run a few at a time, as children of the tool call's trace."""
+        import threading
+        import time
+        import requests
+        from requests.adapters import BaseAdapter
+        from server.github_tool import GitHubTool
+
+        lock, active, peak, sent = threading.Lock(), [], [], []
+
+        class FakeGitHub(BaseAdapter):
+            def send(self, request, **kwargs):
+                with lock:
+                    active.append(request)
+                    peak.append(len(active))
+                    sent.append(request.path_url)
+                time.sleep(0.05)
+                with lock:
+                    active.remove(request)
+                name = request.path_url.split("/repos/")[1]
+                response = requests.Response()
+                response.status_code = 200
+                response._content = json.dumps({
+                    "full_name": name, "description": None, "language": "Python", "stargazers_count": 1,
+                    "forks_count": 0, "updated_at": "2024-01-01T00:00:00Z", "private": False,
+                }).encode()
+                response.url = request.url
+                return response
+
+            def close(self):
+                pass
+
+        tool = GitHubTool(rest_concurrency=2)
+        tool.session.mount("https://", FakeGitHub())
+        names = ["a/one", "b/two", "c/three", "d/four"]
+        with tracing.span("tools/call github_get_repositories_info"):
+            assert "(4/4 found)" in tool.get_repositories_info(names)
+        tracing.tracer.flush()
+
+        assert max(peak) == 2, f"Expected at most 2 requests in flight, saw {max(peak)}"
+        http_spans = [span for span in exporter.spans if span.name == "HTTP GET"]
+        assert len(http_spans) == 4
+        assert len({span.trace_id for span in exporter.spans}) == 1, "HTTP spans must not start their own traces"
+        assert "(4/4 found)" in tool.get_repositories_info(names)
+        assert len(sent) == 4, "Summaries are served from the cache"
+        tool.shutdown()
+
+    def test_github_prefetch_spans_join_the_call_trace(self, exporter):
+        """Background prefetches run in the queuing call's context, not as orphan traces."""
+        from server.github_prefetch import GitHubPrefetcher
+
+        class Session:
+            hooks = {}
+
+            def get(self, url, params=None):
+                raise ConnectionError("offline")
+
+        prefetcher = GitHubPrefetcher(Session(), top_n=2)
+        with tracing.span("tools/call github_search_repositories") as call:
+            prefetcher.prefetch([{"full_name": "a/one"}, {"full_name": "b/two"}])
+            prefetcher._executor.shutdown(wait=True)
+        tracing.tracer.flush()
+
+        prefetches = [span for span in exporter.spans if span.name == "github.prefetch"]
+        assert len(prefetches) == 2
+        assert all(span.trace_id == call.trace_id and span.parent_id == call.span_id for span in prefetches)
+
+    def test_sampling_rate_zero_records_nothing(self):
+        """Unsampled traces produce no spans, including their children."""
+        memory = tracing.InMemoryExporter()
+        tracer = tracing.Tracer(sample_rate=0.0, exporter=memory)
+        with tracer.span("root"):
+            with tracer.span("child") as child:
+                assert not child.sampled
+        tracer.shutdown()
+
+        assert memory.spans == []
+
+    def test_json_lines_and_otlp_formats(self, tmp_path):
+        """Spans are written as JSON lines and convert to the OTLP JSON payload."""
+        path = tmp_path / "traces.jsonl"
+        tracer = tracing.Tracer(sample_rate=1.0, exporter=tracing.JsonLinesExporter(str(path)))
+        with tracer.span("github.get_file_content", owner="octocat"):
+            pass
+        tracer.shutdown()
+
+        record = json.loads(path.read_text().strip())
+        assert record["name"] == "github.get_file_content"
+        assert record["attributes"] == {"owner": "octocat"}
+        assert record["end_time_unix_nano"] >= record["start_time_unix_nano"]
+
+        span = tracing.Span("tools/call roll_dice", "a" * 32, None, {"num_rolls": 2})
+        span.end_ns = span.start_ns
+        payload = tracing.OtlpHttpExporter("http://localhost:4318/v1/traces").payload([span])
+        otlp_span = payload["resourceSpans"][0]["scopeSpans"][0]["spans"][0]
+        assert otlp_span["traceId"] == "a" * 32
+        assert otlp_span["attributes"] == [{"key": "num_rolls", "value": {"intValue": "2"}}]
+
+
+class TestToolTracing:
+    """Test that tool calls produce a span tree."""
+
+    @pytest.mark.asyncio
+    async def test_tool_call_spans_cross_thread_pool(self, exporter):
+        """Spans opened on a pool worker are children of the tool's root span."""
+        await server_main.mcp.call_tool("roll_dice", {"notation": "2d6", "num_rolls": 2})
+        tracing.tracer.flush()
+
+        spans = {span.name: span for span in exporter.spans}
+        root, roll = spans["tools/call roll_dice"], spans["dice.roll"]
+        assert root.parent_id is None
+        assert roll.trace_id == root.trace_id and roll.parent_id == root.span_id
+        assert roll.attributes == {"notation": "2d6", "num_rolls": 2}